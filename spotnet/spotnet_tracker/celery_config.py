@@ -12,6 +12,7 @@ Key Components:
 - Loads environment variables using `load_dotenv`.
 - Configures Redis connection settings for Celery.
 - Defines a Celery beat schedule for recurring tasks.
+- Partitions the health ratio scan into shards scheduled as separate tasks.
 
 Usage:
 - The Celery app can be imported and used in other parts of the application
@@ -21,6 +22,7 @@ Usage:
 
 import os
 
+import redis
 from celery import Celery
 from dotenv import load_dotenv
 
@@ -35,11 +37,22 @@ app = Celery(
     backend=CELERY_BROKER_URL,
 )
 
+# Redis client for distributed task locks
+redis_client = redis.Redis.from_url(CELERY_BROKER_URL)
+
+# Number of shards of the health ratio scan, each one run as its own task
+HEALTH_RATIO_SHARDS = int(os.environ.get("HEALTH_RATIO_SHARDS", 4))
+HEALTH_RATIO_INTERVAL = 60
+
 app.conf.beat_schedule = {
-    "check_users_health_ratio": {
+    f"check_users_health_ratio_shard_{shard}": {
         "task": "check_users_health_ratio",
-        "schedule": 60,
-    },
+        "schedule": HEALTH_RATIO_INTERVAL,
+        "args": (shard, HEALTH_RATIO_SHARDS),
+        # A run still queued after one interval is superseded by the next one
+        "options": {"expires": HEALTH_RATIO_INTERVAL},
+    }
+    for shard in range(HEALTH_RATIO_SHARDS)
 }
 
 app.conf.broker_connection_retry_on_startup = True
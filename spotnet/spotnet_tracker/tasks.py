@@ -5,34 +5,69 @@ It imports the logging module to facilitate logging operations and the
 Celery app instance from the `celery_config` module.
 
 Tasks:
-- test_task: A simple test task that logs a confirmation message.
+- check_users_health_ratio: Checks the health ratios of one shard of users.
+- claim_airdrop_task: Claims user airdrops.
 """
 
 import asyncio
 import logging
 import time
 
+from redis.exceptions import LockError
+
 from web_app.contract_tools.mixins.alert import AlertMixin
 from web_app.tasks.claim_airdrops import AirdropClaimer
 
-from .celery_config import app
+from .celery_config import app, redis_client
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Seconds after which the lock of a crashed shard run is released
+HEALTH_RATIO_LOCK_TIMEOUT = 600
+
 
 @app.task(name="check_users_health_ratio")
-def check_users_health_ratio() -> None:
+def check_users_health_ratio(shard: int = 0, shard_count: int = 1) -> dict | None:
     """
-    Background task to check health ratio levels for users with opened positions.
+    Background task to check health ratio levels for one shard of users with
+    opened positions. A distributed lock skips the run if the previous run
+    of the same shard is still in progress.
 
-    :return: None
+    :param shard: The index of the shard.
+    :param shard_count: The total number of shards.
+    :return: Timing metrics of the run, or None if the run was skipped.
     """
+    lock = redis_client.lock(
+        f"lock:check_users_health_ratio:{shard_count}:{shard}",
+        timeout=HEALTH_RATIO_LOCK_TIMEOUT,
+        blocking=False,
+    )
+    if not lock.acquire():
+        logger.info(
+            f"Skipping health ratio shard {shard}/{shard_count}: previous run in progress"
+        )
+        return None
+
+    started_at = time.monotonic()
+    user_number = 0
     try:
         alert_mixin = AlertMixin()
-        alert_mixin.check_users_health_ratio_level()
+        user_number = alert_mixin.check_users_health_ratio_level(shard, shard_count)
     except Exception as e:
         logger.error(f"Error in check_users_health_ratio task: {e}")
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning(f"Lock of health ratio shard {shard} expired before release")
+
+    duration = time.monotonic() - started_at
+    logger.info(
+        f"Health ratio shard {shard}/{shard_count} checked {user_number} users "
+        f"in {duration:.2f}s"
+    )
+    return {"shard": shard, "users": user_number, "duration": duration}
 
 
 @app.task(name="claim_airdrop_task")
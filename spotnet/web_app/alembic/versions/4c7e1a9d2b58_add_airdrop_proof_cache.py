@@ -0,0 +1,43 @@
+"""add airdrop proof cache
+
+Revision ID: 4c7e1a9d2b58
+Revises: d3a6c8f0b217
+Create Date: 2026-10-18 19:02:31.417590
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4c7e1a9d2b58"
+down_revision = "d3a6c8f0b217"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates the airdrop_proof table caching zkLend reward proofs
+    per contract and proof hash.
+    """
+    op.create_table(
+        "airdrop_proof",
+        sa.Column("contract_address", sa.String(), nullable=False),
+        sa.Column("proof_hash", sa.String(length=64), nullable=False),
+        sa.Column("round", sa.Integer(), nullable=True),
+        sa.Column("amount", sa.String(), nullable=False),
+        sa.Column("proof", sa.JSON(), nullable=False),
+        sa.Column("recipient", sa.String(), nullable=False),
+        sa.Column("is_claimed", sa.Boolean(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("contract_address", "proof_hash"),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drops the airdrop_proof table.
+    """
+    op.drop_table("airdrop_proof")
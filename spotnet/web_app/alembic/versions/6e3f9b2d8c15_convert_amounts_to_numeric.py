@@ -0,0 +1,136 @@
+"""convert amounts to numeric
+
+Revision ID: 6e3f9b2d8c15
+Revises: f2b8c41d7a90
+Create Date: 2026-10-18 14:02:37.118205
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6e3f9b2d8c15"
+down_revision = "f2b8c41d7a90"
+branch_labels = None
+depends_on = None
+
+# Rows converted per UPDATE, each chunk is committed on its own
+BACKFILL_BATCH_SIZE = 5000
+# Tables and the nullability of their amount column
+AMOUNT_TABLES = {"position": False, "extra_deposits": False, "vault": True}
+NUMERIC_AMOUNT = sa.Numeric(38, 18)
+# Amounts the backfill can cast to NUMERIC
+NUMERIC_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+# Amounts NUMERIC(38, 18) can hold are below 10^20
+NUMERIC_AMOUNT_LIMIT = "1e20"
+
+
+def _check_amounts(connection: sa.Connection, table: str) -> None:
+    """
+    Stops the migration before any change if a table holds amounts
+    that cannot be cast to NUMERIC(38, 18), either not numeric or out of range.
+    The amount is read as text, so a rerun after a partial upgrade can check
+    tables whose amount is already NUMERIC.
+    :param connection: database connection
+    :param table: table name
+    """
+    invalid_count = connection.execute(
+        sa.text(
+            f'SELECT count(*) FROM "{table}" '
+            "WHERE amount IS NOT NULL AND CASE "
+            "WHEN amount::text ~ :pattern "
+            f"THEN abs(amount::text::numeric) >= {NUMERIC_AMOUNT_LIMIT} "
+            "ELSE true END"
+        ),
+        {"pattern": NUMERIC_PATTERN},
+    ).scalar()
+    if invalid_count:
+        raise RuntimeError(
+            f"{invalid_count} rows of {table} have amounts that are not numeric "
+            f"or not below {NUMERIC_AMOUNT_LIMIT}, "
+            "fix them before running this migration"
+        )
+
+
+def _backfill(table: str) -> None:
+    """
+    Copies the string amounts of a table into the numeric column in chunks,
+    committing each chunk so the rows are not locked for the whole backfill.
+    :param table: table name
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            result = connection.execute(
+                sa.text(
+                    f'UPDATE "{table}" SET amount_numeric = amount::numeric '
+                    f'WHERE id IN (SELECT id FROM "{table}" '
+                    "WHERE amount_numeric IS NULL AND amount IS NOT NULL "
+                    "LIMIT :batch_size)"
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE},
+            )
+            if result.rowcount == 0:
+                break
+
+
+def _catch_up(table: str) -> None:
+    """
+    Converts the amounts written by the running application since the backfill.
+    The table is locked against writes until the end of the transaction, which
+    also drops the string column, so no write is lost in between.
+    :param table: table name
+    """
+    op.execute(f'LOCK TABLE "{table}" IN SHARE ROW EXCLUSIVE MODE')
+    op.execute(
+        f'UPDATE "{table}" SET amount_numeric = amount::numeric '
+        "WHERE amount IS NOT NULL "
+        "AND amount_numeric IS DISTINCT FROM amount::numeric"
+    )
+
+
+def upgrade() -> None:
+    """
+    Converts the amount columns of position, extra_deposits and vault
+    from VARCHAR to NUMERIC(38, 18). The numeric column is added next to
+    the old one, backfilled in chunks, caught up under a table lock, and then
+    takes the old column's place. Each table is converted in its own
+    transaction, so a failed upgrade can be rerun.
+    """
+    connection = op.get_bind()
+    for table in AMOUNT_TABLES:
+        _check_amounts(connection, table)
+
+    for table, nullable in AMOUNT_TABLES.items():
+        # A rerun after a failure finds the column of the failed table
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS amount_numeric '
+            "NUMERIC(38, 18)"
+        )
+        _backfill(table)
+        _catch_up(table)
+        op.drop_column(table, "amount")
+        op.alter_column(
+            table,
+            "amount_numeric",
+            new_column_name="amount",
+            existing_type=NUMERIC_AMOUNT,
+            nullable=nullable,
+        )
+
+
+def downgrade() -> None:
+    """
+    Converts the amount columns back to VARCHAR.
+    """
+    for table, nullable in AMOUNT_TABLES.items():
+        op.alter_column(
+            table,
+            "amount",
+            existing_type=NUMERIC_AMOUNT,
+            type_=sa.String(),
+            existing_nullable=nullable,
+            postgresql_using="amount::text",
+        )
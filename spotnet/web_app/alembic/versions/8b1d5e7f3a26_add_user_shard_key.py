@@ -0,0 +1,55 @@
+"""add user shard key
+
+Revision ID: 8b1d5e7f3a26
+Revises: 4c7e1a9d2b58
+Create Date: 2026-10-18 21:40:12.503918
+
+"""
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8b1d5e7f3a26"
+down_revision = "4c7e1a9d2b58"
+branch_labels = None
+depends_on = None
+
+# Users updated per executemany
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """
+    Adds the shard_key column of the user table, the CRC32 of the lowercase
+    contract address, and fills it for the existing users.
+    """
+    op.add_column("user", sa.Column("shard_key", sa.BigInteger(), nullable=True))
+    op.create_index(op.f("ix_user_shard_key"), "user", ["shard_key"], unique=False)
+
+    connection = op.get_bind()
+    users = connection.execute(
+        sa.text(
+            'SELECT id, contract_address FROM "user" WHERE contract_address IS NOT NULL'
+        )
+    ).fetchall()
+    rows = [
+        {"id": user_id, "shard_key": zlib.crc32(contract_address.lower().encode())}
+        for user_id, contract_address in users
+    ]
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text('UPDATE "user" SET shard_key = :shard_key WHERE id = :id'),
+            rows[start : start + BACKFILL_BATCH_SIZE],
+        )
+
+
+def downgrade() -> None:
+    """
+    Drops the shard_key column of the user table.
+    """
+    op.drop_index(op.f("ix_user_shard_key"), table_name="user")
+    op.drop_column("user", "shard_key")
@@ -0,0 +1,55 @@
+"""add platform stats tables
+
+Revision ID: 9b4d2e7f1a63
+Revises: 6e3f9b2d8c15
+Create Date: 2026-10-18 15:41:09.524833
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9b4d2e7f1a63"
+down_revision = "6e3f9b2d8c15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates the token_stats and platform_counter tables and fills them
+    from the existing positions and users.
+    """
+    op.create_table(
+        "token_stats",
+        sa.Column("token_symbol", sa.String(), nullable=False),
+        sa.Column("total_amount", sa.Numeric(38, 18), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("token_symbol"),
+    )
+    op.create_table(
+        "platform_counter",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute(
+        "INSERT INTO token_stats (token_symbol, total_amount, updated_at) "
+        "SELECT token_symbol, sum(amount), now() FROM position "
+        "WHERE status IN ('opened', 'closed') GROUP BY token_symbol"
+    )
+    op.execute(
+        "INSERT INTO platform_counter (name, value, updated_at) "
+        "SELECT 'unique_users', count(*), now() FROM \"user\""
+    )
+
+
+def downgrade() -> None:
+    """
+    Drops the token_stats and platform_counter tables.
+    """
+    op.drop_table("platform_counter")
+    op.drop_table("token_stats")
@@ -0,0 +1,71 @@
+"""add leaderboard stats
+
+Revision ID: d3a6c8f0b217
+Revises: 9b4d2e7f1a63
+Create Date: 2026-10-18 17:12:44.870316
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "d3a6c8f0b217"
+down_revision = "9b4d2e7f1a63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Adds the position count to token_stats, creates the user_stats table
+    with the covering index of the leaderboard, and fills both from the
+    existing positions.
+    """
+    op.add_column(
+        "token_stats",
+        sa.Column(
+            "total_positions", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+    )
+    op.alter_column("token_stats", "total_positions", server_default=None)
+    op.execute(
+        "UPDATE token_stats SET total_positions = counts.total_positions "
+        "FROM (SELECT token_symbol, count(*) AS total_positions FROM position "
+        "WHERE status IN ('opened', 'closed') GROUP BY token_symbol) AS counts "
+        "WHERE token_stats.token_symbol = counts.token_symbol"
+    )
+
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("wallet_id", sa.String(), nullable=False),
+        sa.Column("positions_number", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_user_stats_positions_number_wallet_id",
+        "user_stats",
+        [sa.text("positions_number DESC"), "wallet_id"],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO user_stats (user_id, wallet_id, positions_number, updated_at) "
+        'SELECT "user".id, "user".wallet_id, count(position.id), now() '
+        'FROM "user" JOIN position ON position.user_id = "user".id '
+        "WHERE position.status IN ('opened', 'closed') "
+        'GROUP BY "user".id, "user".wallet_id'
+    )
+
+
+def downgrade() -> None:
+    """
+    Drops the user_stats table and the position count of token_stats.
+    """
+    op.drop_index("ix_user_stats_positions_number_wallet_id", table_name="user_stats")
+    op.drop_table("user_stats")
+    op.drop_column("token_stats", "total_positions")
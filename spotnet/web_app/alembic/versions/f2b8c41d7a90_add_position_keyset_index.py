@@ -0,0 +1,36 @@
+"""add position keyset index
+
+Revision ID: f2b8c41d7a90
+Revises: c045e432555c
+Create Date: 2026-10-18 10:24:51.312402
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "f2b8c41d7a90"
+down_revision = "c045e432555c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Creates a composite index on position (user_id, created_at, id)
+    for the keyset pagination of the positions of a user.
+    """
+    op.create_index(
+        "ix_position_user_id_created_at_id",
+        "position",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """
+    Removes the composite index on position (user_id, created_at, id).
+    """
+    op.drop_index("ix_position_user_id_created_at_id", table_name="position")
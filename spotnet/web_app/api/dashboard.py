@@ -2,17 +2,21 @@
 This module handles dashboard-related API endpoints.
 """
 
+import asyncio
 import collections
 from decimal import Decimal, DivisionByZero
+from typing import Awaitable
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 from web_app.api.serializers.dashboard import DashboardResponse
+from web_app.api.server_timing import ServerTiming
 from web_app.contract_tools.mixins import DashboardMixin, HealthRatioMixin
-from web_app.db.crud import PositionDBConnector
+from web_app.contract_tools.response_cache import DASHBOARD_CACHE
+from web_app.db.crud import AsyncPositionDBConnector
 
 router = APIRouter()
-position_db_connector = PositionDBConnector()
+position_db_connector = AsyncPositionDBConnector()
 
 
 @router.get(
@@ -22,10 +26,14 @@ position_db_connector = PositionDBConnector()
     response_model=DashboardResponse,
     response_description="Returns user's balances, multipliers, start dates, and ZkLend positions.",
 )
-async def get_dashboard(wallet_id: str) -> DashboardResponse:
+async def get_dashboard(wallet_id: str, response: Response) -> DashboardResponse:
     """
     This endpoint fetches the user's dashboard data,
     including balances, multipliers, start dates, deposit_data and ZkLend position.
+    Responses are cached per wallet until the next block or a position change,
+    the X-Cache header tells whether it was a HIT, STALE or MISS.
+    The Server-Timing header reports the durations of the cache lookup and,
+    when the dashboard was built for this request, of each build stage.
 
     ### Parameters:
     - **wallet_id**: User's wallet ID
@@ -39,8 +47,102 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
     - **deposit_data**: Deposit data including token and amount.
 
     """
-    contract_address = position_db_connector.get_contract_address_by_wallet_id(
-        wallet_id
+    timing = ServerTiming()
+    with timing.stage("total"):
+        dashboard, cache_status = await DASHBOARD_CACHE.get_or_load(
+            wallet_id, lambda: _build_dashboard(wallet_id, timing)
+        )
+    timing.describe("total", cache_status.value)
+    response.headers["X-Cache"] = cache_status.value
+    response.headers["Server-Timing"] = timing.header()
+    return DashboardResponse(**dashboard)
+
+
+async def _gather_stages(*stages: Awaitable) -> list:
+    """
+    Run independent stages concurrently and wait for all of them. If stages fail,
+    the error of the first one in argument order is raised, so the reported
+    error does not depend on which stage finished first.
+
+    :param stages: The awaitables of the stages.
+    :return: The results of the stages in argument order.
+    """
+    results = await asyncio.gather(*stages, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _get_health_ratio_and_tvl(contract_address: str) -> tuple | None:
+    """
+    Get the health ratio and TVL of a deposit contract.
+
+    :param contract_address: The address of the deposit contract.
+    :return: Tuple with the health ratio and TVL, or None if the position
+     has no debt or deposits.
+    """
+    try:
+        return await HealthRatioMixin.get_health_ratio_and_tvl(contract_address)
+    except (IndexError, DivisionByZero):
+        return None
+
+
+async def _get_total_position_balance(position: dict) -> Decimal:
+    """
+    Get the balance of a position scaled by its multiplier.
+
+    :param position: The position data.
+    :return: The total position balance.
+    """
+    position_balance = await DashboardMixin.get_position_balance(position["id"])
+    return await DashboardMixin.calculate_position_balance(
+        position_balance, position["multiplier"]
+    )
+
+
+async def _get_deposit_data(position: dict) -> list[dict]:
+    """
+    Get the extra deposits of a position.
+
+    :param position: The position data.
+    :return: A list of extra deposits with token and amount.
+    """
+    extra_deposits = await position_db_connector.get_extra_deposits_by_position_id(
+        position["id"]
+    )
+    return [
+        {"token": deposit.token_symbol, "amount": deposit.amount}
+        for deposit in extra_deposits
+    ]
+
+
+async def _build_dashboard(wallet_id: str, timing: ServerTiming) -> dict:
+    """
+    Build the dashboard data of a wallet in its JSON form for the cache.
+
+    The stages depend on each other as follows, stages on the same level
+    run concurrently:
+
+        contract address, positions        (database)
+        -> health ratio and TVL            (RPC, Pragma prices)
+           current position sum            (database, AVNU prices)
+           position balance                (database)
+           extra deposits                  (database)
+
+    :param wallet_id: User's wallet ID
+    :param timing: Collector of the stage durations.
+    :return: The dashboard data as a JSON-serializable dict.
+    """
+    # Fetching first 10 positions at the moment
+    contract_address, opened_positions = await _gather_stages(
+        timing.measure(
+            "contract",
+            position_db_connector.get_contract_address_by_wallet_id(wallet_id),
+        ),
+        timing.measure(
+            "positions", position_db_connector.get_positions_by_wallet_id(wallet_id)
+        ),
     )
     default_dashboard_response = DashboardResponse(
         health_ratio="0",
@@ -54,10 +156,7 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
         deposit_data=[],
     )
     if not contract_address:
-        return default_dashboard_response
-
-    # Fetching first 10 positions at the moment
-    opened_positions = position_db_connector.get_positions_by_wallet_id(wallet_id)
+        return default_dashboard_response.model_dump(mode="json")
 
     # At the moment, we only support one position per wallet
     first_opened_position = (
@@ -66,38 +165,33 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
         else collections.defaultdict(lambda: None)
     )
     if not first_opened_position:
-        return default_dashboard_response
-    try:
-        # Fetch zkLend position for the wallet ID
-        health_ratio, tvl = await HealthRatioMixin.get_health_ratio_and_tvl(
-            contract_address
+        return default_dashboard_response.model_dump(mode="json")
+
+    health_ratio_and_tvl, current_sum, total_position_balance, deposit_data = (
+        await _gather_stages(
+            # Fetch zkLend position for the wallet ID
+            timing.measure("health", _get_health_ratio_and_tvl(contract_address)),
+            timing.measure(
+                "current_sum",
+                DashboardMixin.get_current_position_sum(first_opened_position),
+            ),
+            timing.measure(
+                "balance", _get_total_position_balance(first_opened_position)
+            ),
+            timing.measure("deposits", _get_deposit_data(first_opened_position)),
         )
-    except (IndexError, DivisionByZero):
-        return default_dashboard_response
+    )
+    if health_ratio_and_tvl is None:
+        return default_dashboard_response.model_dump(mode="json")
+    health_ratio, tvl = health_ratio_and_tvl
 
     position_multiplier = first_opened_position["multiplier"]
-    position_amount = first_opened_position["amount"]
-
-    current_sum = await DashboardMixin.get_current_position_sum(first_opened_position)
     start_sum = await DashboardMixin.get_start_position_sum(
         first_opened_position["start_price"],
-        position_amount,
+        first_opened_position["amount"],
         position_multiplier,
     )
-    position_balance = await DashboardMixin.get_position_balance(
-        first_opened_position["id"]
-    )
-    total_position_balance = await DashboardMixin.calculate_position_balance(
-        position_balance, position_multiplier
-    )
     token_symbol = first_opened_position["token_symbol"]
-    extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
-        first_opened_position["id"]
-    )
-    deposit_data = [
-        {"token": deposit.token_symbol, "amount": deposit.amount}
-        for deposit in extra_deposits
-    ]
 
     return DashboardResponse(
         health_ratio=health_ratio,
@@ -109,4 +203,4 @@ async def get_dashboard(wallet_id: str) -> DashboardResponse:
         balance=str(total_position_balance),
         position_id=first_opened_position["id"],
         deposit_data=deposit_data,
-    )
+    ).model_dump(mode="json")
@@ -1,12 +1,19 @@
 """
 This module handles leaderboard-related API endpoints.
 """
+import os
+
 from fastapi import APIRouter
-from web_app.db.crud.leaderboard import LeaderboardDBConnector
+from web_app.contract_tools.cache import AsyncTTLCache
+from web_app.db.crud.leaderboard import AsyncLeaderboardDBConnector
 from web_app.api.serializers.leaderboard import UserLeaderboardItem, TokenPositionStatistic
 
+# Seconds a leaderboard response is served from memory
+LEADERBOARD_CACHE_TTL = float(os.environ.get("LEADERBOARD_CACHE_TTL", 10))
+
 router = APIRouter()
-leaderboard_db_connector = LeaderboardDBConnector()
+leaderboard_db_connector = AsyncLeaderboardDBConnector()
+leaderboard_cache = AsyncTTLCache(ttl=LEADERBOARD_CACHE_TTL)
 
 @router.get(
     "/api/get-user-leaderboard",
@@ -19,8 +26,9 @@ async def get_user_leaderboard() -> list[UserLeaderboardItem]:
     """
     Get the top 10 users ordered by closed/opened positions.
     """
-    leaderboard_data = leaderboard_db_connector.get_top_users_by_positions()
-    return leaderboard_data
+    return await leaderboard_cache.get_or_load(
+        "top_users", leaderboard_db_connector.get_top_users_by_positions
+    )
 
 
 @router.get(
@@ -35,4 +43,6 @@ async def get_position_tokens_statistic() -> list[TokenPositionStatistic]:
     This endpoint retrieves statistics about positions grouped by token symbol.
     Returns counts of opened and closed positions for each token.
     """
-    return leaderboard_db_connector.get_position_token_statistics()
+    return await leaderboard_cache.get_or_load(
+        "token_statistics", leaderboard_db_connector.get_position_token_statistics
+    )
@@ -6,11 +6,12 @@ and includes middleware for session management and CORS.
 It also includes routers for the dashboard, position, and user endpoints.
 """
 
+import asyncio
+import logging
 import os
 from uuid import uuid4
 
 from fastapi import FastAPI
-from starknet_py.contract import Contract
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
@@ -20,9 +21,16 @@ from web_app.api.telegram import router as telegram_router
 from web_app.api.user import router as user_router
 from web_app.api.vault import router as vault_router
 from web_app.api.leaderboard import router as leaderboard_router
-from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.contract_tools.abi_cache import (
+    ABI_CACHE,
+    ABI_REFRESH_INTERVAL,
+    ABI_RETRY_DELAY,
+)
+from web_app.contract_tools.api_request import HTTP_SESSION_POOL
 from web_app.contract_tools.constants import EKUBO_MAINNET_ADDRESS
 
+logger = logging.getLogger(__name__)
+
 # Initialize Sentry SDK if in production
 if os.getenv("ENV_VERSION") == "PROD":
     import sentry_sdk
@@ -57,14 +65,51 @@ app.add_middleware(
 )
 
 
+async def refresh_contracts() -> None:
+    """
+    Check for upgraded contract classes every ABI_REFRESH_INTERVAL seconds
+    and swap in the refreshed Ekubo contract. While the Ekubo contract is not
+    loaded, retry after ABI_RETRY_DELAY seconds, doubled after each failure.
+    """
+    retry_delay = ABI_RETRY_DELAY
+    while True:
+        await ABI_CACHE.refresh()
+        app.state.ekubo_contract = (
+            ABI_CACHE.get_cached(EKUBO_MAINNET_ADDRESS) or app.state.ekubo_contract
+        )
+        if app.state.ekubo_contract is None:
+            logger.warning(
+                f"Ekubo contract is not loaded, retrying in {retry_delay} seconds"
+            )
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, ABI_REFRESH_INTERVAL)
+            continue
+        retry_delay = ABI_RETRY_DELAY
+        await asyncio.sleep(ABI_REFRESH_INTERVAL)
+
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Initialize the Ekubo contract instance on startup.
+    Initialize the Ekubo contract instance on startup, from the ABI cached on disk
+    when available, and start refreshing the cached contracts in the background.
     """
-    app.state.ekubo_contract = await Contract.from_address(
-        EKUBO_MAINNET_ADDRESS, provider=CLIENT.client
-    )
+    try:
+        app.state.ekubo_contract = await ABI_CACHE.get_contract(EKUBO_MAINNET_ADDRESS)
+    except Exception as e:  # The background refresh retries while the node is down
+        logger.error(f"Failed to load the Ekubo contract: {e}")
+        app.state.ekubo_contract = None
+    app.state.contracts_refresh = asyncio.create_task(refresh_contracts())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop refreshing the cached contracts and close the shared HTTP session
+    on shutdown.
+    """
+    app.state.contracts_refresh.cancel()
+    await HTTP_SESSION_POOL.close()
 
 
 # Include the form and login routers
@@ -2,6 +2,8 @@
 This module handles position-related API endpoints.
 """
 
+from datetime import datetime
+import logging
 from decimal import Decimal, InvalidOperation
 from typing import Optional
 from uuid import UUID
@@ -22,17 +24,45 @@ from web_app.api.serializers.transaction import (
 )
 from web_app.contract_tools.constants import TokenMultipliers, TokenParams
 from web_app.contract_tools.mixins import DashboardMixin, DepositMixin, PositionMixin
-from web_app.db.crud import PositionDBConnector, TransactionDBConnector
+from web_app.contract_tools.response_cache import DASHBOARD_CACHE
+from web_app.db.crud import (
+    AsyncPositionDBConnector,
+    AsyncTransactionDBConnector,
+    encode_position_cursor,
+)
 from web_app.db.models import TransactionStatus
 
+logger = logging.getLogger(__name__)
 router = APIRouter()  # Initialize the router
-position_db_connector = PositionDBConnector()
-transaction_db_connector = TransactionDBConnector()
+position_db_connector = AsyncPositionDBConnector()
+transaction_db_connector = AsyncTransactionDBConnector()
 
 # Constants
 PAGINATION_STEP = 10
 
 
+async def invalidate_dashboard(
+    wallet_id: str = None, position_id: UUID | str = None
+) -> None:
+    """
+    Drop the cached dashboard of a wallet after its positions changed.
+    A failed invalidation does not fail the write, the cached dashboard
+    expires with the next block.
+
+    :param wallet_id: Wallet ID of the user
+    :param position_id: Position ID, used to find the wallet if it is not given
+    """
+    try:
+        if wallet_id is None:
+            wallet_id = await position_db_connector.get_wallet_id_by_position_id(
+                position_id
+            )
+        if wallet_id:
+            await DASHBOARD_CACHE.invalidate(wallet_id)
+    except Exception as e:  # Invalidation must not fail the position change
+        logger.warning(f"Error invalidating dashboard cache: {e}")
+
+
 @router.get(
     "/api/get-multipliers",
     tags=["Position Operations"],
@@ -78,7 +108,7 @@ async def create_position_with_transaction_data(
     The created position's details and transaction data.
     """
     # Create a new position in the database
-    position = position_db_connector.create_position(
+    position = await position_db_connector.create_position(
         form_data.wallet_id,
         form_data.token_symbol,
         form_data.amount,
@@ -98,9 +128,12 @@ async def create_position_with_transaction_data(
         request.app.state.ekubo_contract,
     )
     deposit_data["contract_address"] = (
-        position_db_connector.get_contract_address_by_wallet_id(form_data.wallet_id)
+        await position_db_connector.get_contract_address_by_wallet_id(
+            form_data.wallet_id
+        )
     )
     deposit_data["position_id"] = str(position.id)
+    await invalidate_dashboard(wallet_id=form_data.wallet_id)
     return LoopLiquidityData(**deposit_data)
 
 
@@ -125,8 +158,8 @@ async def get_repay_data(
     if not wallet_id:
         raise HTTPException(status_code=404, detail="Wallet not found")
 
-    contract_address, position_id, token_symbol = position_db_connector.get_repay_data(
-        wallet_id
+    contract_address, position_id, token_symbol = (
+        await position_db_connector.get_repay_data(wallet_id)
     )
     is_opened_position = await PositionMixin.is_opened_position(contract_address)
     if not is_opened_position:
@@ -160,10 +193,11 @@ async def close_position(position_id: UUID, transaction_hash: str) -> str:
     if position_id is None or position_id == "undefined":
         raise HTTPException(status_code=404, detail="Position not Found")
 
-    position_status = position_db_connector.close_position(str(position_id))
-    position_db_connector.save_transaction(
+    position_status = await position_db_connector.close_position(str(position_id))
+    await position_db_connector.save_transaction(
         position_id=position_id, status="closed", transaction_hash=transaction_hash
     )
+    await invalidate_dashboard(position_id=position_id)
     return position_status
 
 
@@ -187,13 +221,16 @@ async def open_position(position_id: str, transaction_hash: str) -> str:
         raise HTTPException(status_code=404, detail="Position not found")
 
     current_prices = await DashboardMixin.get_current_prices()
-    position_status = position_db_connector.open_position(position_id, current_prices)
+    position_status = await position_db_connector.open_position(
+        position_id, current_prices
+    )
 
     if transaction_hash:
-        transaction_db_connector.create_transaction(
+        await transaction_db_connector.create_transaction(
             position_id, transaction_hash, status=TransactionStatus.OPENED.value
         )
 
+    await invalidate_dashboard(position_id=position_id)
     return position_status
 
 
@@ -212,8 +249,8 @@ async def get_withdraw_data(wallet_id: str, request: Request) -> WithdrawAllData
     :param request: request object
     :return: Dict containing repay data with list of token addresses
     """
-    contract_address, position_id, token_symbol = position_db_connector.get_repay_data(
-        wallet_id
+    contract_address, position_id, token_symbol = (
+        await position_db_connector.get_repay_data(wallet_id)
     )
     if not await PositionMixin.is_opened_position(contract_address):
         raise HTTPException(status_code=400, detail="Position was closed")
@@ -223,7 +260,8 @@ async def get_withdraw_data(wallet_id: str, request: Request) -> WithdrawAllData
     repay_data = await DepositMixin.get_repay_data(
         token_symbol, request.app.state.ekubo_contract
     )
-    extra_tokens = position_db_connector.get_extra_deposits_data(position_id).keys()
+    extra_deposits = await position_db_connector.get_extra_deposits_data(position_id)
+    extra_tokens = extra_deposits.keys()
     repay_data["position_id"] = str(position_id)
     repay_data["contract_address"] = contract_address
 
@@ -259,7 +297,7 @@ async def get_add_deposit_data(position_id: UUID, amount: str, token_symbol: str
     if not token_symbol:
         raise HTTPException(status_code=400, detail="Token symbol is required")
 
-    position = position_db_connector.get_position_by_id(position_id)
+    position = await position_db_connector.get_position_by_id(position_id)
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
 
@@ -293,17 +331,18 @@ async def add_extra_deposit(position_id: UUID, data: AddPositionDepositData):
     if not data.transaction_hash:
         raise HTTPException(status_code=400, detail="Transaction hash is required")
 
-    position = position_db_connector.get_position_by_id(position_id)
+    position = await position_db_connector.get_position_by_id(position_id)
     if not position:
         raise HTTPException(status_code=404, detail="Position not found")
 
-    position_db_connector.add_extra_deposit_to_position(
+    await position_db_connector.add_extra_deposit_to_position(
         position, data.token_symbol, data.amount
     )
 
-    transaction_db_connector.create_transaction(
+    await transaction_db_connector.create_transaction(
         position_id, data.transaction_hash, status=TransactionStatus.EXTRA_DEPOSIT.value
     )
+    await invalidate_dashboard(position_id=position_id)
 
     return {"detail": "Successfully added extra deposit"}
 
@@ -319,6 +358,7 @@ async def get_user_positions(
     wallet_id: str,
     start: int = Query(0, ge=0),
     limit: int = Query(PAGINATION_STEP, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
 ) -> UserPositionHistoryResponse:
     """
     Get all positions for a specific user by their wallet ID.
@@ -326,21 +366,42 @@ async def get_user_positions(
     :param wallet_id: Wallet ID of the user
     :param start: Starting index for pagination (default: 0)
     :param limit: Number of items per page (default: 10 from PAGINATION_STEP variable)
+    :param cursor: Cursor of the page from `next_cursor` of the previous response.
+     If given, `start` is ignored and the total count is not computed.
 
-    :return: UserPositionHistoryResponse with positions and total count
-    :raises: HTTPException: If wallet ID is empty or invalid
+    :return: UserPositionHistoryResponse with positions, total count
+     and the cursor of the next page
+    :raises: HTTPException: If wallet ID is empty or invalid, or the cursor is invalid
     """
     if not wallet_id:
         raise HTTPException(status_code=400, detail="Wallet ID is required")
 
-    positions = position_db_connector.get_all_positions_by_wallet_id(
-        wallet_id, start=start, limit=limit
+    if cursor:
+        try:
+            positions, next_cursor = (
+                await position_db_connector.get_positions_page_by_wallet_id(
+                    wallet_id, limit=limit, cursor=cursor
+                )
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return UserPositionHistoryResponse(
+            positions=positions, total_count=None, next_cursor=next_cursor
+        )
+
+    positions, total_positions = (
+        await position_db_connector.get_all_positions_with_count_by_wallet_id(
+            wallet_id, start=start, limit=limit
+        )
     )
-    total_positions = position_db_connector.get_count_positions_by_wallet_id(wallet_id)
-    
+    next_cursor = None
+    if positions and start + len(positions) < total_positions:
+        next_cursor = encode_position_cursor(
+            datetime.fromisoformat(positions[-1]["created_at"]), positions[-1]["id"]
+        )
+
     return UserPositionHistoryResponse(
-        positions=positions,
-        total_count=total_positions
+        positions=positions, total_count=total_positions, next_cursor=next_cursor
     )
 
 
@@ -357,8 +418,8 @@ async def get_list_of_deposited_tokens(position_id: UUID):
     :param position_id: UUID of the position
     :return Dict containing main position and extra positions
     """
-    main_position = position_db_connector.get_position_by_id(position_id)
-    extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
+    main_position = await position_db_connector.get_position_by_id(position_id)
+    extra_deposits = await position_db_connector.get_extra_deposits_by_position_id(
         position_id
     )
     return {"main": main_position, "extra_deposits": extra_deposits}
@@ -2,7 +2,7 @@
 Serializers for airdrop data.
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -13,6 +13,7 @@ class AirdropItem(BaseModel):
     proof: List[str]  # This needs to be List[str], not str
     is_claimed: bool
     recipient: str
+    round: Optional[int] = None
 
 
 class AirdropResponseModel(BaseModel):
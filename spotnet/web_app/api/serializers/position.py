@@ -121,8 +121,11 @@ class UserPositionHistoryResponse(BaseModel):
 
     ### Attributes:
     - **positions**: List of user positions
-    - **total_count**: Total number of positions for pagination
+    - **total_count**: Total number of positions for pagination,
+      None for pages requested by cursor
+    - **next_cursor**: Cursor of the next page, None on the last page
     """
 
     positions: List[UserPositionResponse] = []
-    total_count: int = 0
+    total_count: Optional[int] = 0
+    next_cursor: Optional[str] = None
@@ -0,0 +1,74 @@
+"""
+This module contains a collector of per-stage timings reported
+in the Server-Timing response header.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ServerTiming:
+    """
+    Collects the durations of the stages of a request, e.g. database reads and
+    RPC calls, and formats them as a Server-Timing header value.
+    Stages may run concurrently, each is timed on its own.
+    """
+
+    def __init__(self):
+        # stage name -> (duration in ms, description)
+        self.stages: dict[str, tuple[float, Optional[str]]] = {}
+
+    @contextmanager
+    def stage(self, name: str, description: str = None) -> Iterator[None]:
+        """
+        Time the code inside the scope as a stage.
+
+        :param name: Stage name, a token without spaces.
+        :param description: Optional human-readable description of the stage.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (
+                (time.perf_counter() - started) * 1000,
+                description,
+            )
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        """
+        Await an awaitable and time it as a stage.
+
+        :param name: Stage name, a token without spaces.
+        :param awaitable: The awaitable to time.
+        :return: The result of the awaitable.
+        """
+        with self.stage(name):
+            return await awaitable
+
+    def describe(self, name: str, description: str) -> None:
+        """
+        Set the description of a timed stage.
+
+        :param name: Stage name.
+        :param description: Human-readable description of the stage.
+        """
+        if name in self.stages:
+            self.stages[name] = (self.stages[name][0], description)
+
+    def header(self) -> str:
+        """
+        Format the stages as a Server-Timing header value.
+
+        :return: The header value, e.g. `db;dur=1.2, rpc;dur=40.5`.
+        """
+        metrics = []
+        for name, (duration, description) in self.stages.items():
+            metric = f"{name};dur={duration:.1f}"
+            if description:
+                metric += f';desc="{description}"'
+            metrics.append(metric)
+        return ", ".join(metrics)
@@ -21,17 +21,19 @@ from web_app.api.serializers.user import (
 from web_app.contract_tools.blockchain_call import CLIENT
 from web_app.contract_tools.mixins import DashboardMixin, PositionMixin
 from web_app.db.crud import (
-    PositionDBConnector,
-    TelegramUserDBConnector,
-    UserDBConnector,
+    AsyncPositionDBConnector,
+    AsyncStatsDBConnector,
+    AsyncTelegramUserDBConnector,
+    AsyncUserDBConnector,
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter()  # Initialize the router
-telegram_db = TelegramUserDBConnector()
+telegram_db = AsyncTelegramUserDBConnector()
 
-user_db = UserDBConnector()
-position_db = PositionDBConnector()
+user_db = AsyncUserDBConnector()
+position_db = AsyncPositionDBConnector()
+stats_db = AsyncStatsDBConnector()
 
 
 @router.get(
@@ -48,8 +50,8 @@ async def has_user_opened_position(wallet_id: str) -> dict:
     :raises: HTTPException
     """
     try:
-        has_position = position_db.has_opened_position(wallet_id)
-        contract_address = user_db.get_contract_address_by_wallet_id(wallet_id)
+        has_position = await position_db.has_opened_position(wallet_id)
+        contract_address = await user_db.get_contract_address_by_wallet_id(wallet_id)
         if contract_address is None:
             return {"has_opened_position": False}
         is_position_opened = await PositionMixin.is_opened_position(contract_address)
@@ -76,7 +78,7 @@ async def get_user_contract(wallet_id: str) -> str:
     :return: int
     :raises: HTTPException :return: Dict containing status code and detail
     """
-    user = user_db.get_user_by_wallet_id(wallet_id)
+    user = await user_db.get_user_by_wallet_id(wallet_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     elif not user.is_contract_deployed:
@@ -104,11 +106,11 @@ async def check_user(wallet_id: str) -> CheckUserResponse:
     The contract deployment status
     """
 
-    user = user_db.get_user_by_wallet_id(wallet_id)
+    user = await user_db.get_user_by_wallet_id(wallet_id)
     if user and not user.is_contract_deployed:
         return {"is_contract_deployed": False}
     elif not user:
-        user_db.create_user(wallet_id)
+        await user_db.create_user(wallet_id)
         return {"is_contract_deployed": False}
     else:
         return {"is_contract_deployed": True}
@@ -135,9 +137,9 @@ async def update_user_contract(
     The contract deployment status
     """
 
-    user = user_db.get_user_by_wallet_id(data.wallet_id)
+    user = await user_db.get_user_by_wallet_id(data.wallet_id)
     if user:
-        user_db.update_user_contract(user, data.contract_address)
+        await user_db.update_user_contract(user, data.contract_address)
         return {"is_contract_deployed": True}
     else:
         return {"is_contract_deployed": False}
@@ -162,7 +164,7 @@ async def subscribe_to_notification(
     ### Returns:
     Success status of the subscription.
     """
-    user = user_db.get_user_by_wallet_id(data.wallet_id)
+    user = await user_db.get_user_by_wallet_id(data.wallet_id)
     # Check if the user exists; if not, raise a 404 error
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -170,12 +172,12 @@ async def subscribe_to_notification(
     telegram_id = data.telegram_id
     # Is not provided, attempt to retrieve it from the database
     if not telegram_id:
-        tg_user = telegram_db.get_telegram_user_by_wallet_id(data.wallet_id)
+        tg_user = await telegram_db.get_telegram_user_by_wallet_id(data.wallet_id)
         if tg_user:
             telegram_id = tg_user.telegram_id
     # Is found, set the notification preference for the user
     if telegram_id:
-        telegram_db.set_allow_notification(telegram_id, data.wallet_id)
+        await telegram_db.set_allow_notification(telegram_id, data.wallet_id)
         return {"detail": "User subscribed to notifications successfully"}
 
     # If no Telegram ID is available, raise
@@ -202,7 +204,7 @@ async def get_user_contract_address(wallet_id: str) -> GetUserContractAddressRes
     The contract address or None if it does not exists.
     """
 
-    contract_address = user_db.get_contract_address_by_wallet_id(wallet_id)
+    contract_address = await user_db.get_contract_address_by_wallet_id(wallet_id)
     if contract_address:
         return {"contract_address": contract_address}
     else:
@@ -227,10 +229,10 @@ async def get_stats() -> GetStatsResponse:
     - unique_users: Total count of unique users.
     """
     try:
-        # Fetch open positions amounts by token
-        token_amounts = position_db.get_total_amounts_for_open_positions()
+        # Read the maintained token totals and unique users count
+        token_amounts, unique_users = await stats_db.get_platform_stats()
 
-        # Fetch current prices
+        # Fetch current prices from the shared price cache
         current_prices = await DashboardMixin.get_current_prices()
 
         # Convert all token amounts to USDC
@@ -252,7 +254,6 @@ async def get_stats() -> GetStatsResponse:
             usdc_equivalent = amount * Decimal(usdc_price)
             total_opened_amount += usdc_equivalent
 
-        unique_users = user_db.get_unique_users_count()
         return GetStatsResponse(
             total_opened_amount=total_opened_amount, unique_users=unique_users
         )
@@ -19,10 +19,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/vault", tags=["vault"])
 
 
+def get_deposit_connector() -> DepositDBConnector:
+    """
+    Get a deposit connector on the default database. The connector is not
+    a dependency itself, as FastAPI would expose its arguments as query
+    parameters.
+    """
+    return DepositDBConnector()
+
+
 @router.post("/deposit", response_model=VaultDepositResponse)
 async def deposit_to_vault(
     request: VaultDepositRequest,
-    deposit_connector: DepositDBConnector = Depends(DepositDBConnector),
+    deposit_connector: DepositDBConnector = Depends(get_deposit_connector),
 ) -> VaultDepositResponse:
     """
     Process a vault deposit request.
@@ -54,7 +63,7 @@ async def deposit_to_vault(
 async def get_user_vault_balance(
     wallet_id: str,
     symbol: str,
-    deposit_connector: DepositDBConnector = Depends(DepositDBConnector),
+    deposit_connector: DepositDBConnector = Depends(get_deposit_connector),
 ) -> VaultBalanceResponse:
     """
     Get the balance of a user's vault for a specific token.
@@ -70,7 +79,7 @@ async def get_user_vault_balance(
 @router.post("/add_balance", response_model=UpdateVaultBalanceResponse)
 async def add_vault_balance(
     request: UpdateVaultBalanceRequest,
-    deposit_connector: DepositDBConnector = Depends(DepositDBConnector),
+    deposit_connector: DepositDBConnector = Depends(get_deposit_connector),
 ) -> UpdateVaultBalanceResponse:
     """
     Add balance to a user's vault for a specific token.
@@ -0,0 +1,4 @@
+"""
+Benchmarks of the web application hot paths. Run a benchmark as a module, e.g.
+`python -m web_app.benchmarks.health_snapshot`.
+"""
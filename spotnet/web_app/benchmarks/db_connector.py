@@ -0,0 +1,115 @@
+"""
+Benchmark of concurrent API request throughput with the sync DBConnector called
+from async handlers against the AsyncDBConnector. Runs against the database of
+the DB_* environment variables with the Alembic migrations applied, or against
+the databases of BENCHMARK_DB_URL and BENCHMARK_ASYNC_DB_URL when set, e.g.
+sqlite:///spotnet.db and sqlite+aiosqlite:///spotnet.db.
+
+Usage: python -m web_app.benchmarks.db_connector [requests] [concurrency]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from web_app.db.crud import AsyncUserDBConnector, UserDBConnector
+from web_app.db.database import ASYNC_SQLALCHEMY_DATABASE_URL, SQLALCHEMY_DATABASE_URL
+from web_app.db.models import Base
+
+app = FastAPI()
+user_db = UserDBConnector(os.environ.get("BENCHMARK_DB_URL", SQLALCHEMY_DATABASE_URL))
+async_user_db = AsyncUserDBConnector(
+    os.environ.get("BENCHMARK_ASYNC_DB_URL", ASYNC_SQLALCHEMY_DATABASE_URL)
+)
+
+
+@app.get("/sync")
+async def sync_handler() -> int:
+    """
+    Handler blocking the event loop on the sync connector.
+    """
+    return user_db.get_unique_users_count()
+
+
+@app.get("/async")
+async def async_handler() -> int:
+    """
+    Handler awaiting the async connector.
+    """
+    return await async_user_db.get_unique_users_count()
+
+
+async def run(path: str, count: int, concurrency: int) -> tuple[float, float]:
+    """
+    Send `count` requests to `path` with `concurrency` requests in flight,
+    while a heartbeat measures how long the event loop is blocked.
+
+    :param path: The endpoint path.
+    :param count: The number of requests.
+    :param concurrency: The number of requests in flight.
+    :return: Requests per second and the longest event loop stall in seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    max_stall = 0.0
+
+    async def heartbeat() -> None:
+        """
+        Record the longest delay of a 1 ms sleep past its deadline.
+        """
+        nonlocal max_stall
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_stall = max(max_stall, time.perf_counter() - start - 0.001)
+
+    async def request(client: AsyncClient) -> None:
+        """
+        Send one request once a slot is free.
+        """
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+        # Warm up the connection pools
+        await request(client)
+        monitor = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*(request(client) for _ in range(count)))
+        elapsed = time.perf_counter() - start
+        monitor.cancel()
+    return count / elapsed, max_stall
+
+
+async def main(count: int, concurrency: int) -> None:
+    """
+    Run the benchmark on both endpoints and print the results.
+
+    :param count: The number of requests per endpoint.
+    :param concurrency: The number of requests in flight.
+    """
+    if user_db.engine.url.get_backend_name() == "sqlite":
+        Base.metadata.create_all(user_db.engine)
+    print(f"requests:    {count}, concurrency: {concurrency}")
+    for path in ("/sync", "/async"):
+        throughput, max_stall = await run(path, count, concurrency)
+        print(
+            f"{path:<12} {throughput:8.1f} req/s, "
+            f"max event loop stall {max_stall * 1000:.1f} ms"
+        )
+    await async_user_db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        )
+    )
@@ -0,0 +1,67 @@
+"""
+Benchmark of the vectorized health metrics against the per-position Decimal path.
+
+Usage: python -m web_app.benchmarks.health_snapshot [positions]
+"""
+
+import random
+import sys
+import time
+from decimal import Decimal
+
+from web_app.contract_tools.constants import ZKLEND_SCALE_DECIMALS
+from web_app.contract_tools.health_snapshot import PositionSnapshot
+from web_app.contract_tools.mixins.health_ratio import HealthRatioMixin
+
+ACCUMULATORS = {token: 10**27 for token in ("ETH", "STRK", "USDC", "kSTRK")}
+PRICES = {
+    "ETH": Decimal("3150.25"),
+    "STRK": Decimal("0.4312"),
+    "USDC": Decimal("0.9998"),
+    "kSTRK": Decimal("0.4498"),
+}
+
+
+def main(count: int) -> None:
+    """
+    Compute the health metrics of `count` random positions with both paths.
+
+    :param count: The number of positions.
+    """
+    rng = random.Random(0)
+    z_balances = {
+        hex(index + 1): {"ETH": str(round(rng.uniform(0.1, 100), 6))}
+        for index in range(count)
+    }
+    debts = {
+        address: {"USDC": rng.randint(100, 100_000) * 10**6} for address in z_balances
+    }
+
+    start = time.perf_counter()
+    for address, balances in z_balances.items():
+        deposits = {
+            token: Decimal(balance)
+            * Decimal(ACCUMULATORS[token])
+            / ZKLEND_SCALE_DECIMALS
+            for token, balance in balances.items()
+        }
+        HealthRatioMixin._calculate_health_ratio_and_tvl(
+            "USDC", debts[address]["USDC"], deposits, PRICES
+        )
+    decimal_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    snapshot = PositionSnapshot.from_inputs(z_balances, debts, ACCUMULATORS, PRICES)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    snapshot.compute()
+    compute_time = time.perf_counter() - start
+
+    print(f"positions:            {count}")
+    print(f"Decimal path:         {decimal_time * 1000:.1f} ms")
+    print(f"snapshot build:       {build_time * 1000:.1f} ms")
+    print(f"vectorized compute:   {compute_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,115 @@
+"""
+Benchmark of the batched portfolio fetch against one awaited balance call per
+z-token, on a simulated node with a fixed round trip time.
+
+Usage: python -m web_app.benchmarks.portfolio [contracts] [round trip ms]
+"""
+
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import RpcHttpClient
+
+from web_app.contract_tools.blockchain_call import StarknetClient
+from web_app.contract_tools.constants import TokenParams
+
+
+class SimulatedNode:
+    """
+    Answers balanceOf calls, single or batched, after one round trip each.
+    """
+
+    def __init__(self, round_trip: float):
+        self.round_trip = round_trip
+        self.round_trips = 0
+
+    async def call_contract(self, call, **kwargs) -> list[int]:
+        """
+        Answer a single contract call with the holder address as the balance.
+        """
+        self.round_trips += 1
+        await asyncio.sleep(self.round_trip)
+        return [call.calldata[0], 0]
+
+    async def request(self, **kwargs) -> list[dict]:
+        """
+        Answer a JSON-RPC batch with the holder addresses as the balances.
+        """
+        self.round_trips += 1
+        await asyncio.sleep(self.round_trip)
+        return [
+            {"id": item["id"], "result": [item["params"]["request"]["calldata"][0]]}
+            for item in kwargs["payload"]
+        ]
+
+
+async def fetch_sequentially(client: StarknetClient, contract_address: str) -> dict:
+    """
+    The former `fetch_portfolio`: z-token balances awaited one at a time.
+
+    :param client: The Starknet client.
+    :param contract_address: The contract address.
+    :return: A dictionary with z-token symbols as keys and balances as values.
+    """
+    results = {}
+    for token, (decimals, z_address, _) in (await client.get_z_addresses()).items():
+        balance = await client.get_balance(z_address, contract_address)
+        results[f"z{token}"] = {"balance": balance, "decimals": decimals}
+    return results
+
+
+async def main(count: int, round_trip_ms: float) -> None:
+    """
+    Fetch the portfolios of `count` contracts with both paths.
+
+    :param count: The number of contracts.
+    :param round_trip_ms: The simulated round trip time in milliseconds.
+    """
+    client = StarknetClient(node_url="http://benchmark")
+    client._zklend_token_params.set(
+        "params",
+        {
+            token.name: (int(token.decimals), index)
+            for index, token in enumerate(TokenParams.tokens())
+        },
+    )
+    client._zklend_accumulators.set(
+        "accumulators", {token.name: 10**27 for token in TokenParams.tokens()}, ttl=None
+    )
+    addresses = [hex(index + 1) for index in range(count)]
+    node = SimulatedNode(round_trip_ms / 1000)
+
+    with patch.object(FullNodeClient, "call_contract", node.call_contract):
+        start = time.perf_counter()
+        for address in addresses:
+            await fetch_sequentially(client, address)
+        sequential_time = time.perf_counter() - start
+    sequential_round_trips, node.round_trips = node.round_trips, 0
+
+    with patch.object(RpcHttpClient, "request", node.request):
+        start = time.perf_counter()
+        await client.fetch_portfolios(addresses)
+        batched_time = time.perf_counter() - start
+
+    tokens = len(list(TokenParams.tokens()))
+    print(f"contracts x tokens:   {count} x {tokens}")
+    print(
+        f"sequential:           {sequential_time * 1000:.1f} ms, "
+        f"{sequential_round_trips} round trips"
+    )
+    print(
+        f"batched:              {batched_time * 1000:.1f} ms, "
+        f"{node.round_trips} round trips"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+            float(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        )
+    )
@@ -0,0 +1,224 @@
+"""
+This module contains an on-disk cache of contract ABIs.
+
+ABIs are stored as JSON files keyed by class hash, next to an index of the class
+hash deployed at each contract address. A contract can then be built from disk
+without any RPC call, while a background refresh checks whether the contract was
+upgraded to a new class and fetches that class only if its ABI is not on disk.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+from starknet_py.contract import Contract
+from starknet_py.net.client import Client
+from starknet_py.net.client_models import SierraContractClass
+from starknet_py.proxy.contract_abi_resolver import ContractAbiResolver
+
+from .blockchain_call import CLIENT
+from .constants import EKUBO_MAINNET_ADDRESS, ZKLEND_MARKET_ADDRESS
+
+logger = logging.getLogger(__name__)
+
+ABI_CACHE_DIR = os.environ.get("ABI_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "spotnet", "abi"
+)
+# Seconds between checks for upgraded contract classes
+ABI_REFRESH_INTERVAL = float(os.environ.get("ABI_REFRESH_INTERVAL", 3600))
+# Seconds before the first retry of a contract that failed to load, doubled
+# after each failure up to ABI_REFRESH_INTERVAL
+ABI_RETRY_DELAY = float(os.environ.get("ABI_RETRY_DELAY", 5))
+# Contracts whose ABIs are kept warm
+CACHED_CONTRACTS = (EKUBO_MAINNET_ADDRESS, ZKLEND_MARKET_ADDRESS)
+
+
+class ContractAbiCache:
+    """
+    Contract ABIs persisted on disk by class hash, and the contracts built from
+    them kept in memory.
+    """
+
+    INDEX_FILE = "addresses.json"
+
+    def __init__(self, client: Client, cache_dir: str = ABI_CACHE_DIR):
+        """
+        :param client: The client to fetch classes with and to bind contracts to.
+        :param cache_dir: The directory of the ABI files.
+        """
+        self.client = client
+        self.cache_dir = Path(cache_dir)
+        self._contracts: dict[int, Contract] = {}
+
+    async def get_contract(self, address: str) -> Contract:
+        """
+        Get a contract, built from the ABI on disk if it is cached there,
+        otherwise fetched from the node and cached.
+
+        :param address: The contract address.
+        :return: The contract.
+        """
+        address_int = int(address, 16)
+        contract = self._contracts.get(address_int)
+        if contract is None:
+            contract = self.load(address) or await self.fetch(address)
+        return contract
+
+    def load(self, address: str) -> Optional[Contract]:
+        """
+        Build a contract from the ABI on disk.
+
+        :param address: The contract address.
+        :return: The contract, or None if its ABI is not cached.
+        """
+        address_int = int(address, 16)
+        class_hash = self._read_index().get(hex(address_int))
+        cached_abi = self._read_abi(int(class_hash, 16)) if class_hash else None
+        if cached_abi is None:
+            return None
+        abi, cairo_version = cached_abi
+        return self._set_contract(address_int, abi, cairo_version)
+
+    async def fetch(self, address: str) -> Contract:
+        """
+        Get the class hash deployed at an address from the node and build the
+        contract from it. The class itself is fetched only if its ABI is not on disk.
+
+        :param address: The contract address.
+        :return: The contract.
+        """
+        address_int = int(address, 16)
+        class_hash = await self.client.get_class_hash_at(contract_address=address_int)
+        cached_abi = self._read_abi(class_hash)
+        if cached_abi is None:
+            contract_class = await self.client.get_class_by_hash(class_hash=class_hash)
+            cached_abi = (
+                ContractAbiResolver._get_abi_from_contract_class(contract_class),
+                1 if isinstance(contract_class, SierraContractClass) else 0,
+            )
+            self._write_abi(class_hash, *cached_abi)
+            logger.info(f"Cached ABI of class {hex(class_hash)} at {address}")
+        self._write_index(address_int, class_hash)
+        return self._set_contract(address_int, *cached_abi)
+
+    async def refresh(self, addresses: Iterable[str] = CACHED_CONTRACTS) -> None:
+        """
+        Fetch the current classes of contracts, failures are logged and the
+        cached contracts stay in use.
+
+        :param addresses: The contract addresses.
+        """
+        addresses = list(addresses)
+        results = await asyncio.gather(
+            *(self.fetch(address) for address in addresses), return_exceptions=True
+        )
+        for address, result in zip(addresses, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to refresh the ABI of {address}: {result!r}")
+
+    def get_cached(self, address: str) -> Optional[Contract]:
+        """
+        Get a contract built by this cache, without any disk or RPC access.
+
+        :param address: The contract address.
+        :return: The contract, or None if it was not built yet.
+        """
+        return self._contracts.get(int(address, 16))
+
+    def _set_contract(self, address: int, abi: list, cairo_version: int) -> Contract:
+        """
+        Build a contract and keep it in memory.
+
+        :param address: The contract address.
+        :param abi: The contract ABI.
+        :param cairo_version: The Cairo version of the contract class.
+        :return: The contract.
+        """
+        contract = Contract(
+            address=address,
+            abi=abi,
+            provider=self.client,
+            cairo_version=cairo_version,
+        )
+        self._contracts[address] = contract
+        return contract
+
+    def _abi_path(self, class_hash: int) -> Path:
+        """
+        Get the path of the ABI file of a class.
+
+        :param class_hash: The class hash.
+        :return: The file path.
+        """
+        return self.cache_dir / f"{class_hash:#066x}.json"
+
+    def _read_abi(self, class_hash: int) -> Optional[tuple[list, int]]:
+        """
+        Read the ABI of a class from disk.
+
+        :param class_hash: The class hash.
+        :return: Tuple with the ABI and the Cairo version, or None if not cached.
+        """
+        try:
+            data = json.loads(self._abi_path(class_hash).read_text())
+        except (OSError, ValueError):
+            return None
+        return data["abi"], data["cairo_version"]
+
+    def _write_abi(self, class_hash: int, abi: list, cairo_version: int) -> None:
+        """
+        Write the ABI of a class to disk.
+
+        :param class_hash: The class hash.
+        :param abi: The contract ABI.
+        :param cairo_version: The Cairo version of the class.
+        """
+        self._write_json(
+            self._abi_path(class_hash), {"abi": abi, "cairo_version": cairo_version}
+        )
+
+    def _read_index(self) -> dict[str, str]:
+        """
+        Read the class hashes of the cached contract addresses.
+
+        :return: A dictionary with hex addresses as keys and hex class hashes as values.
+        """
+        try:
+            return json.loads((self.cache_dir / self.INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, address: int, class_hash: int) -> None:
+        """
+        Record the class hash deployed at an address.
+
+        :param address: The contract address.
+        :param class_hash: The class hash.
+        """
+        index = self._read_index()
+        if index.get(hex(address)) == hex(class_hash):
+            return
+        index[hex(address)] = hex(class_hash)
+        self._write_json(self.cache_dir / self.INDEX_FILE, index)
+
+    def _write_json(self, path: Path, data: dict) -> None:
+        """
+        Write a JSON file atomically, so concurrent readers never see a partial file.
+        Failures are logged, the cache then works from memory only.
+
+        :param path: The file path.
+        :param data: The JSON-serializable data.
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write {path}: {e}")
+
+
+ABI_CACHE = ContractAbiCache(CLIENT.client)
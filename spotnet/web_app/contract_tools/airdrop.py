@@ -2,10 +2,24 @@
 This module defines the contract tools for the airdrop data.
 """
 
-from typing import List
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Iterable, List
+
 from web_app.api.serializers.airdrop import AirdropItem, AirdropResponseModel
 from web_app.contract_tools.api_request import APIRequest
+from web_app.contract_tools.cache import AsyncTTLCache
 from web_app.contract_tools.constants import TokenParams
+from web_app.db.crud import AirDropDBConnector
+from web_app.db.models import get_proof_hash
+
+logger = logging.getLogger(__name__)
+
+# Hours cached proofs are used before the reward API is asked for new rounds
+AIRDROP_PROOF_TTL = float(os.environ.get("AIRDROP_PROOF_TTL", 24))
 
 
 class ZkLendAirdrop:
@@ -60,11 +74,172 @@ class ZkLendAirdrop:
                 ],  # This is correct now as AirdropItem expects List[str]
                 is_claimed=item["is_claimed"],
                 recipient=item["recipient"],
+                round=item.get("round"),
             )
             validated_items.append(validated_item)
         return AirdropResponseModel(airdrops=validated_items)
 
 
+class AirdropProofCache:
+    """
+    A persistent cache of the zkLend reward items of contracts, keyed by contract
+    and proof hash in the airdrop_proof table. Proofs of a published round never
+    change, so the reward API is only asked for contracts that are not cached or
+    whose items are older than the TTL, which picks up new rounds. Concurrent
+    fetches of the same contract share one reward API request.
+    """
+
+    def __init__(
+        self,
+        airdrop: ZkLendAirdrop = None,
+        db_connector: AirDropDBConnector = None,
+        ttl: float = AIRDROP_PROOF_TTL,
+        max_concurrency: int = 8,
+    ):
+        """
+        :param airdrop: The reward API client.
+        :param db_connector: The connector of the airdrop_proof table.
+        :param ttl: Hours cached items are used.
+        :param max_concurrency: Reward API requests in flight at the same time.
+        """
+        self.airdrop = airdrop or ZkLendAirdrop()
+        self.db_connector = db_connector or AirDropDBConnector()
+        self.ttl = timedelta(hours=ttl)
+        self.max_concurrency = max_concurrency
+        self._responses: dict[str, AirdropResponseModel] = {}
+        # Contracts known to be missing from the database
+        self._not_cached: set[str] = set()
+        # Reward API requests in flight, the fetched items are kept in _responses
+        self._fetches = AsyncTTLCache(ttl=0)
+
+    async def get_contract_airdrop(self, contract_id: str) -> AirdropResponseModel:
+        """
+        Get the reward items of a contract, from memory, the database or the
+        reward API, in that order.
+
+        :param contract_id: The ID of the contract.
+        :return: The validated airdrop items of the contract.
+        :raises ValueError: If contract_id is None
+        """
+        if contract_id not in self._responses:
+            if contract_id in self._not_cached or await self.prefetch(
+                [contract_id], fetch_missing=False
+            ):
+                await self._fetch_and_save([contract_id])
+        return self._responses[contract_id]
+
+    async def prefetch(
+        self, contract_ids: Iterable[str], fetch_missing: bool = True
+    ) -> list[str]:
+        """
+        Load the cached reward items of many contracts with one query, and fetch
+        the missing ones from the reward API concurrently.
+
+        :param contract_ids: The IDs of the contracts.
+        :param fetch_missing: Fetch contracts that are not cached, or only load
+         the cached ones.
+        :return: The IDs of the contracts that are still missing.
+        """
+        contract_ids = [
+            contract_id
+            for contract_id in dict.fromkeys(contract_ids)
+            if contract_id not in self._responses
+        ]
+        if not contract_ids:
+            return []
+        cached = await asyncio.to_thread(
+            self.db_connector.get_cached_proofs,
+            contract_ids,
+            datetime.now() - self.ttl,
+        )
+        for contract_id, items in cached.items():
+            self._responses[contract_id] = AirdropResponseModel(
+                airdrops=[AirdropItem(**item) for item in items]
+            )
+        missing = [
+            contract_id for contract_id in contract_ids if contract_id not in cached
+        ]
+        self._not_cached.update(missing)
+        if missing and fetch_missing:
+            await self._fetch_and_save(missing, raise_errors=False)
+        return [
+            contract_id for contract_id in missing if contract_id not in self._responses
+        ]
+
+    async def mark_claimed(self, proof_hashes: dict[str, list[str]]) -> None:
+        """
+        Mark reward items as claimed, so cached items are not claimed again.
+
+        :param proof_hashes: A dictionary with contract IDs as keys and the
+         `get_proof_hash` of the claimed items as values.
+        """
+        for contract_id, contract_hashes in proof_hashes.items():
+            response = self._responses.get(contract_id)
+            for item in response.airdrops if response else []:
+                if get_proof_hash(item.proof) in contract_hashes:
+                    item.is_claimed = True
+        await asyncio.to_thread(self.db_connector.mark_proofs_claimed, proof_hashes)
+
+    async def _fetch_and_save(
+        self, contract_ids: list[str], raise_errors: bool = True
+    ) -> None:
+        """
+        Fetch the reward items of contracts from the reward API, at most
+        `max_concurrency` at a time, and cache them. Contracts already being
+        fetched by another caller wait for that request, which saves the items.
+
+        :param contract_ids: The IDs of the contracts.
+        :param raise_errors: Raise the first fetch error, or log the errors.
+        """
+        # A request of another caller may have finished since the database read
+        contract_ids = [
+            contract_id
+            for contract_id in contract_ids
+            if contract_id not in self._responses
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Contracts whose request was started by this call
+        started = set()
+
+        async def _fetch(contract_id: str) -> AirdropResponseModel:
+            """Fetch the reward items of a contract and keep them in memory."""
+            started.add(contract_id)
+            async with semaphore:
+                response = await self.airdrop.get_contract_airdrop(contract_id)
+            self._responses[contract_id] = response
+            return response
+
+        responses = await asyncio.gather(
+            *(
+                asyncio.shield(
+                    self._fetches.refresh(contract_id, partial(_fetch, contract_id))
+                )
+                for contract_id in contract_ids
+            ),
+            return_exceptions=True,
+        )
+        fetched = {}
+        for contract_id, response in zip(contract_ids, responses):
+            if isinstance(response, Exception):
+                if raise_errors:
+                    raise response
+                logger.warning(f"Failed to fetch airdrop of {contract_id}: {response}")
+                continue
+            fetched[contract_id] = response
+        self._not_cached.difference_update(fetched)
+        try:
+            await asyncio.to_thread(
+                self.db_connector.save_proofs,
+                {
+                    contract_id: [item.model_dump() for item in response.airdrops]
+                    for contract_id, response in fetched.items()
+                    if contract_id in started
+                },
+            )
+        except Exception as e:  # The fetched items are still served from memory
+            logger.warning(f"Failed to cache airdrop proofs: {e}")
+
+
 if __name__ == "__main__":
     airdrop_fetcher = ZkLendAirdrop()
     result = airdrop_fetcher.get_contract_airdrop(
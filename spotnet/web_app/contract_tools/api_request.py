@@ -2,12 +2,131 @@
 This module handles API requests.
 """
 
+import asyncio
+import os
+from typing import Optional
+
 import aiohttp
 
+# Connections open at the same time, in total and per host
+HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", 100))
+HTTP_POOL_LIMIT_PER_HOST = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", 20))
+# Seconds resolved host names are cached
+HTTP_DNS_CACHE_TTL = 300
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+
+
+class HTTPSessionPool:
+    """
+    A process-wide aiohttp session with a pooled connector, so requests reuse
+    keep-alive connections instead of opening a new session each time.
+    The session is created lazily and recreated if it was closed or belongs
+    to another event loop, as in Celery tasks run with `asyncio.run`. Each
+    session is closed on its own loop when the loop shuts down, so sessions
+    of finished loops do not leak their connections.
+    """
+
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache: int = HTTP_DNS_CACHE_TTL,
+        timeout: aiohttp.ClientTimeout = HTTP_TIMEOUT,
+    ):
+        """
+        :param limit: Maximum number of open connections.
+        :param limit_per_host: Maximum number of open connections to one host.
+        :param ttl_dns_cache: Seconds resolved host names are cached.
+        :param timeout: Timeouts of every request.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closer: Optional[asyncio.Task] = None
+        self.sessions_created = 0
+        self.requests = 0
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session of the running event loop.
+
+        :return: The session.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+            self._loop = loop
+            # `asyncio.run` cancels the tasks left when its coroutine returns
+            self._closer = loop.create_task(self._close_on_shutdown(self._session))
+            self.sessions_created += 1
+        self.requests += 1
+        return self._session
+
+    @staticmethod
+    async def _close_on_shutdown(session: aiohttp.ClientSession) -> None:
+        """
+        Wait until cancelled, when the event loop shuts down, then close the session.
+
+        :param session: The session of the event loop.
+        """
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if not session.closed:
+                await session.close()
+
+    async def close(self) -> None:
+        """
+        Close the shared session and its connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._closer is not None:
+            self._closer.cancel()
+        self._session = None
+        self._loop = None
+        self._closer = None
+
+    def stats(self) -> dict:
+        """
+        Get statistics of the connection pool.
+
+        :return: The pool limits, the connections in use and idle,
+         the number of requests and of sessions created.
+        """
+        connector = None
+        if self._session is not None and not self._session.closed:
+            connector = self._session.connector
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_use": len(getattr(connector, "_acquired", ())),
+            "idle": sum(
+                len(connections)
+                for connections in getattr(connector, "_conns", {}).values()
+            ),
+            "requests": self.requests,
+            "sessions_created": self.sessions_created,
+        }
+
+
+HTTP_SESSION_POOL = HTTPSessionPool()
+
 
 class APIRequest:
     """
-    A class to send asynchronous requests to an API.
+    A class to send asynchronous requests to an API
+    through the process-wide HTTP session pool.
     """
 
     DEFAULT_HEADER = {
@@ -32,14 +151,13 @@ class APIRequest:
         if headers:
             request_headers.update(headers)
 
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.get(
-                url, params=params, headers=request_headers
-            ) as response:
-                if response.ok:
-                    return await response.json()
-                return {}
+        url = f"{self.base_url}{endpoint}"
+        async with HTTP_SESSION_POOL.session().get(
+            url, params=params, headers=request_headers
+        ) as response:
+            if response.ok:
+                return await response.json()
+            return {}
 
     async def post(self, endpoint: str, data: dict = None, headers: dict = None):
         """
@@ -50,11 +168,12 @@ class APIRequest:
         :param headers: Headers to include in the request.
         :return: The response from the API as JSON.
         """
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.post(url, json=data, headers=headers) as response:
-                response.raise_for_status()  # Raise an exception for bad status codes
-                return await response.json()
+        url = f"{self.base_url}{endpoint}"
+        async with HTTP_SESSION_POOL.session().post(
+            url, json=data, headers=headers
+        ) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            return await response.json()
 
     async def fetch_text(
         self, endpoint: str, params: dict = None, headers: dict = None
@@ -67,11 +186,12 @@ class APIRequest:
         :param headers: Headers to include in the request.
         :return: The response from the API as text.
         """
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}{endpoint}"
-            async with session.get(url, params=params, headers=headers) as response:
-                response.raise_for_status()  # Raise an exception for bad status codes
-                return await response.text()
+        url = f"{self.base_url}{endpoint}"
+        async with HTTP_SESSION_POOL.session().get(
+            url, params=params, headers=headers
+        ) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            return await response.text()
 
 
 # Example usage:
@@ -5,21 +5,35 @@ This module handles the blockchain calls.
 import asyncio
 import logging
 import os
-import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from decimal import Decimal
+from fractions import Fraction
 from math import floor
-from typing import Any, List
+from typing import Any, AsyncIterator, Hashable, List, Optional
 
 import starknet_py.cairo.felt
 import starknet_py.hash.selector
 import starknet_py.net.client_models
 import starknet_py.net.networks
+from .cache import AsyncTTLCache
 from .constants import MULTIPLIER_POWER, ZKLEND_MARKET_ADDRESS, TokenParams
+from .ekubo_pool import PoolState, to_decimal
+from .portfolio import Portfolio, ZTokenBalance
+from .retry import RetryPolicy
+from .rpc_batch import RpcBatcher
 from starknet_py.contract import Contract
 from starknet_py.net.full_node_client import FullNodeClient
 
 logger = logging.getLogger(__name__)
 
+# Batcher of the innermost `StarknetClient.batch()` scope of the current task
+_active_batcher: ContextVar[Optional[RpcBatcher]] = ContextVar(
+    "active_batcher", default=None
+)
+# Block of the innermost `StarknetClient.snapshot()` scope of the current task
+_snapshot_block: ContextVar[Optional[int]] = ContextVar("snapshot_block", default=None)
+
 
 class RepayDataException(Exception):
     """
@@ -37,17 +51,118 @@ class StarknetClient:
     FEE = 0x20C49BA5E353F80000000000000000
     TICK_SPACING = 1000
     EXTENSION = 0
-    SLEEP_TIME = 10
+    # Seconds the zkLend lending accumulators are reused, about one block
+    ACCUMULATOR_TTL = 10
+    # Seconds the latest block number is reused
+    BLOCK_NUMBER_TTL = 5
 
-    def __init__(self):
+    def __init__(self, node_url: str = None, retry_policy: RetryPolicy = None):
         """
         Initializes the Starknet client with a given node URL.
+
+        :param node_url: The node URL, defaults to the STARKNET_NODE_URL variable.
+        :param retry_policy: The retry policy of contract calls.
         """
-        node_url = os.getenv("STARKNET_NODE_URL") or "http://51.195.57.196:6060/v0_7"
+        node_url = (
+            node_url
+            or os.getenv("STARKNET_NODE_URL")
+            or "http://51.195.57.196:6060/v0_7"
+        )
         if not node_url:
             raise ValueError("STARKNET_NODE_URL environment variable is not set")
 
         self.client = FullNodeClient(node_url=node_url)
+        self.retry_policy = retry_policy or RetryPolicy()
+        # zkLend reserve decimals and z-token addresses do not change,
+        # the lending accumulators change once per block
+        self._zklend_token_params = AsyncTTLCache(ttl=None)
+        self._zklend_accumulators = AsyncTTLCache(ttl=self.ACCUMULATOR_TTL)
+        self._block_number = AsyncTTLCache(ttl=self.BLOCK_NUMBER_TTL)
+        # Pool keys of the supported token pairs, built once
+        self._ekubo_pool_keys = {
+            (token0.address, token1.address): self._build_ekubo_pool_key(
+                token0.address, token1.address
+            )
+            for token0 in TokenParams.tokens()
+            for token1 in TokenParams.tokens()
+            if token0 != token1
+        }
+        # pool key values -> (block number, future of the pool state at that block)
+        self._ekubo_pool_states: dict[tuple, tuple[int, asyncio.Future]] = {}
+        # Window in milliseconds to collect calls outside of an explicit batch scope,
+        # 0 disables implicit batching
+        batch_window = float(os.getenv("STARKNET_RPC_BATCH_WINDOW_MS") or 0)
+        self._batcher = (
+            RpcBatcher(self.client._client, window=batch_window / 1000)
+            if batch_window > 0
+            else None
+        )
+
+    @asynccontextmanager
+    async def batch(self, window: float = 0.0) -> AsyncIterator[RpcBatcher]:
+        """
+        Send every contract call issued inside the scope as JSON-RPC batch requests.
+        Calls that are awaited concurrently (e.g. with `asyncio.gather`) share one
+        round trip to the node.
+
+        :param window: Seconds to wait for more calls after the first one is queued.
+        :return: The batcher used inside the scope.
+        """
+        batcher = RpcBatcher(self.client._client, window=window)
+        token = _active_batcher.set(batcher)
+        try:
+            yield batcher
+        finally:
+            _active_batcher.reset(token)
+            await batcher.drain()
+
+    @asynccontextmanager
+    async def snapshot(self, block_number: int = None) -> AsyncIterator[Optional[int]]:
+        """
+        Pin every contract call issued inside the scope to one block, so that
+        related reads (e.g. the debt, balances and accumulators of a health ratio)
+        see a consistent state. `get_block_number` returns the pinned block inside
+        the scope, which makes it usable as a cache key. A nested scope without
+        a block number keeps the block of the outer one.
+
+        :param block_number: The block to pin, defaults to the latest block.
+         If the latest block can not be fetched, calls are not pinned.
+        :return: The pinned block number, or None.
+        """
+        if block_number is None:
+            try:
+                block_number = await self.get_block_number()
+            except Exception as e:  # Read at the latest tag while the node is down
+                logger.warning(f"Error getting the block number of a snapshot: {e}")
+        token = _snapshot_block.set(block_number)
+        try:
+            yield block_number
+        finally:
+            _snapshot_block.reset(token)
+
+    @staticmethod
+    def pinned_block() -> Optional[int]:
+        """
+        Get the block of the current snapshot scope.
+
+        :return: The pinned block number, or None outside of a snapshot.
+        """
+        return _snapshot_block.get()
+
+    async def get_block_number(self) -> int:
+        """
+        Get the number of the latest block, cached for BLOCK_NUMBER_TTL seconds.
+        Inside a snapshot scope, the pinned block is returned.
+
+        :return: The block number.
+        """
+        block_number = _snapshot_block.get()
+        if block_number is not None:
+            return block_number
+        return await self._block_number.get_or_load(
+            "latest",
+            lambda: self.retry_policy.run(self.client.get_block_number),
+        )
 
     @staticmethod
     def _convert_address(addr: str) -> int:
@@ -74,12 +189,27 @@ class StarknetClient:
             calldata=calldata,
         )
         try:
-            res = await self.client.call_contract(call)
-        except Exception as e:  # Catch and log any errors
+            return await self.retry_policy.run(lambda: self._call_contract(call))
+        except Exception as e:  # Log the error the retry policy gave up on
             logger.error(f"Error making contract call: {e}")
-            time.sleep(self.SLEEP_TIME)
-            res = await self.client.call_contract(call)
-        return res
+            raise
+
+    async def _call_contract(self, call: starknet_py.net.client_models.Call) -> List[int]:
+        """
+        Send a contract call through the active batch scope, the implicit batcher,
+        or directly to the node, at the block of the snapshot scope if any.
+
+        :param call: The contract call.
+        :return: The call result as a list of integers.
+        """
+        block_number = _snapshot_block.get()
+        batcher = _active_batcher.get() or self._batcher
+        if batcher is not None:
+            block_id = None if block_number is None else {"block_number": block_number}
+            return await batcher.call(call, block_id)
+        if block_number is not None:
+            return await self.client.call_contract(call, block_number=block_number)
+        return await self.client.call_contract(call)
 
     @staticmethod
     def _build_ekubo_pool_key(
@@ -112,37 +242,120 @@ class StarknetClient:
             "extension": extension,
         }
 
+    def get_ekubo_pool_key(self, token0: str, token1: str) -> dict:
+        """
+        Get the Ekubo pool key of a token pair with the default pool parameters,
+        precomputed for the supported tokens.
+
+        :param token0: The address of the first token.
+        :param token1: The address of the second token.
+        :return: A copy of the pool key dictionary.
+        """
+        pool_key = self._ekubo_pool_keys.get((token0, token1))
+        if pool_key is None:
+            return self._build_ekubo_pool_key(token0, token1)
+        return dict(pool_key)
+
     @staticmethod
-    async def _get_pool_price(
-        pool_key, is_token1: bool, ekubo_contract: "Contract"
-    ) -> Decimal:
+    async def _fetch_pool_state(
+        pool_key: dict, ekubo_contract: "Contract", block_number: int = None
+    ) -> PoolState:
         """
-        Calculate Ekubo pool price.
+        Read the price state of an Ekubo pool.
 
         :param pool_key: The pool key dictionary.
-        :param is_token1: Boolean indicating if the token is token1.
         :param ekubo_contract: The Ekubo contract instance.
-        :return: The calculated pool price.
+        :param block_number: The block to read the state at, None for latest.
+        :return: The pool state.
+        """
+        call = ekubo_contract.functions["get_pool_price"].call
+        price_data = (
+            await call(pool_key)
+            if block_number is None
+            else await call(pool_key, block_number=block_number)
+        )
+        return PoolState.from_pool_price(price_data[0], block_number)
+
+    @staticmethod
+    def _get_pool_prices(pool_key: dict, state: PoolState) -> tuple[Fraction, Fraction]:
+        """
+        Calculate the exact Ekubo pool prices for both swap directions.
+
+        :param pool_key: The pool key dictionary.
+        :param state: The pool state.
+        :return: Tuple with the price when the deposit token is token0,
+         and the price when it is token1.
         """
-        price_data = await ekubo_contract.functions["get_pool_price"].call(pool_key)
         underlying_token_0_address = TokenParams.add_underlying_address(
             str(hex(pool_key["token0"]))
         )
         underlying_token_1_address = TokenParams.add_underlying_address(
             str(hex(pool_key["token1"]))
         )
-
-        token_0_decimals = TokenParams.get_token_decimals(underlying_token_0_address)
-        token_1_decimals = TokenParams.get_token_decimals(underlying_token_1_address)
-        price = Decimal(((price_data[0]["sqrt_ratio"] / 2**128) ** 2)) * (
-            10 ** abs(token_0_decimals - token_1_decimals)
-        )
-        return (
-            (1 / price) * 10**token_0_decimals
-            if is_token1
-            else price * 10**token_1_decimals
+        return state.prices(
+            int(TokenParams.get_token_decimals(underlying_token_0_address)),
+            int(TokenParams.get_token_decimals(underlying_token_1_address)),
         )
 
+    @staticmethod
+    async def _get_pool_price(
+        pool_key, is_token1: bool, ekubo_contract: "Contract"
+    ) -> Decimal:
+        """
+        Calculate Ekubo pool price.
+
+        :param pool_key: The pool key dictionary.
+        :param is_token1: Boolean indicating if the token is token1.
+        :param ekubo_contract: The Ekubo contract instance.
+        :return: The calculated pool price.
+        """
+        state = await StarknetClient._fetch_pool_state(pool_key, ekubo_contract)
+        return to_decimal(StarknetClient._get_pool_prices(pool_key, state)[is_token1])
+
+    async def get_ekubo_pool_state(
+        self, pool_key: dict, ekubo_contract: "Contract"
+    ) -> PoolState:
+        """
+        Get the price state of an Ekubo pool at the latest block. The state is read
+        once per pool and block, concurrent callers share the running read.
+
+        :param pool_key: The pool key dictionary.
+        :param ekubo_contract: The Ekubo contract instance.
+        :return: The pool state.
+        """
+        try:
+            block_number = await self.get_block_number()
+        except Exception as e:  # Read the latest state uncached while the node is down
+            logger.warning(f"Error getting the block number: {e}")
+            return await self._fetch_pool_state(pool_key, ekubo_contract)
+
+        key = tuple(pool_key.values())
+        cached_block_number, future = self._ekubo_pool_states.get(key, (None, None))
+        if (
+            future is None
+            or cached_block_number != block_number
+            or future.get_loop() is not asyncio.get_running_loop()
+        ):
+            future = asyncio.ensure_future(
+                self._fetch_pool_state(pool_key, ekubo_contract, block_number)
+            )
+            future.add_done_callback(
+                lambda done: self._drop_failed_pool_state(key, done)
+            )
+            self._ekubo_pool_states[key] = (block_number, future)
+        return await asyncio.shield(future)
+
+    def _drop_failed_pool_state(self, key: tuple, future: asyncio.Future) -> None:
+        """
+        Forget a failed pool state read, so that the next caller retries it.
+
+        :param key: The pool key values.
+        :param future: The future of the read.
+        """
+        if future.cancelled() or future.exception() is not None:
+            if self._ekubo_pool_states.get(key, (None, None))[1] is future:
+                self._ekubo_pool_states.pop(key)
+
     async def _get_zklend_reserve(self, token_address: str) -> list[int]:
         """
         Get ZkLend reserve data for a specific token.
@@ -172,14 +385,71 @@ class StarknetClient:
             )
         }
 
+    async def _load_zklend_reserves(self, tier: str) -> dict:
+        """
+        Fetch ZkLend reserves once and fill both tiers of the reserve cache.
+
+        :param tier: The tier to return, "params" or "accumulators".
+        :return: The freshly loaded tier.
+        """
+        reserves = await self.get_available_zklend_reserves()
+        token_params = {
+            token: (reserve[1], reserve[2]) for token, reserve in reserves.items()
+        }
+        accumulators = {token: reserve[4] for token, reserve in reserves.items()}
+        self._zklend_token_params.set("params", token_params)
+        self._zklend_accumulators.set(self._accumulators_key(), accumulators)
+        return token_params if tier == "params" else accumulators
+
+    @staticmethod
+    def _accumulators_key() -> Hashable:
+        """
+        Get the key of the lending accumulators in the reserve cache, the block
+        number inside a snapshot scope.
+
+        :return: The cache key.
+        """
+        block_number = _snapshot_block.get()
+        return "accumulators" if block_number is None else block_number
+
+    async def get_zklend_token_params(self) -> dict[str, tuple[int, int]]:
+        """
+        Get ZkLend reserve decimals and z-token addresses.
+        They never change, so they are cached for the process lifetime.
+
+        :return: A dictionary with token names as keys and
+         (decimals, z_address) tuples as values.
+        """
+        return await self._zklend_token_params.get_or_load(
+            "params", lambda: self._load_zklend_reserves("params")
+        )
+
+    async def get_zklend_accumulators(self) -> dict[str, int]:
+        """
+        Get ZkLend lending accumulators, cached for ACCUMULATOR_TTL seconds,
+        or per block inside a snapshot scope.
+
+        :return: A dictionary with token names as keys and accumulators as values.
+        """
+        key = self._accumulators_key()
+        if key != "accumulators":
+            self._zklend_accumulators.prune()
+        return await self._zklend_accumulators.get_or_load(
+            key, lambda: self._load_zklend_reserves("accumulators")
+        )
+
     async def get_z_addresses(self) -> dict[str, tuple[int, int, int]]:
         """
         Get ZkLend addresses.
 
-        :return: A dictionary with token names as keys and tuples of addresses as values.
+        :return: A dictionary with token names as keys and tuples of
+         (decimals, z_address, lending_accumulator) as values.
         """
-        reserves = await self.get_available_zklend_reserves()
-        return {token: (reserve[1], reserve[2], reserve[4]) for token, reserve in reserves.items()}
+        accumulators = await self.get_zklend_accumulators()
+        token_params = await self.get_zklend_token_params()
+        return {
+            token: (*token_params[token], accumulators[token]) for token in token_params
+        }
 
     async def get_zklend_debt(self, user: str, token: str) -> list[int]:
         """
@@ -196,7 +466,11 @@ class StarknetClient:
         )
 
     async def get_balance(
-        self, token_addr: str | int, holder_addr: str, decimals: int = None
+        self,
+        token_addr: str | int,
+        holder_addr: str,
+        decimals: int = None,
+        raise_errors: bool = False,
     ) -> int:
         """
         Fetches the balance of a holder for a specific token.
@@ -204,6 +478,7 @@ class StarknetClient:
         :param token_addr: The token contract address in hexadecimal string format.
         :param holder_addr: The address of the holder in hexadecimal string format.
         :param decimals: The number of decimal places to round the balance to. Defaults to None.
+        :param raise_errors: Raise errors of the balance call instead of returning 0.
         :return: The token balance of the holder as an integer.
         """
         token_address_int = (
@@ -217,6 +492,8 @@ class StarknetClient:
                 token_address_int, "balanceOf", [holder_address_int]
             )
         except Exception as exc:
+            if raise_errors:
+                raise
             logger.info(
                 f"Failed to get balance for {token_addr} due to an error: {exc}"
             )
@@ -247,7 +524,7 @@ class StarknetClient:
         :return: A dictionary with liquidity data.
         """
         # Get pool key
-        pool_key = self._build_ekubo_pool_key(deposit_token, borrowing_token)
+        pool_key = self.get_ekubo_pool_key(deposit_token, borrowing_token)
         # Convert addresses
         deposit_token, borrowing_token = self._convert_address(
             deposit_token
@@ -261,10 +538,11 @@ class StarknetClient:
             "borrow_portion_percent": MULTIPLIER_POWER,
         }
 
+        pool_state = await self.get_ekubo_pool_state(pool_key, ekubo_contract)
         pool_price = floor(
-            await self._get_pool_price(
-                pool_key, deposit_token == pool_key["token1"], ekubo_contract
-            )
+            self._get_pool_prices(pool_key, pool_state)[
+                deposit_token == pool_key["token1"]
+            ]
         )
         return {
             "pool_price": pool_price,
@@ -288,7 +566,7 @@ class StarknetClient:
         :param ekubo_contract: The Ekubo contract instance.
         :return: A dictionary with repay data.
         """
-        pool_key = self._build_ekubo_pool_key(deposit_token, borrowing_token)
+        pool_key = self.get_ekubo_pool_key(deposit_token, borrowing_token)
         decimals_sum = TokenParams.get_token_decimals(
             deposit_token
         ) + TokenParams.get_token_decimals(borrowing_token)
@@ -297,12 +575,11 @@ class StarknetClient:
         ), self._convert_address(borrowing_token)
 
         is_token1 = deposit_token == pool_key["token1"]
-        supply_price = floor(
-            await self._get_pool_price(pool_key, is_token1, ekubo_contract)
-        )
+        pool_state = await self.get_ekubo_pool_state(pool_key, ekubo_contract)
+        supply_price = floor(self._get_pool_prices(pool_key, pool_state)[is_token1])
 
         try:
-            debt_price = floor(Decimal((1 / supply_price)) * 10**decimals_sum)
+            debt_price = 10 ** int(decimals_sum) // supply_price
         except ZeroDivisionError:
             logger.error(
                 f"Error while getting repay data: {deposit_token=}, {borrowing_token=}"
@@ -353,25 +630,60 @@ class StarknetClient:
             calldata=[self._convert_address(token_address), amount],
         )
 
-    async def fetch_portfolio(self, contract_address: str) -> dict:
+    async def fetch_portfolios(
+        self, contract_addresses: list[str]
+    ) -> dict[str, Portfolio]:
         """
-        Fetches the portfolio of the contract
+        Fetch the z-token balances of many contracts at once. The balance calls
+        of every contract and token are sent together as JSON-RPC batch requests.
+        A failed call is logged and reported as a zero balance with its error,
+        without failing the other balances.
 
-        :param contract_address: the contract address to fetch the portfolio from.
-        :return: A dictionary containing dictionaries of available tokens in the contract address,
-                and the balance
+        :param contract_addresses: The contract addresses to fetch portfolios of.
+        :return: A dictionary with contract addresses as keys and portfolios as values.
         """
-        results = {}
         z_addresses = await self.get_z_addresses()
+        requests = [
+            (address, token, decimals, z_address)
+            for address in contract_addresses
+            for token, (decimals, z_address, _) in z_addresses.items()
+        ]
+        async with self.batch():
+            results = await asyncio.gather(
+                *(
+                    self._func_call(
+                        z_address, "balanceOf", [self._convert_address(address)]
+                    )
+                    for address, _, _, z_address in requests
+                ),
+                return_exceptions=True,
+            )
 
-        for key, value in z_addresses.items():
-            decimals, z_address = value
-            balance: int = await self.get_balance(z_address, contract_address)
-
-            key = f"z{key}"
-            results[key] = {"balance": balance, "decimals": decimals}
+        portfolios = {
+            address: Portfolio(contract_address=address)
+            for address in contract_addresses
+        }
+        for (address, token, decimals, z_address), result in zip(requests, results):
+            if isinstance(result, Exception):
+                logger.info(
+                    f"Failed to get z{token} balance of {address} due to an error: "
+                    f"{result}"
+                )
+                balance = ZTokenBalance(token, z_address, decimals, 0, str(result))
+            else:
+                balance = ZTokenBalance(token, z_address, decimals, result[0])
+            portfolios[address].balances[f"z{token}"] = balance
+        return portfolios
+
+    async def fetch_portfolio(self, contract_address: str) -> Portfolio:
+        """
+        Fetches the portfolio of the contract
 
-        return results
+        :param contract_address: the contract address to fetch the portfolio from.
+        :return: The z-token balances of the contract.
+        """
+        portfolios = await self.fetch_portfolios([contract_address])
+        return portfolios[contract_address]
 
 
 CLIENT = StarknetClient()
@@ -382,4 +694,4 @@ if __name__ == "__main__":
         "0x05685d6b0b493c7c939d65c175305b893870cacad780842c79a611ad9122815f"
     )
     res = asyncio.run(call.fetch_portfolio(spotnet_address))
-    print(res)
+    print(res.to_dict())
@@ -0,0 +1,121 @@
+"""
+This module contains in-process async caches for contract data.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class AsyncTTLCache:
+    """
+    A time-to-live cache for async loaders with single-flight deduplication:
+    concurrent misses of the same key share one running load.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        :param ttl: Seconds an entry stays fresh, None keeps entries forever.
+        """
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[Any, float]] = {}
+        self._loading: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a fresh cached value.
+
+        :param key: The cache key.
+        :param default: Value returned if the key is missing or expired.
+        :return: The cached value or the default.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return default
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        :param key: The cache key.
+        :param value: The value to store.
+        :param ttl: Seconds the value stays fresh, defaults to the cache TTL.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = float("inf") if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """
+        Drop one entry, or every entry if no key is given.
+
+        :param key: The cache key.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def prune(self) -> None:
+        """
+        Drop every expired entry, for caches whose keys are not reused,
+        e.g. keys that include a block number.
+        """
+        now = time.monotonic()
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if entry[1] >= now
+        }
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Get a fresh cached value, or load and store it. If a load of the same key
+        is already running, wait for its result instead of starting another one.
+
+        :param key: The cache key.
+        :param loader: A coroutine function producing the value.
+        :return: The cached or loaded value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] >= time.monotonic():
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        return await asyncio.shield(self.refresh(key, loader))
+
+    def refresh(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        """
+        Start loading a key regardless of the cached value, or join the load
+        of the same key that is already running.
+
+        :param key: The cache key.
+        :param loader: A coroutine function producing the value.
+        :return: A future of the loaded value.
+        """
+        future = self._loading.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = future
+        return future
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a loader and store its result.
+
+        :param key: The cache key.
+        :param loader: A coroutine function producing the value.
+        :return: The loaded value.
+        """
+        try:
+            value = await loader()
+            self.set(key, value)
+            return value
+        finally:
+            self._loading.pop(key, None)
@@ -0,0 +1,79 @@
+"""
+This module contains the state of an Ekubo pool and the exact price math on it.
+"""
+
+from dataclasses import dataclass
+from decimal import ROUND_FLOOR, Decimal, localcontext
+from fractions import Fraction
+from typing import Optional
+
+# sqrt_ratio is a Q128.128 fixed-point number
+SQRT_RATIO_SCALE = 2**128
+# Significant digits of prices converted from exact fractions to Decimal
+PRICE_PRECISION = 80
+
+
+@dataclass(frozen=True)
+class PoolState:
+    """
+    The raw price state of an Ekubo pool, as returned by `get_pool_price`.
+    """
+
+    sqrt_ratio: int
+    tick: int
+    block_number: Optional[int] = None
+
+    @classmethod
+    def from_pool_price(
+        cls, pool_price: dict, block_number: Optional[int] = None
+    ) -> "PoolState":
+        """
+        Build a pool state from the result of the Ekubo `get_pool_price` call.
+
+        :param pool_price: The PoolPrice struct with sqrt_ratio and tick.
+        :param block_number: The block the state was read at, None for latest.
+        :return: The pool state.
+        """
+        tick = pool_price.get("tick") or {"mag": 0, "sign": False}
+        return cls(
+            sqrt_ratio=int(pool_price["sqrt_ratio"]),
+            tick=-int(tick["mag"]) if tick["sign"] else int(tick["mag"]),
+            block_number=block_number,
+        )
+
+    @property
+    def ratio(self) -> Fraction:
+        """
+        The exact price of token0 in token1 raw units, sqrt_ratio squared.
+        """
+        return Fraction(self.sqrt_ratio**2, SQRT_RATIO_SCALE**2)
+
+    def prices(
+        self, token0_decimals: int, token1_decimals: int
+    ) -> tuple[Fraction, Fraction]:
+        """
+        Get the exact pool prices for both swap directions at once.
+
+        :param token0_decimals: Decimals of token0.
+        :param token1_decimals: Decimals of token1.
+        :return: Tuple with the price when the deposit token is token0 and the price
+         when it is token1. The latter is 0 for an uninitialized pool.
+        """
+        price = self.ratio * 10 ** abs(token0_decimals - token1_decimals)
+        token0_price = price * 10**token1_decimals
+        token1_price = 10**token0_decimals / price if price else Fraction(0)
+        return token0_price, token1_price
+
+
+def to_decimal(value: Fraction) -> Decimal:
+    """
+    Convert an exact fraction to a Decimal, rounded down so that flooring
+    the result gives the floor of the fraction.
+
+    :param value: The fraction.
+    :return: The Decimal value.
+    """
+    with localcontext() as context:
+        context.prec = PRICE_PRECISION
+        context.rounding = ROUND_FLOOR
+        return Decimal(value.numerator) / Decimal(value.denominator)
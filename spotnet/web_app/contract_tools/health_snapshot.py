@@ -0,0 +1,143 @@
+"""
+This module contains the columnar snapshot of leveraged positions used to compute
+health factors, LTVs and liquidation prices of many positions in one vectorized pass.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+
+from web_app.contract_tools.constants import TokenParams, ZKLEND_SCALE_DECIMALS
+
+# Health factors and LTVs are rounded half to even to this many decimal places,
+# the same as `round(Decimal, 2)` in the Decimal path of HealthRatioMixin
+RATIO_DECIMALS = 2
+
+
+@dataclass(frozen=True)
+class HealthMetrics:
+    """
+    Health metrics of the positions of a snapshot, indexed like its rows.
+
+    - health_factors: collateral value / debt value, 0 for positions without debt.
+    - ltvs: borrow-factor weighted debt value / collateral value,
+      NaN for positions without collateral.
+    - liquidation_prices: position x token price at which the health factor of
+      the position drops to 1 when only that token's price moves, NaN where the
+      position holds none of the token or the rest of its collateral covers the debt.
+    """
+
+    health_factors: np.ndarray
+    ltvs: np.ndarray
+    liquidation_prices: np.ndarray
+
+
+@dataclass(frozen=True)
+class PositionSnapshot:
+    """
+    Position x token arrays of the inputs of the health ratio.
+
+    - z_balances: z-token balances in token units, shape (positions, tokens).
+    - debts: raw debts in the smallest token unit, shape (positions, tokens).
+    - accumulators: zkLend lending accumulators scaled by 10**27, shape (tokens,).
+    - prices: USD token prices, shape (tokens,).
+    - decimals: token decimals, shape (tokens,).
+    - borrow_factors: token borrow factors, shape (tokens,).
+    """
+
+    contract_addresses: list[str]
+    tokens: list[str]
+    z_balances: np.ndarray
+    debts: np.ndarray
+    accumulators: np.ndarray
+    prices: np.ndarray
+    decimals: np.ndarray
+    borrow_factors: np.ndarray
+
+    @classmethod
+    def from_inputs(
+        cls,
+        z_balances: dict[str, dict[str, Decimal | str]],
+        debts: dict[str, dict[str, int]],
+        accumulators: dict[str, int],
+        prices: dict[str, Decimal],
+    ) -> "PositionSnapshot":
+        """
+        Build a snapshot from per-position dictionaries keyed by token symbol.
+
+        :param z_balances: z-token balances in token units by contract address.
+        :param debts: raw debts by contract address.
+        :param accumulators: lending accumulators by token symbol.
+        :param prices: USD prices by token symbol, missing tokens are priced at 0.
+        :return: The snapshot.
+        """
+        token_configs = list(TokenParams.tokens())
+        tokens = [token.name for token in token_configs]
+        contract_addresses = list(z_balances)
+        return cls(
+            contract_addresses=contract_addresses,
+            tokens=tokens,
+            z_balances=np.array(
+                [
+                    [float(z_balances[address].get(token, 0)) for token in tokens]
+                    for address in contract_addresses
+                ],
+                dtype=np.float64,
+            ).reshape(len(contract_addresses), len(tokens)),
+            debts=np.array(
+                [
+                    [float(debts.get(address, {}).get(token, 0)) for token in tokens]
+                    for address in contract_addresses
+                ],
+                dtype=np.float64,
+            ).reshape(len(contract_addresses), len(tokens)),
+            accumulators=np.array(
+                [float(accumulators.get(token, 0)) for token in tokens],
+                dtype=np.float64,
+            ),
+            prices=np.array(
+                [float(prices.get(token, 0)) for token in tokens], dtype=np.float64
+            ),
+            decimals=np.array(
+                [int(token.decimals) for token in token_configs], dtype=np.int64
+            ),
+            borrow_factors=np.array(
+                [float(token.borrow_factor) for token in token_configs],
+                dtype=np.float64,
+            ),
+        )
+
+    def compute(self) -> HealthMetrics:
+        """
+        Compute the health metrics of every position in one vectorized pass.
+
+        :return: The health metrics.
+        """
+        deposits = self.z_balances * (self.accumulators / float(ZKLEND_SCALE_DECIMALS))
+        deposit_values = deposits * self.prices
+        deposit_usd = deposit_values.sum(axis=1)
+
+        debt_values = self.debts / np.power(10.0, self.decimals) * self.prices
+        debt_usd = debt_values.sum(axis=1)
+        weighted_debt_usd = (debt_values / self.borrow_factors).sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            health_factors = np.where(debt_usd != 0, deposit_usd / debt_usd, 0.0)
+            ltvs = np.where(deposit_usd != 0, weighted_debt_usd / deposit_usd, np.nan)
+            # Collateral value without token t plus the value of t at price p
+            # equals the debt when p = (debt - other collateral) / amount of t
+            other_deposit_usd = deposit_usd[:, None] - deposit_values
+            liquidation_prices = np.where(
+                deposits != 0,
+                (debt_usd[:, None] - other_deposit_usd) / deposits,
+                np.nan,
+            )
+
+        return HealthMetrics(
+            health_factors=np.round(health_factors, RATIO_DECIMALS),
+            ltvs=np.round(ltvs, RATIO_DECIMALS),
+            liquidation_prices=np.where(
+                liquidation_prices > 0, liquidation_prices, np.nan
+            ),
+        )
@@ -4,13 +4,33 @@ This module contains the alert mixin class.
 
 import asyncio
 import logging
+from collections import defaultdict
+
+from web_app.telegram import bot
 from web_app.telegram.notifications import send_health_ratio_notification
 from web_app.contract_tools.mixins import HealthRatioMixin
 from web_app.db.crud import UserDBConnector
+from web_app.db.models import get_shard_key
 
 
 logger = logging.getLogger(__name__)
 ALERT_THRESHOLD = 3.2  # FIXME return to 1.1 after testing
+# Users read from the database and checked per step of the scan
+SCAN_BATCH_SIZE = 500
+# Telegram messages in flight at the same time
+MAX_CONCURRENT_NOTIFICATIONS = 20
+
+
+def get_shard(contract_address: str, shard_count: int) -> int:
+    """
+    Get the shard of a contract address, the same shard the database
+    filters on through the stored `User.shard_key`.
+
+    :param contract_address: The contract address.
+    :param shard_count: The total number of shards.
+    :return: The index of the shard.
+    """
+    return get_shard_key(contract_address) % shard_count
 
 
 class AlertMixin:
@@ -19,36 +39,104 @@ class AlertMixin:
     """
 
     @classmethod
-    def check_users_health_ratio_level(cls) -> None:
+    def check_users_health_ratio_level(
+        cls, shard: int = 0, shard_count: int = 1
+    ) -> int:
         """
-        Check the health ratio level for all users with an OPENED position.
-        If a user's health ratio level is lower than 1.1, raise a `HealthRatioLevelLowException`.
+        Check the health ratio level for all users with an OPENED position
+        and notify users whose health ratio level is lower than ALERT_THRESHOLD.
+        The whole scan runs on a single event loop.
+
+        :param shard: The index of the shard of users to check.
+        :param shard_count: The total number of shards.
+        :return: The number of checked users.
         """
+        return asyncio.run(cls.scan_users_health_ratio_level(shard, shard_count))
 
-        users_data = UserDBConnector().get_users_for_notifications()
-        user_number = len([user for user, _ in users_data])
-        logger.info(f"Found number of users for notifications: {user_number}")
+    @classmethod
+    async def scan_users_health_ratio_level(
+        cls, shard: int = 0, shard_count: int = 1
+    ) -> int:
+        """
+        Read users for notifications from the database page by page, calculate
+        the health ratios of each page concurrently and send notifications
+        through the shared bot session. Only users whose contract address
+        falls into the given shard are read.
+
+        :param shard: The index of the shard of users to check.
+        :param shard_count: The total number of shards.
+        :return: The number of checked users.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_NOTIFICATIONS)
+        user_number = 0
+        try:
+            user_db = UserDBConnector()
+            last_row = None
+            while True:
+                # Each page is a short query filtered on the shard in SQL
+                users_data = await asyncio.to_thread(
+                    user_db.get_users_for_notifications_page,
+                    SCAN_BATCH_SIZE,
+                    last_row,
+                    shard,
+                    shard_count,
+                )
+                if not users_data:
+                    break
+                last_row = users_data[-1]
+                user_number += len(users_data)
+                await cls._check_users_batch(users_data, semaphore)
+        finally:
+            if bot is not None:
+                # The session is bound to this event loop
+                await bot.session.close()
+        logger.info(
+            f"Found number of users for notifications in shard {shard}: {user_number}"
+        )
+        return user_number
+
+    @classmethod
+    async def _check_users_batch(
+        cls, users_data: list[tuple[str, str]], semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Check the health ratios of a batch of users and notify the users at risk.
+
+        :param users_data: List of tuples (contract_address, telegram_id)
+        :param semaphore: Semaphore bounding the notifications in flight
+        """
+        telegram_ids = defaultdict(list)
         for contract_address, telegram_id in users_data:
-            health_ratio_level, _ = asyncio.run(
-                HealthRatioMixin.get_health_ratio_and_tvl(contract_address)
-            )
+            telegram_ids[contract_address].append(telegram_id)
 
+        health_ratios = await HealthRatioMixin.get_health_ratios(list(telegram_ids))
+
+        notifications = []
+        for contract_address, (health_ratio_level, _) in health_ratios.items():
             if float(health_ratio_level) < ALERT_THRESHOLD:
                 logger.info(
                     f"Health ratio level for user {contract_address} is {health_ratio_level}"
                 )
-                cls.send_notification(telegram_id, health_ratio_level)
+                notifications.extend(
+                    cls.send_notification(telegram_id, health_ratio_level, semaphore)
+                    for telegram_id in telegram_ids[contract_address]
+                )
+        await asyncio.gather(*notifications)
 
     @staticmethod
-    def send_notification(telegram_id: int, health_ratio: float):
+    async def send_notification(
+        telegram_id: int, health_ratio: float, semaphore: asyncio.Semaphore = None
+    ):
         """
         Send notification to a user if they have allowed notifications.
 
         Args:
             telegram_id: ID of the r to notify
             health_ratio: Current health ratio of the user's position
+            semaphore: Optional semaphore bounding the notifications in flight
         """
-        asyncio.run(send_health_ratio_notification(telegram_id, health_ratio))
+        async with semaphore or asyncio.Semaphore():
+            await send_health_ratio_notification(telegram_id, health_ratio)
         logger.info(
             f"Notification sent to user {telegram_id} with health ratio {health_ratio}"
         )
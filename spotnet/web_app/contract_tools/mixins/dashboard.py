@@ -2,14 +2,20 @@
 This module contains the dashboard mixin class.
 """
 
+import asyncio
 import logging
 from typing import Dict
 from decimal import Decimal
 
 
-from web_app.contract_tools.constants import TokenParams, MULTIPLIER_POWER
-from web_app.contract_tools.api_request import APIRequest
+from web_app.contract_tools.constants import (
+    TokenConfig,
+    TokenParams,
+    MULTIPLIER_POWER,
+)
 from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.contract_tools.cache import AsyncTTLCache
+from web_app.contract_tools.price_service import PRICE_SERVICE, PriceSource
 from web_app.db.crud.position import PositionDBConnector
 
 logger = logging.getLogger(__name__)
@@ -20,46 +26,29 @@ position_db_connector = PositionDBConnector()
 # "https://cloud.argent-api.com/v1/tokens/defi/decomposition/{wallet_id}?chain=starknet"
 ARGENT_X_POSITION_URL = "https://cloud.argent-api.com/v1/tokens/defi/"
 
-# New constant for AVNU price endpoint
-AVNU_PRICE_URL = "https://starknet.impulse.avnu.fi/v1/tokens/short"
-
 
 class DashboardMixin:
     """
     Mixin class for dashboard related methods.
     """
 
+    # Wallets whose balance calls are in flight at the same time
+    MAX_CONCURRENT_WALLETS = 20
+    # Seconds wallet balances are reused, balances of a newer block are not
+    WALLET_BALANCE_TTL = 10
+    _wallet_balances = AsyncTTLCache(ttl=WALLET_BALANCE_TTL)
+
     @classmethod
     async def get_current_prices(cls) -> Dict[str, Decimal]:
         """
-        Fetch current token prices from AVNU API.
+        Get current token prices from AVNU API through the shared price service.
         :return: Returns dictionary mapping token symbols to their current prices as Decimal.
         """
-        prices = {}
         try:
-            response = await APIRequest(base_url=AVNU_PRICE_URL).fetch("")
-            if not response:
-                return prices
-
-            for token_data in response:
-                address = token_data.get("address")
-                current_price = token_data.get("currentPrice")
-                try:
-                    if address and current_price is not None:
-                        address_with_leading_zero = TokenParams.add_underlying_address(
-                            address
-                        )
-                        symbol = TokenParams.get_token_symbol(address_with_leading_zero)
-                        if symbol:
-                            # Convert to Decimal for precise calculations
-                            prices[symbol] = Decimal(str(current_price))
-                except (AttributeError, TypeError, ValueError) as e:
-                    logger.debug(f"Error parsing price for {address}: {str(e)}")
-
-            return prices
+            return await PRICE_SERVICE.get_prices(PriceSource.AVNU)
         except Exception as e:
             logger.error(f"Error fetching current prices: {e}")
-            return prices
+            return {}
 
     @classmethod
     async def get_wallet_balances(cls, holder_address: str) -> Dict[str, str]:
@@ -68,22 +57,79 @@ class DashboardMixin:
         :param holder_address: holder address
         :return: Returns the wallet balances for the given holder address.
         """
-        wallet_balances = {}
+        balances = await cls.get_wallets_balances([holder_address])
+        return balances[holder_address]
 
-        for token in TokenParams.tokens():
-            try:
-                balance = await CLIENT.get_balance(
-                    token_addr=token.address,
-                    holder_addr=holder_address,
-                    decimals=token.decimals,
+    @classmethod
+    async def get_wallets_balances(
+        cls, holder_addresses: list[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Get the wallet balances of many holder addresses at once. The balance calls
+        of every holder and token are sent concurrently in shared RPC batches, and
+        balances are cached per holder, token and block. A token whose balance
+        can not be fetched has a balance of 0, which is not cached.
+        :param holder_addresses: holder addresses
+        :return: Returns a dictionary with holder addresses as keys and
+         their wallet balances as values.
+        """
+        try:
+            block_number = await CLIENT.get_block_number()
+        except Exception as e:  # Balances are then cached for the TTL only
+            logger.info(f"Failed to get the block number of wallet balances: {e}")
+            block_number = None
+        cls._wallet_balances.prune()
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_WALLETS)
+        tokens = list(TokenParams.tokens())
+
+        async def _get_balances(holder_address: str) -> list:
+            async with semaphore:
+                return await asyncio.gather(
+                    *(
+                        cls._get_wallet_balance(holder_address, token, block_number)
+                        for token in tokens
+                    ),
+                    return_exceptions=True,
                 )
+
+        async with CLIENT.batch():
+            results = await asyncio.gather(
+                *(_get_balances(holder_address) for holder_address in holder_addresses)
+            )
+
+        wallets_balances = {}
+        for holder_address, balances in zip(holder_addresses, results):
+            wallet_balances = wallets_balances.setdefault(holder_address, {})
+            for token, balance in zip(tokens, balances):
+                if isinstance(balance, Exception):  # contract not found in wallet
+                    logger.info(
+                        f"Failed to get balance for {token.address} "
+                        f"due to an error: {balance}"
+                    )
+                    balance = 0
                 wallet_balances[token.name] = balance
-            except Exception as e:  # handle if contract not found in wallet
-                logger.info(
-                    f"Failed to get balance for {token.address} due to an error: {e}"
-                )
+        return wallets_balances
 
-        return wallet_balances
+    @classmethod
+    async def _get_wallet_balance(
+        cls, holder_address: str, token: TokenConfig, block_number: int | None
+    ) -> str:
+        """
+        Get the balance of a token in a wallet, cached per holder, token and block.
+        :param holder_address: holder address
+        :param token: Token config
+        :param block_number: Number of the latest block
+        :return: The balance rounded to 6 decimal places
+        """
+        return await cls._wallet_balances.get_or_load(
+            (holder_address, token.address, block_number),
+            lambda: CLIENT.get_balance(
+                token_addr=token.address,
+                holder_addr=holder_address,
+                decimals=token.decimals,
+                raise_errors=True,
+            ),
+        )
 
     @classmethod
     def _calculate_sum(
@@ -112,11 +158,16 @@ class DashboardMixin:
         :param position: Position object containing base amount and token information
         :return: Decimal representing total position value including extra deposits
         """
-        main_position = position_db_connector.get_position_by_id(position["id"])
+        main_position, extra_deposits, current_prices = await asyncio.gather(
+            asyncio.to_thread(position_db_connector.get_position_by_id, position["id"]),
+            asyncio.to_thread(
+                position_db_connector.get_extra_deposits_by_position_id, position["id"]
+            ),
+            cls.get_current_prices(),
+        )
         if not main_position:
             return Decimal(0)
 
-        current_prices = await cls.get_current_prices()
         base_price = current_prices.get(main_position.token_symbol)
         total_sum = Decimal(0)
         if base_price:
@@ -126,10 +177,6 @@ class DashboardMixin:
                 Decimal(main_position.multiplier),
             )
 
-        extra_deposits = position_db_connector.get_extra_deposits_by_position_id(
-            position["id"]
-        )
-
         for extra_deposit in extra_deposits:
             if extra_deposit.token_symbol in current_prices:
                 deposit_amount = Decimal(extra_deposit.amount)
@@ -180,7 +227,8 @@ class DashboardMixin:
         :param position_id: Position ID
         :return (str): Position balance
         """
-        main_position = position_db_connector.get_position_by_id(position_id)
+        main_position = await asyncio.to_thread(
+            position_db_connector.get_position_by_id, position_id
+        )
         main_position_balance = main_position and main_position.amount or "0"
         return main_position_balance
-
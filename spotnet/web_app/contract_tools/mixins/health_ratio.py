@@ -3,16 +3,15 @@ HealthRatioMixin is a mixin class to calculate the health ratio of a deposit con
 """
 
 import asyncio
+import logging
 from decimal import Decimal
 
-from pragma_sdk.common.types.types import AggregationMode
-from pragma_sdk.onchain.client import PragmaOnChainClient
 from web_app.contract_tools.blockchain_call import CLIENT
 from web_app.contract_tools.constants import TokenParams, ZKLEND_SCALE_DECIMALS
+from web_app.contract_tools.health_snapshot import PositionSnapshot
+from web_app.contract_tools.price_service import PRICE_SERVICE, PriceSource
 
-PRAGMA = PragmaOnChainClient(
-    network="mainnet",
-)
+logger = logging.getLogger(__name__)
 
 
 class HealthRatioMixin:
@@ -20,23 +19,15 @@ class HealthRatioMixin:
     A mixin class to calculate the health ratio of a deposit contract.
     """
 
-    @classmethod
-    async def _get_pragma_price(cls, token: str) -> Decimal:
-        """
-        Get the price of a token from the Pragma API.
-
-        :param token: The token symbol (e.g., "ETH", "USDC").
-        :return: The price of the token as a Decimal.
-        """
-        decimals = 10**8 if token not in ("USDC", "USDT") else 10**6
-        data = await PRAGMA.get_spot(f"{token}/USD", AggregationMode.MEDIAN)
-        return Decimal(data.price / decimals)
+    # Deposit contracts whose RPC calls are in flight at the same time
+    MAX_CONCURRENT_POSITIONS = 20
 
     @classmethod
     async def _get_z_balances(
         cls,
         reserves: dict[str, tuple[int, int]],
         deposit_contract_address: str,
+        raise_errors: bool = False,
     ) -> dict[str, Decimal]:
         """
         Get the balances of tokens in a deposit contract.
@@ -44,6 +35,8 @@ class HealthRatioMixin:
         :param reserves: A dictionary of token reserves with token symbols as keys
          and tuples of (decimals, address) as values.
         :param deposit_contract_address: The address of the deposit contract.
+        :param raise_errors: Raise errors of the balance calls instead of
+         counting the balances as 0.
         :return: A dictionary of token balances with token symbols as keys
          and balances as Decimal values.
         """
@@ -52,6 +45,7 @@ class HealthRatioMixin:
                 z_data[1],
                 deposit_contract_address,
                 z_data[0],
+                raise_errors=raise_errors,
             )
             for z_data in reserves.values()
         ]
@@ -66,18 +60,22 @@ class HealthRatioMixin:
 
     @classmethod
     async def _get_deposited_tokens(
-        cls, deposit_contract_address: str
+        cls, deposit_contract_address: str, raise_errors: bool = False
     ) -> dict[str, Decimal]:
         """
         Get the deposited tokens and their amounts in a deposit contract.
 
         :param deposit_contract_address: The address of the deposit contract.
+        :param raise_errors: Raise errors of the balance calls instead of
+         counting the balances as 0.
         :return: A dictionary of deposited tokens with token symbols as keys
          and amounts as Decimal values.
         """
 
         reserves = await CLIENT.get_z_addresses()
-        deposits = await cls._get_z_balances(reserves, deposit_contract_address)
+        deposits = await cls._get_z_balances(
+            reserves, deposit_contract_address, raise_errors
+        )
         return {
             token: amount * Decimal(reserves[token][2]) / ZKLEND_SCALE_DECIMALS
             for token, amount in deposits.items()
@@ -85,18 +83,21 @@ class HealthRatioMixin:
         }
 
     @classmethod
-    async def _get_pragma_prices(cls, tokens: set) -> dict[str, Decimal]:
+    async def _get_pragma_prices(
+        cls, tokens: set, block_number: int = None
+    ) -> dict[str, Decimal]:
         """
-        Get the prices of multiple tokens from the Pragma API.
+        Get the prices of multiple tokens from the Pragma price table
+        of the shared price service.
 
         :param tokens: A set of token symbols.
+        :param block_number: The block to get the prices at, None for the
+         cached latest prices.
         :return: A dictionary of token prices with token symbols as
-         keys and prices as Decimal values.
+         keys and prices as Decimal values. Tokens without a price are left out.
         """
-        tasks = [cls._get_pragma_price(token) for token in tokens]
-        return {
-            token: price for token, price in zip(tokens, await asyncio.gather(*tasks))
-        }
+        prices = await PRICE_SERVICE.get_prices(PriceSource.PRAGMA, block_number)
+        return {token: prices[token] for token in tokens if token in prices}
 
     @classmethod
     def _get_ltv(
@@ -132,20 +133,40 @@ class HealthRatioMixin:
         return non_zero_debt[0]
 
     @classmethod
-    async def get_health_ratio_and_tvl(cls, deposit_contract_address: str) -> tuple:
+    async def _get_position_inputs(
+        cls, deposit_contract_address: str, raise_errors: bool = False
+    ) -> tuple[str, int, dict[str, Decimal]]:
         """
-        Calculate the health ratio of a deposit contract.
+        Get the debt and deposits of a deposit contract in one batch of calls.
 
         :param deposit_contract_address: The address of the deposit contract.
-        :return: The health ratio as a string.
+        :param raise_errors: Raise errors of the balance calls instead of
+         counting the balances as 0.
+        :return: Tuple with borrowed token symbol, raw debt and deposited tokens.
         """
-        borrowed_token_address, debt_raw = await cls._get_borrowed_token(
-            deposit_contract_address
+        (borrowed_token_address, debt_raw), deposits = await asyncio.gather(
+            cls._get_borrowed_token(deposit_contract_address),
+            cls._get_deposited_tokens(deposit_contract_address, raise_errors),
         )
-        borrowed_token = TokenParams.get_token_symbol(borrowed_token_address)
-        deposits = await cls._get_deposited_tokens(deposit_contract_address)
-        prices = await cls._get_pragma_prices(set(deposits.keys()) | {borrowed_token})
+        return TokenParams.get_token_symbol(borrowed_token_address), debt_raw, deposits
+
+    @classmethod
+    def _calculate_health_ratio_and_tvl(
+        cls,
+        borrowed_token: str,
+        debt_raw: int,
+        deposits: dict[str, Decimal],
+        prices: dict[str, Decimal],
+    ) -> tuple[str, Decimal]:
+        """
+        Calculate the health ratio and LTV of a position from its inputs.
 
+        :param borrowed_token: The borrowed token symbol.
+        :param debt_raw: The raw debt amount of the borrowed token.
+        :param deposits: Deposited tokens with token symbols as keys.
+        :param prices: Token prices with token symbols as keys.
+        :return: Tuple with the health ratio as a string and the LTV.
+        """
         deposit_usdc = sum(
             amount * Decimal(prices[token])
             for token, amount in deposits.items()
@@ -166,6 +187,154 @@ class HealthRatioMixin:
         )
         return health_factor, ltv
 
+    @classmethod
+    async def get_health_ratio_and_tvl(cls, deposit_contract_address: str) -> tuple:
+        """
+        Calculate the health ratio of a deposit contract.
+
+        :param deposit_contract_address: The address of the deposit contract.
+        :return: The health ratio as a string.
+        """
+
+        async def _get_inputs() -> tuple[str, int, dict[str, Decimal]]:
+            async with CLIENT.snapshot(), CLIENT.batch():
+                return await cls._get_position_inputs(deposit_contract_address)
+
+        # The price table does not depend on the position, fetch it alongside
+        (borrowed_token, debt_raw, deposits), prices = await asyncio.gather(
+            _get_inputs(), PRICE_SERVICE.get_prices(PriceSource.PRAGMA)
+        )
+        return cls._calculate_health_ratio_and_tvl(
+            borrowed_token, debt_raw, deposits, prices
+        )
+
+    @classmethod
+    async def get_health_ratios(
+        cls, contract_addresses: list[str]
+    ) -> dict[str, tuple[str, Decimal]]:
+        """
+        Calculate the health ratios of many deposit contracts at once.
+        Reserves and prices are fetched once for all contracts, and the per-contract
+        debts and balances are gathered concurrently into shared RPC batches.
+        Every input is read at the same block.
+        Contracts whose ratio can not be calculated (e.g. without debt, or with
+        a failed balance call, which would understate the collateral) are skipped.
+
+        :param contract_addresses: The addresses of the deposit contracts.
+        :return: A dictionary with contract addresses as keys and
+         (health_ratio, ltv) tuples as values.
+        """
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_POSITIONS)
+
+        async def _get_inputs(address: str) -> tuple[str, int, dict[str, Decimal]]:
+            async with semaphore:
+                return await cls._get_position_inputs(address, raise_errors=True)
+
+        async with CLIENT.snapshot() as block_number:
+            # Warm up the reserve cache before the fan-out
+            await CLIENT.get_z_addresses()
+            async with CLIENT.batch():
+                inputs = await asyncio.gather(
+                    *(_get_inputs(address) for address in contract_addresses),
+                    return_exceptions=True,
+                )
+
+        positions = {}
+        for address, position_inputs in zip(contract_addresses, inputs):
+            if isinstance(position_inputs, Exception):
+                logger.warning(
+                    f"Failed to get health ratio inputs for {address}: "
+                    f"{position_inputs!r}"
+                )
+                continue
+            positions[address] = position_inputs
+
+        tokens = set()
+        for borrowed_token, _, deposits in positions.values():
+            tokens |= set(deposits.keys()) | {borrowed_token}
+        prices = await cls._get_pragma_prices(tokens, block_number)
+
+        health_ratios = {}
+        for address, (borrowed_token, debt_raw, deposits) in positions.items():
+            try:
+                health_ratios[address] = cls._calculate_health_ratio_and_tvl(
+                    borrowed_token, debt_raw, deposits, prices
+                )
+            except (ArithmeticError, KeyError) as e:
+                logger.warning(f"Failed to calculate health ratio for {address}: {e!r}")
+        return health_ratios
+
+    @classmethod
+    async def get_position_snapshot(
+        cls, contract_addresses: list[str]
+    ) -> PositionSnapshot:
+        """
+        Read the z-token balances and debts of every token for many deposit
+        contracts into a columnar snapshot for vectorized health computations.
+        Every input is read at the same block.
+        Contracts whose inputs can not be read, including a failed balance call
+        that would understate the collateral, or that hold a token without
+        a price, are left out of the snapshot.
+
+        :param contract_addresses: The addresses of the deposit contracts.
+        :return: The position snapshot.
+        """
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_POSITIONS)
+        tokens = list(TokenParams.tokens())
+
+        async def _get_inputs(address: str) -> tuple[dict, dict]:
+            async with semaphore:
+                balances, debts = await asyncio.gather(
+                    cls._get_z_balances(reserves, address, raise_errors=True),
+                    asyncio.gather(
+                        *(CLIENT.get_zklend_debt(address, t.address) for t in tokens)
+                    ),
+                )
+            return balances, {token.name: debt[0] for token, debt in zip(tokens, debts)}
+
+        async with CLIENT.snapshot() as block_number:
+            reserves = await CLIENT.get_z_addresses()
+            async with CLIENT.batch():
+                inputs = await asyncio.gather(
+                    *(_get_inputs(address) for address in contract_addresses),
+                    return_exceptions=True,
+                )
+
+        positions = {}
+        for address, position_inputs in zip(contract_addresses, inputs):
+            if isinstance(position_inputs, Exception):
+                logger.warning(
+                    f"Failed to get position snapshot inputs for {address}: "
+                    f"{position_inputs!r}"
+                )
+                continue
+            balances, debts = position_inputs
+            # A token can be both deposited and borrowed
+            held = {token for token, amount in balances.items() if amount} | {
+                token for token, amount in debts.items() if amount
+            }
+            positions[address] = (balances, debts, held)
+
+        held_tokens = set().union(*(held for _, _, held in positions.values()))
+        prices = await cls._get_pragma_prices(held_tokens, block_number)
+        for address, (_, _, held) in list(positions.items()):
+            # A missing price would count the token at 0 in the snapshot
+            if missing_prices := held - prices.keys():
+                logger.warning(
+                    f"Skipping position snapshot of {address}, "
+                    f"no prices for {sorted(missing_prices)}"
+                )
+                del positions[address]
+
+        return PositionSnapshot.from_inputs(
+            z_balances={
+                address: balances for address, (balances, _, _) in positions.items()
+            },
+            debts={address: debts for address, (_, debts, _) in positions.items()},
+            accumulators={token: reserve[2] for token, reserve in reserves.items()},
+            prices=prices,
+        )
+
 
 if __name__ == "__main__":
     print(
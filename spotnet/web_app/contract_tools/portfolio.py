@@ -0,0 +1,62 @@
+"""
+This module contains the typed z-token portfolio of a deposit contract.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ZTokenBalance:
+    """
+    The balance of a zkLend z-token held by a contract.
+    """
+
+    token: str
+    z_address: int
+    decimals: int
+    raw_balance: int
+    # The error of the balance call, the raw balance is then 0
+    error: Optional[str] = None
+
+    @property
+    def balance(self) -> Decimal:
+        """
+        The balance in whole tokens.
+        """
+        return Decimal(self.raw_balance).scaleb(-self.decimals)
+
+
+@dataclass
+class Portfolio:
+    """
+    The z-token balances of a contract, with z-token symbols (e.g. zETH) as keys.
+    """
+
+    contract_address: str
+    balances: dict[str, ZTokenBalance] = field(default_factory=dict)
+
+    def non_zero(self) -> dict[str, ZTokenBalance]:
+        """
+        Get the balances of the z-tokens the contract holds.
+
+        :return: A dictionary with z-token symbols as keys and balances as values.
+        """
+        return {
+            symbol: balance
+            for symbol, balance in self.balances.items()
+            if balance.raw_balance
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Get the portfolio in the format of the former `fetch_portfolio` result.
+
+        :return: A dictionary with z-token symbols as keys and dictionaries
+         of the raw balance as a string and the decimals as values.
+        """
+        return {
+            symbol: {"balance": str(balance.raw_balance), "decimals": balance.decimals}
+            for symbol, balance in self.balances.items()
+        }
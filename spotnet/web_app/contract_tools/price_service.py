@@ -0,0 +1,357 @@
+"""
+This module contains the price service shared by the API and the Celery workers.
+
+Prices are kept as one table per source (AVNU, Pragma). A table is served from
+memory while fresh, served stale while a single background refresh runs, and
+shared between processes through a Redis snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from decimal import Decimal
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+import redis
+from pragma_sdk.common.types.types import AggregationMode
+from pragma_sdk.onchain.client import PragmaOnChainClient
+
+from web_app.contract_tools.api_request import APIRequest
+from web_app.contract_tools.cache import AsyncTTLCache
+from web_app.contract_tools.constants import TokenParams
+
+logger = logging.getLogger(__name__)
+
+AVNU_PRICE_URL = "https://starknet.impulse.avnu.fi/v1/tokens/short"
+PRAGMA = PragmaOnChainClient(
+    network="mainnet",
+)
+
+# Seconds a price table is served without a refresh
+PRICE_TTL = float(os.environ.get("PRICE_TTL", 30))
+# Seconds a price table is served at all, refreshed in the background once stale
+PRICE_STALE_TTL = float(os.environ.get("PRICE_STALE_TTL", 300))
+
+
+class PriceSource(Enum):
+    """
+    Sources of token prices.
+    """
+
+    AVNU = "avnu"
+    PRAGMA = "pragma"
+
+
+class PriceUnavailableError(Exception):
+    """
+    Raised when a source returned no prices and no snapshot is available.
+    """
+
+    pass
+
+
+class PartialPrices(dict):
+    """
+    A price table missing the prices of some tokens whose feeds failed.
+    It is served, but not cached as a fresh table.
+    """
+
+    def __init__(self, prices: dict[str, Decimal], missing: list[str]):
+        """
+        :param prices: The prices that were fetched.
+        :param missing: The symbols of the tokens without a price.
+        """
+        super().__init__(prices)
+        self.missing = missing
+
+
+async def fetch_avnu_prices() -> dict[str, Decimal]:
+    """
+    Fetch current token prices from AVNU API.
+
+    :return: Dictionary mapping token symbols to their current prices as Decimal.
+    """
+    prices = {}
+    response = await APIRequest(base_url=AVNU_PRICE_URL).fetch("")
+    if not response:
+        return prices
+
+    for token_data in response:
+        address = token_data.get("address")
+        current_price = token_data.get("currentPrice")
+        try:
+            if address and current_price is not None:
+                address_with_leading_zero = TokenParams.add_underlying_address(address)
+                symbol = TokenParams.get_token_symbol(address_with_leading_zero)
+                if symbol:
+                    # Convert to Decimal for precise calculations
+                    prices[symbol] = Decimal(str(current_price))
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.debug(f"Error parsing price for {address}: {str(e)}")
+    return prices
+
+
+async def fetch_pragma_price(token: str, block_number: int = None) -> Decimal:
+    """
+    Get the price of a token from the Pragma API.
+
+    :param token: The token symbol (e.g., "ETH", "USDC").
+    :param block_number: The block to read the price at, None for latest.
+    :return: The price of the token as a Decimal.
+    """
+    decimals = 10**8 if token not in ("USDC", "USDT") else 10**6
+    data = await PRAGMA.get_spot(
+        f"{token}/USD", AggregationMode.MEDIAN, block_id=block_number or "latest"
+    )
+    return Decimal(data.price / decimals)
+
+
+async def fetch_pragma_prices(block_number: int = None) -> dict[str, Decimal]:
+    """
+    Fetch the prices of all supported tokens from the Pragma API.
+    Tokens whose feed failed are skipped, the table is then partial.
+
+    :param block_number: The block to read the prices at, None for latest.
+    :return: Dictionary mapping token symbols to their current prices as Decimal.
+    """
+    tokens = [token.name for token in TokenParams.tokens()]
+    results = await asyncio.gather(
+        *(fetch_pragma_price(token, block_number) for token in tokens),
+        return_exceptions=True,
+    )
+    prices, missing = {}, []
+    for token, result in zip(tokens, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Error fetching Pragma price for {token}: {result}")
+            missing.append(token)
+        else:
+            prices[token] = result
+    return PartialPrices(prices, missing) if missing else prices
+
+
+class PriceService:
+    """
+    Serves price tables per source with a TTL cache and stale-while-revalidate.
+    Concurrent refreshes of a source are coalesced into one upstream request,
+    and refreshed tables are shared with other processes through Redis.
+    """
+
+    def __init__(
+        self,
+        sources: dict[PriceSource, Callable[[], Awaitable[dict[str, Decimal]]]],
+        ttl: float = PRICE_TTL,
+        stale_ttl: float = PRICE_STALE_TTL,
+        redis_client: Optional[redis.Redis] = None,
+        block_sources: Optional[
+            dict[PriceSource, Callable[[int], Awaitable[dict[str, Decimal]]]]
+        ] = None,
+    ):
+        """
+        :param sources: Coroutine functions fetching the price table of each source.
+        :param ttl: Seconds a price table is served without a refresh.
+        :param stale_ttl: Seconds a price table is served at all.
+        :param redis_client: Redis client sharing the tables, None keeps them local.
+        :param block_sources: Coroutine functions fetching the price table of
+         on-chain sources at a given block.
+        """
+        self.sources = sources
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis_client = redis_client
+        self.block_sources = block_sources or {}
+        # source -> (prices, fetched_at as a Unix timestamp)
+        self._tables = AsyncTTLCache(ttl=stale_ttl)
+        # (source, block number) -> prices
+        self._block_tables = AsyncTTLCache(ttl=ttl)
+
+    async def get_prices(
+        self, source: PriceSource = PriceSource.AVNU, block_number: int = None
+    ) -> dict[str, Decimal]:
+        """
+        Get the price table of a source. A stale table is returned at once
+        and refreshed in the background.
+
+        :param source: The price source.
+        :param block_number: The block to get the prices at, for sources that can
+         read them at a block. The table is then cached per block and not shared.
+        :return: Dictionary mapping token symbols to their prices as Decimal.
+        :raise PriceUnavailableError: If the source has no prices.
+        """
+        if block_number is not None and source in self.block_sources:
+            return dict(await self._get_block_prices(source, block_number))
+
+        table = self._tables.get(source)
+        if table is None:
+            table = await self._tables.get_or_load(source, lambda: self._load(source))
+        elif time.time() - table[1] >= self.ttl:
+            self._revalidate(source)
+        return dict(table[0])
+
+    async def _get_block_prices(
+        self, source: PriceSource, block_number: int
+    ) -> dict[str, Decimal]:
+        """
+        Get the price table of an on-chain source at a block.
+
+        :param source: The price source.
+        :param block_number: The block number.
+        :return: Dictionary mapping token symbols to their prices as Decimal.
+        :raise PriceUnavailableError: If the source has no prices.
+        """
+
+        async def _load() -> dict[str, Decimal]:
+            prices = await self.block_sources[source](block_number)
+            if not prices:
+                raise PriceUnavailableError(
+                    f"No {source.value} prices at block {block_number}"
+                )
+            return prices
+
+        self._block_tables.prune()
+        key = (source, block_number)
+        prices = await self._block_tables.get_or_load(key, _load)
+        if isinstance(prices, PartialPrices):
+            # Served to the callers that shared the load, retried by the next one
+            self._block_tables.invalidate(key)
+        return prices
+
+    def invalidate(self, source: PriceSource = None) -> None:
+        """
+        Drop the local price table of one source, or of every source,
+        and the price tables at blocks.
+
+        :param source: The price source.
+        """
+        self._tables.invalidate(source)
+        self._block_tables.invalidate()
+
+    def _revalidate(self, source: PriceSource) -> None:
+        """
+        Refresh the price table of a source in the background,
+        unless a refresh of it is already running.
+
+        :param source: The price source.
+        """
+        future = self._tables.refresh(source, lambda: self._load(source))
+        future.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(future: asyncio.Future) -> None:
+        """
+        Log the error of a background refresh, the stale table stays served.
+
+        :param future: The future of the refresh.
+        """
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Error refreshing prices: {future.exception()}")
+
+    async def _load(self, source: PriceSource) -> tuple[dict[str, Decimal], float]:
+        """
+        Load the price table of a source from the Redis snapshot if it is fresh,
+        otherwise from the source itself.
+
+        :param source: The price source.
+        :return: The prices and the time they were fetched at.
+        :raise PriceUnavailableError: If the source has no prices.
+        """
+        snapshot = await self._read_snapshot(source)
+        if snapshot is not None and time.time() - snapshot[1] < self.ttl:
+            return snapshot
+
+        prices = await self.sources[source]()
+        if not prices:
+            if snapshot is not None:
+                logger.warning(f"No {source.value} prices, serving the shared snapshot")
+                return snapshot
+            raise PriceUnavailableError(f"No prices from {source.value}")
+
+        if isinstance(prices, PartialPrices):
+            # Served as a stale table, so the next read retries the missing tokens
+            logger.warning(f"No {source.value} prices for {prices.missing}")
+            return prices, time.time() - self.ttl
+
+        table = (prices, time.time())
+        await self._write_snapshot(source, table)
+        return table
+
+    async def _read_snapshot(
+        self, source: PriceSource
+    ) -> Optional[tuple[dict[str, Decimal], float]]:
+        """
+        Read the price table of a source shared in Redis.
+
+        :param source: The price source.
+        :return: The prices and the time they were fetched at, or None.
+        """
+        if self.redis_client is None:
+            return None
+        try:
+            data = await asyncio.to_thread(
+                self.redis_client.get, f"prices:{source.value}"
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Error reading {source.value} prices from Redis: {e}")
+            return None
+        if data is None:
+            return None
+        snapshot = json.loads(data)
+        prices = {token: Decimal(price) for token, price in snapshot["prices"].items()}
+        return prices, snapshot["fetched_at"]
+
+    async def _write_snapshot(
+        self, source: PriceSource, table: tuple[dict[str, Decimal], float]
+    ) -> None:
+        """
+        Share the price table of a source in Redis.
+
+        :param source: The price source.
+        :param table: The prices and the time they were fetched at.
+        """
+        if self.redis_client is None:
+            return
+        prices, fetched_at = table
+        data = json.dumps(
+            {
+                "prices": {token: str(price) for token, price in prices.items()},
+                "fetched_at": fetched_at,
+            }
+        )
+        try:
+            await asyncio.to_thread(
+                self.redis_client.set,
+                f"prices:{source.value}",
+                data,
+                ex=int(self.stale_ttl),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Error writing {source.value} prices to Redis: {e}")
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Get a Redis client for sharing cached data, if Redis is configured.
+
+    :return: The Redis client or None.
+    """
+    host = os.environ.get("REDIS_HOST")
+    if not host:
+        return None
+    return redis.Redis(
+        host=host,
+        port=int(os.environ.get("REDIS_PORT", 6379)),
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
+
+
+PRICE_SERVICE = PriceService(
+    sources={
+        PriceSource.AVNU: fetch_avnu_prices,
+        PriceSource.PRAGMA: fetch_pragma_prices,
+    },
+    redis_client=get_redis_client(),
+    block_sources={PriceSource.PRAGMA: fetch_pragma_prices},
+)
@@ -0,0 +1,364 @@
+"""
+This module contains the cache of API responses built from on-chain data.
+
+Responses are kept in an in-process LRU and shared between processes through
+Redis. An entry is fresh while it is younger than the TTL and was built at the
+latest block; otherwise it is served stale while a single background refresh
+runs. A response is built with its contract calls pinned to the block it is
+cached for. Writes invalidate an entry by bumping its version in Redis, so every
+process drops its copy on the next read.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Any, AsyncContextManager, Awaitable, Callable, Optional
+
+import redis
+
+from web_app.contract_tools.blockchain_call import CLIENT
+from web_app.contract_tools.price_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Responses kept in memory per process
+DASHBOARD_CACHE_SIZE = int(os.environ.get("DASHBOARD_CACHE_SIZE", 1024))
+# Seconds a response is served without a refresh
+DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", 15))
+# Seconds a response is served at all, refreshed in the background once stale
+DASHBOARD_CACHE_STALE_TTL = float(os.environ.get("DASHBOARD_CACHE_STALE_TTL", 120))
+
+
+class CacheStatus(Enum):
+    """
+    How a response was served, reported in the X-Cache header.
+    """
+
+    HIT = "HIT"
+    STALE = "STALE"
+    MISS = "MISS"
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached response with the state it was built at.
+    """
+
+    value: Any
+    fetched_at: float
+    block_number: Optional[int]
+    version: int
+
+
+@dataclass
+class CacheMetrics:
+    """
+    Counters of a response cache.
+    """
+
+    hits: int = 0
+    shared_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    invalidations: int = 0
+
+
+class ResponseCache:
+    """
+    Two-tier cache of JSON-serializable responses with block-height freshness,
+    stale-while-revalidate and versioned invalidation.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = DASHBOARD_CACHE_SIZE,
+        ttl: float = DASHBOARD_CACHE_TTL,
+        stale_ttl: float = DASHBOARD_CACHE_STALE_TTL,
+        redis_client: Optional[redis.Redis] = None,
+        block_number: Optional[Callable[[], Awaitable[int]]] = None,
+        snapshot: Optional[Callable[[int], AsyncContextManager]] = None,
+    ):
+        """
+        :param namespace: Prefix of the Redis keys of the cache.
+        :param max_entries: Responses kept in memory.
+        :param ttl: Seconds a response is served without a refresh.
+        :param stale_ttl: Seconds a response is served at all.
+        :param redis_client: Redis client sharing the responses, None keeps them local.
+        :param block_number: Coroutine function returning the latest block number,
+         None makes freshness depend on the TTL only.
+        :param snapshot: Function returning a context that pins the reads of a build
+         to the block the response is cached for, e.g. `StarknetClient.snapshot`.
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis_client = redis_client
+        self.block_number = block_number
+        self.snapshot = snapshot
+        self.metrics = CacheMetrics()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._local_versions: dict[str, int] = {}
+        # key -> (version, future) of the running refresh
+        self._refreshing: dict[str, tuple[int, asyncio.Future]] = {}
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, CacheStatus]:
+        """
+        Get a cached response, or load and store it. A stale response is returned
+        at once and refreshed in the background.
+
+        :param key: The cache key, e.g. a wallet ID.
+        :param loader: A coroutine function building the response.
+        :return: The response and how it was served.
+        """
+        (version, shared_entry), block_number = await asyncio.gather(
+            self._read_shared(key), self._get_block_number()
+        )
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            entry = (
+                shared_entry
+                if shared_entry and shared_entry.version == version
+                else None
+            )
+            if entry is not None:
+                self.metrics.shared_hits += 1
+                self._set_local(key, entry)
+
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            at_block = block_number is None or entry.block_number == block_number
+            if age < self.ttl and at_block:
+                self.metrics.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value, CacheStatus.HIT
+            if age < self.stale_ttl:
+                self.metrics.stale_hits += 1
+                self._revalidate(key, loader, version, block_number)
+                return entry.value, CacheStatus.STALE
+
+        self.metrics.misses += 1
+        entry = await asyncio.shield(self._refresh(key, loader, version, block_number))
+        return entry.value, CacheStatus.MISS
+
+    async def invalidate(self, key: str) -> None:
+        """
+        Drop a response in this and every other process.
+
+        :param key: The cache key.
+        """
+        self.metrics.invalidations += 1
+        self._entries.pop(key, None)
+        self._local_versions[key] = self._local_versions.get(key, 0) + 1
+        if self.redis_client is None:
+            return
+        try:
+            await asyncio.to_thread(self._bump_shared_version, key)
+        except redis.RedisError as e:
+            logger.warning(f"Error invalidating {self.namespace} cache in Redis: {e}")
+
+    def stats(self) -> dict:
+        """
+        Get the counters and the size of the cache.
+
+        :return: Cache statistics.
+        """
+        return {"entries": len(self._entries), **asdict(self.metrics)}
+
+    def _set_local(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store an entry in memory, evicting the least recently used one if full.
+
+        :param key: The cache key.
+        :param entry: The cache entry.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _revalidate(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        version: int,
+        block_number: Optional[int],
+    ) -> None:
+        """
+        Refresh a response in the background, unless a refresh of it is running.
+
+        :param key: The cache key.
+        :param loader: A coroutine function building the response.
+        :param version: Version of the key the response is built for.
+        :param block_number: Latest block number.
+        """
+        self._refresh(key, loader, version, block_number).add_done_callback(
+            self._log_refresh_error
+        )
+
+    def _refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        version: int,
+        block_number: Optional[int],
+    ) -> asyncio.Future:
+        """
+        Start building a response, or join the build of the same key and version
+        that is already running.
+
+        :param key: The cache key.
+        :param loader: A coroutine function building the response.
+        :param version: Version of the key the response is built for.
+        :param block_number: Latest block number.
+        :return: A future of the new cache entry.
+        """
+        running_version, future = self._refreshing.get(key, (None, None))
+        if (
+            future is None
+            or running_version != version
+            or future.get_loop() is not asyncio.get_running_loop()
+        ):
+            future = asyncio.ensure_future(
+                self._load(key, loader, version, block_number)
+            )
+            self._refreshing[key] = (version, future)
+        return future
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        version: int,
+        block_number: Optional[int],
+    ) -> CacheEntry:
+        """
+        Build a response and store it in memory and in Redis.
+
+        :param key: The cache key.
+        :param loader: A coroutine function building the response.
+        :param version: Version of the key the response is built for.
+        :param block_number: Latest block number.
+        :return: The new cache entry.
+        """
+        self.metrics.refreshes += 1
+        pinned = (
+            self.snapshot(block_number)
+            if self.snapshot is not None and block_number is not None
+            else nullcontext()
+        )
+        try:
+            async with pinned:
+                value = await loader()
+            entry = CacheEntry(value, time.time(), block_number, version)
+            self._set_local(key, entry)
+            await self._write_shared(key, entry)
+            return entry
+        finally:
+            if self._refreshing.get(key, (None, None))[0] == version:
+                self._refreshing.pop(key, None)
+
+    def _log_refresh_error(self, future: asyncio.Future) -> None:
+        """
+        Log the error of a background refresh, the stale response stays served.
+
+        :param future: The future of the refresh.
+        """
+        if not future.cancelled() and future.exception() is not None:
+            self.metrics.refresh_errors += 1
+            logger.warning(
+                f"Error refreshing {self.namespace} cache: {future.exception()}"
+            )
+
+    async def _get_block_number(self) -> Optional[int]:
+        """
+        Get the latest block number, or None if it is unknown.
+
+        :return: The block number or None.
+        """
+        if self.block_number is None:
+            return None
+        try:
+            return await self.block_number()
+        except Exception as e:  # Fall back to TTL freshness while the node is down
+            logger.warning(f"Error getting the block number: {e}")
+            return None
+
+    def _shared_keys(self, key: str) -> tuple[str, str]:
+        """
+        Get the Redis keys of the version and the entry of a cache key.
+
+        :param key: The cache key.
+        :return: The version key and the entry key.
+        """
+        return f"{self.namespace}:version:{key}", f"{self.namespace}:{key}"
+
+    def _bump_shared_version(self, key: str) -> None:
+        """
+        Increment the shared version of a key and delete its shared entry.
+
+        :param key: The cache key.
+        """
+        version_key, entry_key = self._shared_keys(key)
+        with self.redis_client.pipeline() as pipeline:
+            pipeline.incr(version_key)
+            pipeline.delete(entry_key)
+            pipeline.execute()
+
+    async def _read_shared(self, key: str) -> tuple[int, Optional[CacheEntry]]:
+        """
+        Read the version and the entry of a key from Redis in one round trip.
+
+        :param key: The cache key.
+        :return: The current version and the shared entry, or None.
+        """
+        if self.redis_client is None:
+            return self._local_versions.get(key, 0), None
+        try:
+            version, data = await asyncio.to_thread(
+                self.redis_client.mget, *self._shared_keys(key)
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Error reading {self.namespace} cache from Redis: {e}")
+            return self._local_versions.get(key, 0), None
+        entry = CacheEntry(**json.loads(data)) if data is not None else None
+        return int(version or 0), entry
+
+    async def _write_shared(self, key: str, entry: CacheEntry) -> None:
+        """
+        Share an entry in Redis.
+
+        :param key: The cache key.
+        :param entry: The cache entry.
+        """
+        if self.redis_client is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.redis_client.set,
+                self._shared_keys(key)[1],
+                json.dumps(asdict(entry)),
+                ex=int(self.stale_ttl),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Error writing {self.namespace} cache to Redis: {e}")
+
+
+DASHBOARD_CACHE = ResponseCache(
+    "dashboard",
+    redis_client=get_redis_client(),
+    block_number=CLIENT.get_block_number,
+    snapshot=CLIENT.snapshot,
+)
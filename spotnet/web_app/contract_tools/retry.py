@@ -0,0 +1,128 @@
+"""
+This module contains the async retry policy for Starknet contract calls.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.http_client import ServerError
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# HTTP statuses of the node that are worth another attempt
+RETRYABLE_HTTP_STATUSES = frozenset({"408", "425", "429", "500", "502", "503", "504"})
+
+
+class RetryDeadlineExceeded(Exception):
+    """
+    Raised when a call did not succeed before the deadline of its retry policy.
+    """
+
+    pass
+
+
+@dataclass
+class RetryStats:
+    """
+    Counters of a retry policy.
+    """
+
+    attempts: int = 0
+    retries: int = 0
+    successes: int = 0
+    give_ups: int = 0
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries failed calls with jittered exponential backoff without blocking
+    the event loop. Only transient errors are retried, and every call is bounded
+    by an overall deadline.
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 30.0
+    stats: RetryStats = field(default_factory=RetryStats)
+
+    @staticmethod
+    def is_retryable(exc: BaseException) -> bool:
+        """
+        Check if an error is transient: a network failure, a timeout, a malformed
+        node response or a retryable HTTP status. Contract errors are final.
+
+        :param exc: The raised exception.
+        :return: True if the call can be retried.
+        """
+        if isinstance(exc, ClientError):
+            return str(exc.code) in RETRYABLE_HTTP_STATUSES
+        return isinstance(
+            exc,
+            (
+                aiohttp.ClientConnectionError,
+                aiohttp.ServerTimeoutError,
+                asyncio.TimeoutError,
+                ConnectionError,
+                ServerError,
+            ),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the full-jitter backoff delay before the next attempt.
+
+        :param attempt: The number of the failed attempt, starting from 1.
+        :return: Delay in seconds.
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    async def run(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call until it succeeds, fails with a non-retryable error,
+        runs out of attempts or hits the deadline.
+
+        :param func: A factory returning a new awaitable for every attempt.
+        :return: The result of the call.
+        :raise RetryDeadlineExceeded: If the deadline is hit before a result.
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats.attempts += 1
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(func(), timeout=remaining)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and time.monotonic() >= deadline:
+                    self.stats.give_ups += 1
+                    raise RetryDeadlineExceeded(
+                        f"Call did not finish in {self.deadline} seconds"
+                    ) from e
+                if not self.is_retryable(e) or attempt >= self.max_attempts:
+                    self.stats.give_ups += 1
+                    raise
+
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    self.stats.give_ups += 1
+                    raise
+                logger.warning(
+                    f"Attempt {attempt} failed with {e!r}, retrying in {delay:.2f}s"
+                )
+                self.stats.retries += 1
+                await asyncio.sleep(delay)
+            else:
+                self.stats.successes += 1
+                return result
@@ -0,0 +1,153 @@
+"""
+This module batches Starknet contract calls into JSON-RPC batch requests.
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional
+
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import Call
+from starknet_py.net.full_node_client import get_block_identifier
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class RpcBatcher:
+    """
+    Collects `starknet_call` requests issued within a short window and sends
+    them to the node as one JSON-RPC batch array. Every caller awaits its own
+    future, which is resolved with the matching entry of the batch response.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        http_client: RpcHttpClient,
+        window: float = 0.0,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        """
+        :param http_client: The RPC HTTP client of the node to send batches to.
+        :param window: Seconds to wait for more calls after the first one is queued.
+        :param max_batch_size: The maximum number of calls in one batch request.
+        """
+        self.http_client = http_client
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.calls_sent = 0
+
+    @staticmethod
+    def _build_params(call: Call, block_id: Any) -> dict:
+        """
+        Build `starknet_call` params for a contract call.
+
+        :param call: The contract call.
+        :param block_id: The raw block identifier to run the call against.
+        :return: JSON-RPC params dictionary.
+        """
+        return {
+            "request": {
+                "contract_address": hex(call.to_addr),
+                "entry_point_selector": hex(call.selector),
+                "calldata": [hex(value) for value in call.calldata],
+            },
+            "block_id": block_id,
+        }
+
+    async def call(self, call: Call, block_id: Any = None) -> List[int]:
+        """
+        Queue a contract call into the current batch and wait for its result.
+
+        :param call: The contract call.
+        :param block_id: The raw block identifier, defaults to the node's default tag.
+        :return: The call result as a list of integers.
+        """
+        if block_id is None:
+            block_id = get_block_identifier()["block_id"]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((self._build_params(call, block_id), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.window, self.flush
+            )
+        return await future
+
+    def flush(self) -> None:
+        """
+        Send all queued calls as one batch request.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._send(pending))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def drain(self) -> None:
+        """
+        Flush queued calls and wait until every sent batch is answered.
+        """
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _send(self, pending: list[tuple[dict, asyncio.Future]]) -> None:
+        """
+        Send a batch request and demultiplex the responses to the waiting futures.
+
+        :param pending: The queued (params, future) pairs.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "method": "starknet_call", "id": index, "params": params}
+            for index, (params, _) in enumerate(pending)
+        ]
+        self.batches_sent += 1
+        self.calls_sent += len(payload)
+        try:
+            response = await self.http_client.request(
+                address=self.http_client.url,
+                http_method=HttpMethod.POST,
+                payload=payload,
+            )
+        except Exception as e:  # The whole batch failed, fail every call in it
+            logger.error(f"Error sending batch of {len(payload)} calls: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if isinstance(response, dict):
+            # Some nodes answer a malformed batch with a single error object
+            response = [response]
+        results = {item.get("id"): item for item in response}
+
+        for index, (_, future) in enumerate(pending):
+            if future.done():
+                continue
+            item = results.get(index)
+            if item is None:
+                future.set_exception(
+                    ClientError(message=f"Missing response for batched call {index}")
+                )
+            elif "result" in item:
+                future.set_result([int(value, 16) for value in item["result"]])
+            else:
+                try:
+                    RpcHttpClient.handle_rpc_error(item)
+                except Exception as e:
+                    future.set_exception(e)
@@ -8,9 +8,11 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, TypeVar
 
+from sqlalchemy import delete, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 
-from web_app.db.models import AirDrop, Base
+from web_app.db.models import AirDrop, AirdropProof, Base, User, get_proof_hash
 
 from .base import DBConnector
 
@@ -56,6 +58,206 @@ class AirDropDBConnector(DBConnector):
                 )
                 return []
 
+    def get_unclaimed_page(
+        self, limit: int, after: tuple[str, uuid.UUID] | None = None
+    ) -> list[dict]:
+        """
+        Returns a page of unclaimed airdrops ordered by the contract address of
+        their user and then by ID, with the contract address joined in, using
+        keyset pagination. The airdrops of a contract come one after another,
+        so that the contract is claimed once for all of them.
+
+        :param limit: number of records to return
+        :param after: contract address and ID of the last airdrop of the previous
+         page, None for the first page
+        :return: list of dicts with id, amount and contract_address
+        :raise SQLAlchemyError: If the database operation fails, so that a failed
+         read is not taken for the last page.
+        """
+        query = (
+            select(AirDrop.id, AirDrop.amount, User.contract_address)
+            .join(User, AirDrop.user_id == User.id)
+            .where(AirDrop.is_claimed.is_(False))
+            .order_by(User.contract_address, AirDrop.id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(User.contract_address, AirDrop.id) > tuple_(*after)
+            )
+        with self.Session() as db:
+            try:
+                return [dict(row._mapping) for row in db.execute(query)]
+            except SQLAlchemyError as e:
+                logger.error(
+                    f"Failed to retrieve unclaimed AirDrop instances: {str(e)}"
+                )
+                raise
+
+    def save_claims(self, claims: dict[uuid.UUID, Decimal]) -> None:
+        """
+        Marks many airdrops as claimed with their amounts in one bulk UPDATE.
+
+        :param claims: dict with airdrop IDs as keys and claimed amounts as values
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        if not claims:
+            return
+        claimed_at = datetime.now()
+        with self.Session() as db:
+            try:
+                db.execute(
+                    update(AirDrop),
+                    [
+                        {
+                            "id": airdrop_id,
+                            "amount": amount,
+                            "is_claimed": True,
+                            "claimed_at": claimed_at,
+                        }
+                        for airdrop_id, amount in claims.items()
+                    ],
+                )
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+
+    def get_cached_proofs(
+        self, contract_addresses: list[str], fetched_after: datetime
+    ) -> dict[str, list[dict]]:
+        """
+        Returns the cached reward items of contracts fetched after a given time.
+
+        :param contract_addresses: list of contract addresses
+        :param fetched_after: oldest fetch time of the items to return
+        :return: dict with contract addresses as keys and lists of item dicts
+         with round, amount, proof, recipient and is_claimed as values
+        """
+        query = (
+            select(AirdropProof)
+            .where(
+                AirdropProof.contract_address.in_(contract_addresses),
+                AirdropProof.fetched_at >= fetched_after,
+            )
+            .order_by(
+                AirdropProof.contract_address,
+                AirdropProof.round,
+                AirdropProof.proof_hash,
+            )
+        )
+        proofs: dict[str, list[dict]] = {}
+        with self.Session() as db:
+            try:
+                for proof in db.scalars(query):
+                    proofs.setdefault(proof.contract_address, []).append(
+                        {
+                            "round": proof.round,
+                            "amount": proof.amount,
+                            "proof": proof.proof,
+                            "recipient": proof.recipient,
+                            "is_claimed": proof.is_claimed,
+                        }
+                    )
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to retrieve cached airdrop proofs: {str(e)}")
+                return {}
+        return proofs
+
+    def save_proofs(self, proofs: dict[str, list[dict]]) -> None:
+        """
+        Replaces the cached reward items of contracts in one transaction. Items are
+        keyed by the hash of their proof, items claimed in the cache stay claimed,
+        and unclaimed cached items the reward API no longer lists are removed.
+        Contracts without items are skipped, as the reward API answers failed
+        requests with no items, and claimed items are never removed, so that
+        they are not claimed again.
+
+        :param proofs: dict with contract addresses as keys and lists of item dicts
+         with round, amount, proof, recipient and is_claimed as values
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        proofs = {
+            contract_address: items
+            for contract_address, items in proofs.items()
+            if items
+        }
+        if not proofs:
+            return
+        fetched_at = datetime.now()
+        rows = {
+            (contract_address, get_proof_hash(item["proof"])): {
+                "contract_address": contract_address,
+                "proof_hash": get_proof_hash(item["proof"]),
+                **item,
+                "fetched_at": fetched_at,
+            }
+            for contract_address, items in proofs.items()
+            for item in items
+        }
+        insert = (
+            sqlite.insert if self.engine.dialect.name == "sqlite" else postgresql.insert
+        )
+        statement = insert(AirdropProof).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=[AirdropProof.contract_address, AirdropProof.proof_hash],
+            set_={
+                **{
+                    name: statement.excluded[name]
+                    for name in ("round", "amount", "recipient", "fetched_at")
+                },
+                "is_claimed": or_(
+                    AirdropProof.is_claimed, statement.excluded.is_claimed
+                ),
+            },
+        )
+        stale = delete(AirdropProof).where(
+            AirdropProof.contract_address.in_(list(proofs)),
+            AirdropProof.is_claimed.is_(False),
+            tuple_(AirdropProof.contract_address, AirdropProof.proof_hash).not_in(
+                list(rows)
+            ),
+        )
+        with self.Session() as db:
+            try:
+                db.execute(stale)
+                db.execute(statement)
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+
+    def mark_proofs_claimed(self, proof_hashes: dict[str, list[str]]) -> None:
+        """
+        Marks cached reward items as claimed.
+
+        :param proof_hashes: dict with contract addresses as keys and the proof
+         hashes of the claimed items as values
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        keys = [
+            (contract_address, proof_hash)
+            for contract_address, contract_hashes in proof_hashes.items()
+            for proof_hash in contract_hashes
+        ]
+        if not keys:
+            return
+        with self.Session() as db:
+            try:
+                db.execute(
+                    update(AirdropProof)
+                    .where(
+                        tuple_(
+                            AirdropProof.contract_address, AirdropProof.proof_hash
+                        ).in_(keys)
+                    )
+                    .values(is_claimed=True)
+                )
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+
     def delete_all_users_airdrop(self, user_id: uuid.UUID) -> None:
         """
         Delete all airdrops for a user.
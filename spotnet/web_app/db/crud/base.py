@@ -2,15 +2,18 @@
 This module contains the base crud database configuration.
 """
 
+import inspect
 import logging
 import uuid
-from typing import Type, TypeVar
+from typing import Any, Callable, Type, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.util import greenlet_spawn
 
-from web_app.db.database import SQLALCHEMY_DATABASE_URL
+from web_app.db.database import ASYNC_SQLALCHEMY_DATABASE_URL, SQLALCHEMY_DATABASE_URL
+from web_app.db.engines import ENGINES
 from web_app.db.models import AirDrop, Base
 
 logger = logging.getLogger(__name__)
@@ -28,12 +31,14 @@ class DBConnector:
     - remove_object: Removes an object by its ID from the database.
     """
 
-    def __init__(self, db_url: str = SQLALCHEMY_DATABASE_URL):
+    def __init__(self, db_url: str = SQLALCHEMY_DATABASE_URL, engine: Engine = None):
         """
-        Initialize the database connection and session factory.
+        Initialize the database session factory on the shared engine.
         :param db_url: str = None
+        :param engine: Engine = None - use this engine instead of the shared
+         engine of `db_url`
         """
-        self.engine = create_engine(db_url)
+        self.engine = engine or ENGINES.get_engine(db_url)
         self.session_factory = sessionmaker(bind=self.engine)
         self.Session = scoped_session(self.session_factory)
 
@@ -140,3 +145,84 @@ class DBConnector:
         airdrop = AirDrop(user_id=user_id)
         self.write_to_db(airdrop)
         return airdrop
+
+
+class AsyncDBConnector:
+    """
+    Async counterpart of DBConnector on asyncpg and AsyncSession, for use in
+    async FastAPI handlers without blocking the event loop.
+
+    It exposes every public method of `sync_connector` as a coroutine with the
+    same arguments. Each call runs the sync method on a new sync connector
+    built on the `sync_engine` of the async engine, inside a greenlet as
+    `AsyncSession.run_sync` does, so its database I/O is awaited on the event
+    loop. The queries are written once for both connectors and behave the
+    same in both.
+
+    Subclasses set `sync_connector` to the connector they mirror:
+
+        class AsyncUserDBConnector(AsyncDBConnector):
+            sync_connector = UserDBConnector
+    """
+
+    sync_connector: Type[DBConnector] = DBConnector
+
+    def __init__(self, db_url: str = ASYNC_SQLALCHEMY_DATABASE_URL):
+        """
+        Initialize the async database session factory on the shared engine.
+        :param db_url: str = None
+        """
+        self.engine = ENGINES.get_async_engine(db_url)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._add_async_methods()
+
+    @classmethod
+    def _add_async_methods(cls) -> None:
+        """
+        Add a coroutine for every public method of the sync connector
+        that the class does not define itself.
+        """
+        for name in dir(cls.sync_connector):
+            if name.startswith("_") or name in cls.__dict__:
+                continue
+            method = inspect.getattr_static(cls.sync_connector, name)
+            if inspect.isfunction(method) and not inspect.isgeneratorfunction(method):
+                setattr(cls, name, cls._make_async_method(name, method))
+
+    @staticmethod
+    def _make_async_method(name: str, method: Callable) -> Callable:
+        """
+        Make a coroutine running a method of the sync connector in an AsyncSession.
+        :param name: str - name of the method
+        :param method: the sync method
+        :return: the coroutine function
+        """
+
+        async def async_method(self, *args, **kwargs):
+            """
+            Run the sync method on the sync engine of the async engine.
+            """
+            return await greenlet_spawn(self._call_sync, name, args, kwargs)
+
+        async_method.__name__ = name
+        async_method.__qualname__ = f"AsyncDBConnector.{name}"
+        async_method.__doc__ = method.__doc__
+        return async_method
+
+    def _call_sync(self, name: str, args: tuple, kwargs: dict) -> Any:
+        """
+        Call a method of a sync connector on the sync engine of the async engine.
+        The connector is built per call, as its scoped session is shared
+        by the calls running in the same thread.
+        :param name: str - name of the method
+        :param args: tuple - positional arguments of the method
+        :param kwargs: dict - keyword arguments of the method
+        :return: the result of the method
+        """
+        connector = self.sync_connector(engine=self.engine.sync_engine)
+        return getattr(connector, name)(*args, **kwargs)
+
+
+AsyncDBConnector._add_async_methods()
@@ -64,8 +64,9 @@ class DepositDBConnector(DBConnector):
         if not vault:
             raise ValueError("Vault not found")
         with self.Session() as db:
-            new_amount = Decimal(vault.amount) + Decimal(amount)
-            db.query(Vault).filter_by(id=vault.id).update(amount=str(new_amount))
+            db.query(Vault).filter_by(id=vault.id).update(
+                {Vault.amount: Vault.amount + Decimal(amount)}
+            )
             db.commit()
             vault = self.get_vault(wallet_id, symbol)
         return vault
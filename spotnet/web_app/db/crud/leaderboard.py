@@ -2,10 +2,9 @@
 This module provides CRUD operations for the leaderboard, retrieving the top users by positions.
 
 """
-from .base import DBConnector
+from .base import AsyncDBConnector, DBConnector
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
-from web_app.db.models import User, Position
+from web_app.db.models import TokenStats, UserStats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,20 +17,16 @@ class LeaderboardDBConnector(DBConnector):
 
     def get_top_users_by_positions(self) -> list[dict]:
         """
-        Retrieves the top 10 users ordered by closed/opened positions.
+        Retrieves the top 10 users ordered by closed/opened positions,
+        read from the maintained user statistics in index order.
         :return: List of dictionaries containing wallet_id and positions_number.
         """
         with self.Session() as db:
             try:
                 results = (
-                    db.query(
-                        User.wallet_id,
-                        func.count(Position.id).label("positions_number")
-                    )
-                    .join(Position, Position.user_id == User.id)
-                    .filter(Position.status.in_(["closed", "opened"]))
-                    .group_by(User.wallet_id)
-                    .order_by(func.count(Position.id).desc())
+                    db.query(UserStats.wallet_id, UserStats.positions_number)
+                    .filter(UserStats.positions_number > 0)
+                    .order_by(UserStats.positions_number.desc(), UserStats.wallet_id)
                     .limit(10)
                     .all()
                 )
@@ -47,18 +42,15 @@ class LeaderboardDBConnector(DBConnector):
             
     def get_position_token_statistics(self) -> list[dict]:
         """
-        Retrieves closed/opened positions groupped by token_symbol.
+        Retrieves closed/opened positions groupped by token_symbol,
+        read from the maintained token statistics.
         :return: List of dictionaries containing token_symbol and total_positions.
         """
         with self.Session() as db:
             try:
                 results = (
-                    db.query(
-                        Position.token_symbol,
-                        func.count(Position.id).label("total_positions")
-                    )
-                    .filter(Position.status.in_(["closed", "opened"]))
-                    .group_by(Position.token_symbol)
+                    db.query(TokenStats.token_symbol, TokenStats.total_positions)
+                    .filter(TokenStats.total_positions > 0)
                     .all()
                 )
 
@@ -73,3 +65,11 @@ class LeaderboardDBConnector(DBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Error retrieving position token statistics: {e}")
                 return []
+
+
+class AsyncLeaderboardDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of LeaderboardDBConnector.
+    """
+
+    sync_connector = LeaderboardDBConnector
@@ -2,6 +2,8 @@
 This module contains the position database configuration.
 """
 
+import base64
+import json
 import logging
 import uuid
 from datetime import datetime
@@ -9,18 +11,44 @@ from decimal import Decimal
 from typing import TypeVar
 from uuid import UUID
 
-from sqlalchemy import DECIMAL, Numeric, cast, func
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from web_app.db.models import Base, ExtraDeposit, Position, Status, Transaction, User
 
+from .base import AsyncDBConnector
 from .user import UserDBConnector
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+def encode_position_cursor(created_at: datetime, position_id: UUID) -> str:
+    """
+    Encodes the keyset of a position into an opaque pagination cursor.
+    :param created_at: creation time of the position
+    :param position_id: ID of the position
+    :return: str
+    """
+    keyset = json.dumps([created_at.isoformat(), str(position_id)])
+    return base64.urlsafe_b64encode(keyset.encode()).decode()
+
+
+def decode_position_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decodes a pagination cursor into the keyset of a position.
+    :param cursor: str
+    :return: tuple of the creation time and the ID of the position
+    :raise ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, position_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), UUID(position_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 class PositionDBConnector(UserDBConnector):
     """
     Provides database connection and operations management for the Position model.
@@ -77,15 +105,12 @@ class PositionDBConnector(UserDBConnector):
         :return: list of dict
         """
         with self.Session() as db:
-            user = self._get_user_by_wallet_id(wallet_id)
-            if not user:
-                return []
-
             try:
                 positions = (
                     db.query(Position)
+                    .join(User, Position.user_id == User.id)
                     .filter(
-                        Position.user_id == user.id,
+                        User.wallet_id == wallet_id,
                         Position.status == Status.OPENED.value,
                     )
                     .order_by(Position.created_at.desc())
@@ -103,7 +128,7 @@ class PositionDBConnector(UserDBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Failed to retrieve positions: {str(e)}")
                 return []
-      
+
     def get_all_positions_by_wallet_id(
         self, wallet_id: str, start: int, limit: int
     ) -> list[dict]:
@@ -116,16 +141,11 @@ class PositionDBConnector(UserDBConnector):
         :return: list of dict
         """
         with self.Session() as db:
-            user = self._get_user_by_wallet_id(wallet_id)
-            if not user:
-                return []
-
             try:
                 positions = (
                     db.query(Position)
-                    .filter(
-                        Position.user_id == user.id,
-                    )
+                    .join(User, Position.user_id == User.id)
+                    .filter(User.wallet_id == wallet_id)
                     .order_by(Position.created_at.desc())
                     .offset(start)
                     .limit(limit)
@@ -138,23 +158,98 @@ class PositionDBConnector(UserDBConnector):
             except SQLAlchemyError as e:
                 logger.error(f"Failed to retrieve positions: {str(e)}")
                 return []
-    
+
+    def get_all_positions_with_count_by_wallet_id(
+        self, wallet_id: str, start: int, limit: int
+    ) -> tuple[list[dict], int]:
+        """
+        Retrieves a page of positions of a user by their wallet ID together with
+        the total number of positions of the user, in one query.
+        :param wallet_id: str
+        :param start: starting index for pagination
+        :param limit: number of records to return
+        :return: tuple of the list of dict and the total count
+        """
+        with self.Session() as db:
+            try:
+                rows = (
+                    db.query(Position, func.count().over().label("total_count"))
+                    .join(User, Position.user_id == User.id)
+                    .filter(User.wallet_id == wallet_id)
+                    .order_by(Position.created_at.desc(), Position.id.desc())
+                    .offset(start)
+                    .limit(limit)
+                    .all()
+                )
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to retrieve positions: {str(e)}")
+                return [], 0
+
+        if not rows:
+            # A page past the end has no rows to carry the count
+            total_count = (
+                self.get_count_positions_by_wallet_id(wallet_id) if start else 0
+            )
+            return [], total_count
+        positions = [self._position_to_dict(position) for position, _ in rows]
+        return positions, rows[0].total_count
+
+    def get_positions_page_by_wallet_id(
+        self, wallet_id: str, limit: int, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+        Retrieves a page of positions of a user by their wallet ID, newest first,
+        using keyset pagination on (created_at, id) instead of an offset.
+        :param wallet_id: str
+        :param limit: number of records to return
+        :param cursor: cursor of the page returned by the previous call,
+         None for the first page
+        :return: tuple of the list of dict and the cursor of the next page,
+         None on the last page
+        :raise ValueError: If the cursor is malformed
+        """
+        keyset = decode_position_cursor(cursor) if cursor else None
+        with self.Session() as db:
+            try:
+                query = (
+                    db.query(Position)
+                    .join(User, Position.user_id == User.id)
+                    .filter(User.wallet_id == wallet_id)
+                )
+                if keyset:
+                    query = query.filter(
+                        tuple_(Position.created_at, Position.id) < keyset
+                    )
+                positions = (
+                    query.order_by(Position.created_at.desc(), Position.id.desc())
+                    .limit(limit + 1)
+                    .all()
+                )
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to retrieve positions: {str(e)}")
+                return [], None
+
+        next_cursor = None
+        if len(positions) > limit:
+            positions = positions[:limit]
+            next_cursor = encode_position_cursor(
+                positions[-1].created_at, positions[-1].id
+            )
+        return [self._position_to_dict(position) for position in positions], next_cursor
+
     def get_count_positions_by_wallet_id(self, wallet_id: str) -> int:
         """
         Counts total number of positions for a user.
-        
+
         :param wallet_id: Wallet ID of the user
         :return: Total number of positions
         """
         with self.Session() as db:
-            user = self._get_user_by_wallet_id(wallet_id)
-            if not user:
-                return 0
-
             try:
                 total_positions = (
                     db.query(func.count(Position.id))
-                    .filter(Position.user_id == user.id)
+                    .join(User, Position.user_id == User.id)
+                    .filter(User.wallet_id == wallet_id)
                     .scalar()
                 )
                 return total_positions or 0
@@ -170,15 +265,12 @@ class PositionDBConnector(UserDBConnector):
         :return: bool
         """
         with self.Session() as db:
-            user = self._get_user_by_wallet_id(wallet_id)
-            if not user:
-                return False
-
             try:
                 position_exists = db.query(
                     db.query(Position)
+                    .join(User, Position.user_id == User.id)
                     .filter(
-                        Position.user_id == user.id,
+                        User.wallet_id == wallet_id,
                         Position.status == Status.OPENED.value,
                     )
                     .exists()
@@ -334,7 +426,7 @@ class PositionDBConnector(UserDBConnector):
                 token_amounts = (
                     db.query(
                         Position.token_symbol,
-                        func.sum(cast(Position.amount, Numeric)).label("total_amount"),
+                        func.sum(Position.amount).label("total_amount"),
                     )
                     .filter(Position.status != Status.PENDING.value)
                     .group_by(Position.token_symbol)
@@ -448,6 +540,23 @@ class PositionDBConnector(UserDBConnector):
                 logger.error(f"Error retrieving liquidated positions: {str(e)}")
                 return []
 
+    def get_wallet_id_by_position_id(self, position_id: UUID) -> str | None:
+        """
+        Retrieves the wallet ID of the owner of a position.
+        :param position_id: Position ID
+        :return: wallet ID | None
+        """
+        with self.Session() as db:
+            try:
+                return db.scalar(
+                    select(User.wallet_id)
+                    .join(Position, Position.user_id == User.id)
+                    .where(Position.id == position_id)
+                )
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to retrieve wallet of position: {str(e)}")
+                return None
+
     def get_position_by_id(self, position_id: int) -> Position | None:
         """
         Retrieves a position by its ID.
@@ -478,17 +587,14 @@ class PositionDBConnector(UserDBConnector):
         If the token already exists for this position, update its amount.
         Otherwise, create a new extra deposit entry.
         """
+        statement = insert(ExtraDeposit).values(
+            position_id=position.id, token_symbol=token_symbol, amount=amount
+        )
         with self.Session() as session:
             session.execute(
-                insert(ExtraDeposit)
-                .values(
-                    position_id=position.id, token_symbol=token_symbol, amount=amount
-                )
-                .on_conflict_do_update(
+                statement.on_conflict_do_update(
                     index_elements=["position_id", "token_symbol"],
-                    set_={
-                        "amount": cast(ExtraDeposit.amount, DECIMAL) + Decimal(amount)
-                    },
+                    set_={"amount": ExtraDeposit.amount + statement.excluded.amount},
                 )
             )
 
@@ -532,3 +638,11 @@ class PositionDBConnector(UserDBConnector):
         with self.Session() as db:
             db.query(ExtraDeposit).filter(ExtraDeposit.position_id == position_id).delete()
             db.commit()
+
+
+class AsyncPositionDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of PositionDBConnector.
+    """
+
+    sync_connector = PositionDBConnector
@@ -0,0 +1,274 @@
+"""
+This module contains the platform statistics maintained as positions and users change.
+
+Mapper listeners update the token_stats, user_stats and platform_counter tables
+inside the flush that inserts, updates or deletes a position or a user, so the statistics
+commit or roll back together with the change that caused them.
+"""
+
+import logging
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import Connection, delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from web_app.db.models import (
+    PlatformCounter,
+    Position,
+    Status,
+    TokenStats,
+    User,
+    UserStats,
+)
+
+from .base import AsyncDBConnector, DBConnector
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_USERS_COUNTER = "unique_users"
+# Positions counted by the statistics, the same as `get_total_amounts_for_open_positions`
+COUNTED_STATUSES = (Status.OPENED, Status.CLOSED)
+
+
+def _upsert(connection: Connection, model, values: dict, increments: dict) -> None:
+    """
+    Inserts a statistics row or adds the increments to the existing one.
+    :param connection: connection of the flush
+    :param model: TokenStats, UserStats or PlatformCounter
+    :param values: primary key and initial values of the row
+    :param increments: column name: value to add on conflict
+    """
+    insert = sqlite.insert if connection.dialect.name == "sqlite" else postgresql.insert
+    statement = insert(model).values(**values)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[key.name for key in inspect(model).primary_key],
+            set_={
+                **{
+                    name: getattr(model, name) + value
+                    for name, value in increments.items()
+                },
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def _is_counted(status: Status | str | None) -> bool:
+    """
+    Checks whether a position with the given status is counted by the statistics.
+    :param status: position status
+    :return: bool
+    """
+    return status is not None and Status(status) in COUNTED_STATUSES
+
+
+def _count_position(
+    connection: Connection,
+    user_id: UUID,
+    token_symbol: str,
+    amount: str | Decimal,
+    sign: int,
+) -> None:
+    """
+    Adds a counted position to the token and user statistics, or removes it.
+    :param connection: connection of the flush
+    :param user_id: ID of the owner of the position
+    :param token_symbol: token symbol of the position
+    :param amount: position amount
+    :param sign: 1 to add the position, -1 to remove it
+    """
+    amount = sign * Decimal(str(amount or 0))
+    _upsert(
+        connection,
+        TokenStats,
+        {"token_symbol": token_symbol, "total_amount": amount, "total_positions": sign},
+        {"total_amount": amount, "total_positions": sign},
+    )
+    _upsert(
+        connection,
+        UserStats,
+        {
+            "user_id": user_id,
+            "wallet_id": select(User.wallet_id)
+            .where(User.id == user_id)
+            .scalar_subquery(),
+            "positions_number": sign,
+        },
+        {"positions_number": sign},
+    )
+
+
+def _add_counter(connection: Connection, name: str, delta: int) -> None:
+    """
+    Adds a value to a platform counter.
+    :param connection: connection of the flush
+    :param name: counter name
+    :param delta: value to add, negative to subtract
+    """
+    _upsert(
+        connection, PlatformCounter, {"name": name, "value": delta}, {"value": delta}
+    )
+
+
+def _previous_value(position: Position, name: str):
+    """
+    Returns the value an attribute of a position had before the flush.
+    :param position: Position being flushed
+    :param name: attribute name
+    :return: the previous value, or the current one if it did not change
+    """
+    history = inspect(position).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(position, name)
+
+
+@event.listens_for(Position, "after_insert")
+def _count_inserted_position(mapper, connection: Connection, target: Position) -> None:
+    """
+    Adds an inserted position to the statistics.
+    """
+    if _is_counted(target.status):
+        _count_position(
+            connection, target.user_id, target.token_symbol, target.amount, 1
+        )
+
+
+@event.listens_for(Position, "after_update")
+def _count_updated_position(mapper, connection: Connection, target: Position) -> None:
+    """
+    Moves an updated position to its new status, token and amount
+    in the statistics.
+    """
+    fields = ("user_id", "token_symbol", "amount")
+    previous = [_previous_value(target, name) for name in fields]
+    current = [getattr(target, name) for name in fields]
+    was_counted = _is_counted(_previous_value(target, "status"))
+    is_counted = _is_counted(target.status)
+    if was_counted == is_counted and (not is_counted or previous == current):
+        return
+
+    if was_counted:
+        _count_position(connection, *previous, -1)
+    if is_counted:
+        _count_position(connection, *current, 1)
+
+
+@event.listens_for(Position, "after_delete")
+def _count_deleted_position(mapper, connection: Connection, target: Position) -> None:
+    """
+    Removes a deleted position from the statistics.
+    """
+    if _is_counted(target.status):
+        _count_position(
+            connection, target.user_id, target.token_symbol, target.amount, -1
+        )
+
+
+@event.listens_for(User, "after_insert")
+def _count_inserted_user(mapper, connection: Connection, target: User) -> None:
+    """
+    Counts an inserted user.
+    """
+    _add_counter(connection, UNIQUE_USERS_COUNTER, 1)
+
+
+@event.listens_for(User, "after_delete")
+def _count_deleted_user(mapper, connection: Connection, target: User) -> None:
+    """
+    Uncounts a deleted user.
+    """
+    _add_counter(connection, UNIQUE_USERS_COUNTER, -1)
+
+
+class StatsDBConnector(DBConnector):
+    """
+    Provides access to the maintained platform statistics.
+    """
+
+    def get_platform_stats(self) -> tuple[dict[str, Decimal], int]:
+        """
+        Retrieves the token totals and the unique users count in one session.
+        :return: tuple of the total amounts by token symbol and the unique users count
+        """
+        with self.Session() as db:
+            try:
+                totals = {
+                    stats.token_symbol: Decimal(stats.total_amount)
+                    for stats in db.query(TokenStats).all()
+                }
+                users_count = db.scalar(
+                    select(PlatformCounter.value).where(
+                        PlatformCounter.name == UNIQUE_USERS_COUNTER
+                    )
+                )
+                return totals, users_count or 0
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to retrieve platform statistics: {str(e)}")
+                return {}, 0
+
+    def rebuild_stats(self) -> None:
+        """
+        Recomputes the statistics from the position and user tables,
+        e.g. after positions were changed outside of the ORM.
+        :raise SQLAlchemyError: If the database operation fails.
+        """
+        with self.Session() as db:
+            try:
+                counted = Position.status.in_(
+                    [status.value for status in COUNTED_STATUSES]
+                )
+                token_totals = (
+                    db.query(
+                        Position.token_symbol,
+                        func.sum(Position.amount),
+                        func.count(Position.id),
+                    )
+                    .filter(counted)
+                    .group_by(Position.token_symbol)
+                    .all()
+                )
+                user_totals = (
+                    db.query(User.id, User.wallet_id, func.count(Position.id))
+                    .join(Position, Position.user_id == User.id)
+                    .filter(counted)
+                    .group_by(User.id, User.wallet_id)
+                    .all()
+                )
+                users_count = db.query(func.count(User.id)).scalar()
+
+                db.execute(delete(TokenStats))
+                db.execute(delete(UserStats))
+                db.add_all(
+                    TokenStats(
+                        token_symbol=token_symbol,
+                        total_amount=total_amount,
+                        total_positions=total_positions,
+                    )
+                    for token_symbol, total_amount, total_positions in token_totals
+                )
+                db.add_all(
+                    UserStats(
+                        user_id=user_id,
+                        wallet_id=wallet_id,
+                        positions_number=positions_number,
+                    )
+                    for user_id, wallet_id, positions_number in user_totals
+                )
+                db.merge(PlatformCounter(name=UNIQUE_USERS_COUNTER, value=users_count))
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Failed to rebuild platform statistics: {str(e)}")
+                raise e
+
+
+class AsyncStatsDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of StatsDBConnector.
+    """
+
+    sync_connector = StatsDBConnector
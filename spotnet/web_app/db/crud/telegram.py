@@ -9,7 +9,7 @@ from sqlalchemy import update
 
 from web_app.db.models import Base, TelegramUser
 
-from .base import DBConnector
+from .base import AsyncDBConnector, DBConnector
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
@@ -107,3 +107,11 @@ class TelegramUserDBConnector(DBConnector):
             )
         )
         return True
+
+
+class AsyncTelegramUserDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of TelegramUserDBConnector.
+    """
+
+    sync_connector = TelegramUserDBConnector
@@ -7,7 +7,7 @@ from typing import TypeVar
 
 from web_app.db.models import Base, Transaction, TransactionStatus
 
-from .base import DBConnector
+from .base import AsyncDBConnector, DBConnector
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -30,3 +30,11 @@ class TransactionDBConnector(DBConnector):
         )
         transaction = self.write_to_db(transaction)
         return transaction
+
+
+class AsyncTransactionDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of TransactionDBConnector.
+    """
+
+    sync_connector = TransactionDBConnector
@@ -5,11 +5,12 @@ This module contains the user database configuration.
 import logging
 from typing import List, Tuple, TypeVar
 
+from sqlalchemy import tuple_
 from sqlalchemy.exc import SQLAlchemyError
 
 from web_app.db.models import Base, Position, Status, TelegramUser, User
 
-from .base import DBConnector
+from .base import AsyncDBConnector, DBConnector
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Base)
@@ -45,6 +46,55 @@ class UserDBConnector(DBConnector):
                 logger.error(f"Error retrieving users with OPENED positions: {e}")
                 return []
 
+    def get_users_for_notifications_page(
+        self,
+        limit: int = 500,
+        after: Tuple[str, str] | None = None,
+        shard: int = 0,
+        shard_count: int = 1,
+    ) -> List[Tuple[str, str]]:
+        """
+        Retrieves a page of the same rows as `get_users_for_notifications`,
+        ordered by contract address and telegram ID. Each page is read in its
+        own short session, so no cursor is held open between pages.
+
+        :param limit: The maximum number of rows in the page.
+        :param after: The last row of the previous page, None for the first page.
+        :param shard: The index of the shard of users to read.
+        :param shard_count: The total number of shards.
+        :return: List of tuples (contract_address, telegram_id)
+        :raises SQLAlchemyError: If the page cannot be read, so that a scan
+         is not mistaken for a complete one.
+        """
+        with self.Session() as db:
+            try:
+                query = (
+                    db.query(User.contract_address, TelegramUser.telegram_id)
+                    .join(Position, Position.user_id == User.id)
+                    .join(TelegramUser, TelegramUser.wallet_id == User.wallet_id)
+                    .filter(
+                        Position.status == Status.OPENED.value,
+                        TelegramUser.is_allowed_notification == True,
+                    )
+                )
+                if shard_count > 1:
+                    query = query.filter(User.shard_key % shard_count == shard)
+                if after is not None:
+                    query = query.filter(
+                        tuple_(User.contract_address, TelegramUser.telegram_id)
+                        > tuple_(*after)
+                    )
+                results = (
+                    query.distinct()
+                    .order_by(User.contract_address, TelegramUser.telegram_id)
+                    .limit(limit)
+                    .all()
+                )
+                return [tuple(row) for row in results]
+            except SQLAlchemyError as e:
+                logger.error(f"Error retrieving users with OPENED positions: {e}")
+                raise
+
     def get_user_by_wallet_id(self, wallet_id: str) -> User | None:
         """
         Retrieves a user by their wallet ID.
@@ -170,3 +220,11 @@ class UserDBConnector(DBConnector):
                 session.rollback()
                 logger.error(f"Failed to delete user with wallet_id {wallet_id}: {e}")
                 raise e
+
+
+class AsyncUserDBConnector(AsyncDBConnector):
+    """
+    Async counterpart of UserDBConnector.
+    """
+
+    sync_connector = UserDBConnector
@@ -5,9 +5,10 @@ This module contains the database configuration and session.
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from web_app.db.engines import ENGINES
+
 load_dotenv()
 
 DB_USER = os.environ.get("DB_USER", "")
@@ -19,8 +20,11 @@ DB_NAME = os.environ.get("DB_NAME", "")
 SQLALCHEMY_DATABASE_URL = (
     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}:{DB_PORT}/{DB_NAME}"
 )
+ASYNC_SQLALCHEMY_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}:{DB_PORT}/{DB_NAME}"
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = ENGINES.get_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,174 @@
+"""
+This module contains the registry of the database engines shared by the process.
+
+Every DBConnector, AsyncDBConnector and the FastAPI database dependency take
+their engine from the registry, so the process keeps one connection pool
+per database URL instead of one per connector instance.
+"""
+
+import os
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+# Connections kept open in the pool
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+# Connections opened above the pool size under load
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+# Seconds to wait for a free connection
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+# Seconds after which a connection is replaced
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+# Test connections before use, so ones dropped by the server are replaced
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Counters of the connection pool of an engine.
+    """
+
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+
+
+class EngineRegistry:
+    """
+    Creates one sync and one async engine per database URL and shares them.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DB_POOL_SIZE,
+        max_overflow: int = DB_MAX_OVERFLOW,
+        pool_timeout: int = DB_POOL_TIMEOUT,
+        pool_recycle: int = DB_POOL_RECYCLE,
+        pool_pre_ping: bool = DB_POOL_PRE_PING,
+    ):
+        """
+        :param pool_size: Connections kept open in the pool.
+        :param max_overflow: Connections opened above the pool size under load.
+        :param pool_timeout: Seconds to wait for a free connection.
+        :param pool_recycle: Seconds after which a connection is replaced.
+        :param pool_pre_ping: Test connections before use.
+        """
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self._engines: dict[str, Engine] = {}
+        self._async_engines: dict[str, AsyncEngine] = {}
+        self._metrics: dict[Engine, PoolMetrics] = {}
+
+    def get_engine(self, db_url: str) -> Engine:
+        """
+        Get the shared engine of a database URL.
+
+        :param db_url: The database URL.
+        :return: The engine.
+        """
+        engine = self._engines.get(db_url)
+        if engine is None:
+            engine = create_engine(db_url, **self._pool_options(db_url))
+            self._track(engine)
+            self._engines[db_url] = engine
+        return engine
+
+    def get_async_engine(self, db_url: str) -> AsyncEngine:
+        """
+        Get the shared async engine of a database URL.
+
+        :param db_url: The async database URL.
+        :return: The async engine.
+        """
+        engine = self._async_engines.get(db_url)
+        if engine is None:
+            engine = create_async_engine(db_url, **self._pool_options(db_url))
+            self._track(engine.sync_engine)
+            self._async_engines[db_url] = engine
+        return engine
+
+    def pool_stats(self) -> dict[str, dict]:
+        """
+        Get the state and counters of the connection pool of every engine.
+
+        :return: Pool statistics by database URL, with the password hidden.
+        """
+        engines = [*self._engines.values()] + [
+            engine.sync_engine for engine in self._async_engines.values()
+        ]
+        return {
+            engine.url.render_as_string(hide_password=True): {
+                "size": engine.pool.size(),
+                "checked_out": engine.pool.checkedout(),
+                "overflow": engine.pool.overflow(),
+                **asdict(self._metrics[engine]),
+            }
+            for engine in engines
+            if hasattr(engine.pool, "checkedout")
+        }
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop the connections inherited from the parent process without closing
+        them, as they are still used by the parent (e.g. Celery prefork workers).
+        """
+        for engine in self._engines.values():
+            engine.dispose(close=False)
+        for engine in self._async_engines.values():
+            engine.sync_engine.dispose(close=False)
+
+    def _pool_options(self, db_url: str) -> dict:
+        """
+        Get the pool options of an engine. SQLite pools take no size options.
+
+        :param db_url: The database URL.
+        :return: Keyword arguments of `create_engine`.
+        """
+        if make_url(db_url).get_backend_name() == "sqlite":
+            return {}
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    def _track(self, engine: Engine) -> None:
+        """
+        Count the pool events of an engine.
+
+        :param engine: The engine.
+        """
+        metrics = self._metrics[engine] = PoolMetrics()
+
+        @event.listens_for(engine, "connect")
+        def on_connect(*args):
+            """Count a new connection."""
+            metrics.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(*args):
+            """Count a connection checked out of the pool."""
+            metrics.checkouts += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(*args):
+            """Count a connection returned to the pool."""
+            metrics.checkins += 1
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(*args):
+            """Count an invalidated connection."""
+            metrics.invalidations += 1
+
+
+ENGINES = EngineRegistry()
+os.register_at_fork(after_in_child=ENGINES.reset_after_fork)
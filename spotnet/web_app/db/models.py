@@ -5,27 +5,94 @@ table in the database and defines the structure and relationships
 between the data entities.
 """
 
+import hashlib
+import zlib
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum as PyEnum
 from uuid import uuid4
 
 from sqlalchemy import (
     DECIMAL,
     NUMERIC,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    Numeric,
     String,
+    TypeDecorator,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from web_app.db.database import Base
 
+# Token amounts hold up to 20 integer digits and the 18 decimals of ETH and STRK
+AMOUNT_PRECISION = 38
+AMOUNT_SCALE = 18
+
+
+def get_shard_key(contract_address: str) -> int:
+    """
+    Get the stable hash of a contract address that users are sharded by,
+    the same across processes unlike the built-in `hash` of strings.
+    :param contract_address: The contract address.
+    :return: The CRC32 of the lowercase address.
+    """
+    return zlib.crc32(contract_address.lower().encode())
+
+
+def get_proof_hash(proof: list[str]) -> str:
+    """
+    Get the key of a zkLend reward item, which stays the same wherever
+    the item is listed in the reward API response.
+    :param proof: The Merkle proof of the item.
+    :return: The hex SHA-256 of the comma separated proof.
+    """
+    return hashlib.sha256(",".join(proof).encode()).hexdigest()
+
+
+class TokenAmount(TypeDecorator):
+    """
+    Token amount stored as NUMERIC(38, 18). Amounts are bound from strings,
+    integers or Decimals and loaded as plain decimal strings without trailing
+    zeros, so the API keeps serving amounts as strings.
+    """
+
+    impl = Numeric(AMOUNT_PRECISION, AMOUNT_SCALE)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Decimal | None:
+        """
+        Convert an amount to Decimal before it is sent to the database.
+        :param value: str, int or Decimal amount
+        :param dialect: database dialect
+        :return: Decimal | None
+        """
+        if value is None:
+            return None
+        return Decimal(str(value))
+
+    def process_result_value(self, value, dialect) -> str | None:
+        """
+        Convert an amount loaded from the database to a plain decimal string.
+        :param value: Decimal amount
+        :param dialect: database dialect
+        :return: str | None
+        """
+        if value is None:
+            return None
+        return format(Decimal(value).normalize(), "f")
+
 
 class Status(PyEnum):
     """
@@ -55,6 +122,20 @@ class User(Base):
     is_contract_deployed = Column(Boolean, default=False)
     wallet_id = Column(String, nullable=False, unique=True, index=True)
     contract_address = Column(String)
+    # Hash of the contract address, the health ratio scan filters shards on it
+    shard_key = Column(BigInteger, index=True)
+
+    @validates("contract_address")
+    def validate_contract_address(self, key: str, contract_address: str) -> str:
+        """
+        Keep the shard key in sync with the contract address.
+        :param key: The attribute name.
+        :param contract_address: The contract address.
+        :return: The contract address.
+        """
+        self.shard_key = get_shard_key(contract_address) if contract_address else None
+        return contract_address
+
 
 class Referal(Base):
     """
@@ -83,7 +164,7 @@ class Position(Base):
         UUID(as_uuid=True), ForeignKey("user.id"), index=True, nullable=False
     )
     token_symbol = Column(String, nullable=False)
-    amount = Column(String, nullable=False)
+    amount = Column(TokenAmount, nullable=False)
     multiplier = Column(NUMERIC, nullable=False)
 
     created_at = Column(DateTime, nullable=False, default=func.now())
@@ -101,6 +182,10 @@ class Position(Base):
     liquidation_bonus = Column(Float, default=0.0)
     is_liquidated = Column(Boolean, default=False)
     datetime_liquidation = Column(DateTime, nullable=True)
+    # Supports the keyset pagination of the positions of a user
+    __table_args__ = (
+        Index("ix_position_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
 
 class AirDrop(Base):
@@ -120,6 +205,26 @@ class AirDrop(Base):
     claimed_at = Column(DateTime, nullable=True)
 
 
+class AirdropProof(Base):
+    """
+    SQLAlchemy model for the airdrop_proof table.
+    Caches the validated zkLend reward items of a contract keyed by the hash
+    of their proof, the proofs of a round never change once it is published.
+    """
+
+    __tablename__ = "airdrop_proof"
+
+    contract_address = Column(String, primary_key=True)
+    proof_hash = Column(String(64), primary_key=True)
+    # Distribution round, if the reward API gives it
+    round = Column(Integer, nullable=True)
+    amount = Column(String, nullable=False)
+    proof = Column(JSON, nullable=False)
+    recipient = Column(String, nullable=False)
+    is_claimed = Column(Boolean, nullable=False, default=False)
+    fetched_at = Column(DateTime, nullable=False, default=func.now())
+
+
 class TelegramUser(Base):
     """
     SQLAlchemy model for the telegram_user table.
@@ -154,7 +259,7 @@ class Vault(Base):
         UUID(as_uuid=True), ForeignKey("user.id"), index=True, nullable=False
     )
     symbol = Column(String)
-    amount = Column(String)
+    amount = Column(TokenAmount)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(
         DateTime, nullable=False, default=func.now(), onupdate=func.now()
@@ -217,9 +322,70 @@ class ExtraDeposit(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     token_symbol = Column(String, nullable=False)
-    amount = Column(String, nullable=False)
+    amount = Column(TokenAmount, nullable=False)
     added_at = Column(DateTime, default=datetime.utcnow)
     position_id = Column(UUID(as_uuid=True), ForeignKey("position.id"))
     __table_args__ = (
         UniqueConstraint("position_id", "token_symbol", name="_position_token_uc"),
     )
+
+
+class TokenStats(Base):
+    """
+    SQLAlchemy model for the token_stats table.
+    Holds per-token amounts and counts of opened and closed positions, kept
+    up to date by the listeners in `web_app.db.crud.stats` as positions change.
+    """
+
+    __tablename__ = "token_stats"
+
+    token_symbol = Column(String, primary_key=True)
+    total_amount = Column(TokenAmount, nullable=False, default="0")
+    total_positions = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class PlatformCounter(Base):
+    """
+    SQLAlchemy model for the platform_counter table.
+    Holds named platform-wide counters, such as the number of unique users.
+    """
+
+    __tablename__ = "platform_counter"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class UserStats(Base):
+    """
+    SQLAlchemy model for the user_stats table.
+    Holds the number of opened and closed positions of each user, kept up to
+    date by the listeners in `web_app.db.crud.stats` as positions change.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    wallet_id = Column(String, nullable=False)
+    positions_number = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=False, default=func.now(), onupdate=func.now()
+    )
+    # Covers the top users query of the leaderboard, read in index order
+    __table_args__ = (
+        Index(
+            "ix_user_stats_positions_number_wallet_id",
+            positions_number.desc(),
+            "wallet_id",
+        ),
+    )
@@ -1,72 +1,255 @@
 """
 Module for claiming unclaimed airdrops from the AirDropDBConnector
 and updating the database when a claim is successful.
+
+Claims run as a streaming pipeline of three stages connected by bounded queues:
+pages of unclaimed airdrops are read from the database and grouped by contract,
+the proofs of each contract are fetched concurrently, and claims are submitted
+one contract at a time so that the transactions of the claiming account get
+consecutive nonces. Successful claims are written back in bulk updates.
 """
 
 import asyncio
 import logging
+import time
+from dataclasses import asdict, dataclass
+from decimal import Decimal
 from typing import List
 
 from requests.exceptions import ConnectionError, Timeout
 from sqlalchemy.exc import SQLAlchemyError
-from web_app.contract_tools.airdrop import ZkLendAirdrop
+from web_app.api.serializers.airdrop import AirdropItem
+from web_app.contract_tools.airdrop import AirdropProofCache
 from web_app.contract_tools.blockchain_call import StarknetClient
 from web_app.db.crud import AirDropDBConnector
+from web_app.db.models import get_proof_hash
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a queue for its consumers
+_DONE = object()
+
+
+@dataclass
+class ClaimMetrics:
+    """
+    Counters of the stages of an airdrop claim run.
+    """
+
+    read: int = 0
+    proofs_fetched: int = 0
+    proof_errors: int = 0
+    nothing_to_claim: int = 0
+    claimed: int = 0
+    claim_failures: int = 0
+    saved: int = 0
+    save_errors: int = 0
+    elapsed: float = 0.0
+
+    def throughput(self) -> dict[str, float]:
+        """
+        Get the items per second of each stage.
+
+        :return: A dictionary with stage names as keys and rates as values.
+        """
+        elapsed = self.elapsed or float("inf")
+        return {
+            "read": self.read / elapsed,
+            "proofs": self.proofs_fetched / elapsed,
+            "claims": self.claimed / elapsed,
+            "saved": self.saved / elapsed,
+        }
+
 
 class AirdropClaimer:
     """
     Handles the process of claiming unclaimed airdrops and updating the database.
     """
 
+    # Unclaimed airdrops read from the database at once
+    PAGE_SIZE = 500
+    # Proof requests to the zkLend API in flight at the same time
+    PROOF_CONCURRENCY = 8
+    # Successful claims written back in one UPDATE
+    UPDATE_BATCH_SIZE = 100
+
     def __init__(self):
         """
         Initializes the AirdropClaimer with database and Starknet client instances.
         """
         self.db_connector = AirDropDBConnector()
         self.starknet_client = StarknetClient()
-        self.zk_lend_airdrop = ZkLendAirdrop()
+        self.zk_lend_airdrop = AirdropProofCache(max_concurrency=self.PROOF_CONCURRENCY)
+        self.metrics = ClaimMetrics()
 
-    async def claim_airdrops(self) -> None:
+    async def claim_airdrops(self) -> ClaimMetrics:
         """
         Retrieves unclaimed airdrops, attempts to claim them on the Starknet blockchain,
         and updates the database if the claim is successful.
+
+        :return: The counters of the run.
         """
-        unclaimed_airdrops = self.db_connector.get_all_unclaimed()
-        for airdrop in unclaimed_airdrops:
-            try:
-                user_contract_address = airdrop.user.contract_address
-                proofs = self.zk_lend_airdrop.get_contract_airdrop(
-                    user_contract_address
-                )
+        self.metrics = ClaimMetrics()
+        started = time.perf_counter()
+        airdrops = asyncio.Queue(maxsize=self.PAGE_SIZE)
+        claims = asyncio.Queue(maxsize=self.PROOF_CONCURRENCY * 2)
 
-                claim_successful = await self._claim_airdrop(
-                    user_contract_address, proofs
-                )
+        # A failing stage cancels the others instead of leaving them blocked on a queue
+        async with asyncio.TaskGroup() as stages:
+            proof_workers = [
+                stages.create_task(self._fetch_proofs(airdrops, claims))
+                for _ in range(self.PROOF_CONCURRENCY)
+            ]
+            stages.create_task(self._submit_claims(claims))
+            await self._read_unclaimed(airdrops)
+            for _ in proof_workers:
+                await airdrops.put(_DONE)
+            await asyncio.gather(*proof_workers)
+            await claims.put(_DONE)
+
+        self.metrics.elapsed = time.perf_counter() - started
+        logger.info(
+            f"Airdrop claims finished: {asdict(self.metrics)}, "
+            f"per second: {self.metrics.throughput()}"
+        )
+        return self.metrics
+
+    async def _read_unclaimed(self, airdrops: asyncio.Queue) -> None:
+        """
+        Page through the unclaimed airdrops and queue them grouped by contract.
+        Pages are ordered by contract, so a group is queued once the next
+        contract starts, as its airdrops may go on in the next page.
+
+        :param airdrops: The queue of airdrop groups to fetch proofs for.
+        """
+        after, group = None, []
+        while True:
+            page = await asyncio.to_thread(
+                self.db_connector.get_unclaimed_page, self.PAGE_SIZE, after
+            )
+            # Load the cached proofs of the page at once, workers fetch the rest
+            await self.zk_lend_airdrop.prefetch(
+                [airdrop["contract_address"] for airdrop in page], fetch_missing=False
+            )
+            for airdrop in page:
+                if (
+                    group
+                    and group[0]["contract_address"] != airdrop["contract_address"]
+                ):
+                    await airdrops.put(group)
+                    group = []
+                group.append(airdrop)
+            self.metrics.read += len(page)
+            if len(page) < self.PAGE_SIZE:
+                break
+            after = (page[-1]["contract_address"], page[-1]["id"])
+        if group:
+            await airdrops.put(group)
+
+    async def _fetch_proofs(
+        self, airdrops: asyncio.Queue, claims: asyncio.Queue
+    ) -> None:
+        """
+        Fetch the unclaimed airdrop items of queued contracts and queue their claims.
 
-                if claim_successful:
-                    self.db_connector.save_claim_data(airdrop.id, airdrop.amount)
-                    logger.info("Airdrop %s claimed succesfully.", airdrop.id)
+        :param airdrops: The queue of airdrop groups to fetch proofs for.
+        :param claims: The queue of claims to submit.
+        """
+        while (group := await airdrops.get()) is not _DONE:
+            contract_address = group[0]["contract_address"]
+            try:
+                response = await self.zk_lend_airdrop.get_contract_airdrop(
+                    contract_address
+                )
             except ValueError as ve:
-                logger.error("Invalid data for airdrop %s: %s", airdrop.id, ve)
-            except SQLAlchemyError as db_err:
+                self.metrics.proof_errors += 1
+                logger.error(f"Invalid data for airdrop of {contract_address}: {ve}")
+                continue
+            except Exception as e:
+                self.metrics.proof_errors += 1
                 logger.error(
-                    "Database error while updating claim data for airdrop %s: %s",
-                    airdrop.id,
-                    db_err,
+                    f"Error fetching proofs for airdrop of {contract_address}: {e}"
                 )
-            except ConnectionError as ce:
-                logger.error(
-                    "Network connection error during claim for airdrop %s: %s",
-                    airdrop.id,
-                    ce,
+                continue
+
+            self.metrics.proofs_fetched += 1
+            items = [item for item in response.airdrops if not item.is_claimed]
+            if not items:
+                self.metrics.nothing_to_claim += 1
+                continue
+            await claims.put((group, items))
+
+    async def _submit_claims(self, claims: asyncio.Queue) -> None:
+        """
+        Submit queued claims one contract at a time, in queue order, and save the
+        successful ones in batches. The claimed amount is saved on the first
+        airdrop of the contract and the others are saved as claimed with 0, so
+        the amount is counted once.
+
+        :param claims: The queue of claims to submit.
+        """
+        claimed, proof_hashes = {}, {}
+        while (claim := await claims.get()) is not _DONE:
+            group, items = claim
+            contract_address = group[0]["contract_address"]
+            if await self._claim_airdrop(contract_address, items):
+                # Claimed items are not claimed again if the proofs are read before
+                # the batch is saved
+                for item in items:
+                    item.is_claimed = True
+                self.metrics.claimed += 1
+                amount = self._get_claim_amount(items)
+                for airdrop in group:
+                    claimed[airdrop["id"]], amount = amount, Decimal(0)
+                proof_hashes.setdefault(contract_address, []).extend(
+                    get_proof_hash(item.proof) for item in items
                 )
-            except Timeout as te:
-                logger.error("Timeout during claim for airdrop %s: %s", airdrop.id, te)
-            except Exception as e:
-                logger.error("Unexpected error claiming airdrop %s: %s", airdrop.id, e)
+                logger.info(f"Airdrop of {contract_address} claimed successfully.")
+            else:
+                self.metrics.claim_failures += 1
+            if len(claimed) >= self.UPDATE_BATCH_SIZE:
+                await self._save_claims(claimed, proof_hashes)
+                claimed, proof_hashes = {}, {}
+        await self._save_claims(claimed, proof_hashes)
+
+    async def _save_claims(self, claimed: dict, proof_hashes: dict) -> None:
+        """
+        Write a batch of successful claims to the database, and mark their
+        cached proofs as claimed. The proofs are marked even if the claims could
+        not be written, as they were claimed on chain.
+
+        :param claimed: A dictionary with airdrop IDs as keys and amounts as values.
+        :param proof_hashes: A dictionary with contract addresses as keys and the
+         proof hashes of the claimed items as values.
+        """
+        if not claimed:
+            return
+        try:
+            await asyncio.to_thread(self.db_connector.save_claims, claimed)
+            self.metrics.saved += len(claimed)
+        except SQLAlchemyError as db_err:
+            self.metrics.save_errors += len(claimed)
+            logger.error(
+                f"Database error while updating claim data for airdrops "
+                f"{list(claimed)}: {db_err}"
+            )
+        try:
+            await self.zk_lend_airdrop.mark_claimed(proof_hashes)
+        except SQLAlchemyError as db_err:
+            logger.error(
+                f"Database error while marking cached proofs of airdrops "
+                f"{list(claimed)} as claimed: {db_err}"
+            )
+
+    @staticmethod
+    def _get_claim_amount(items: List[AirdropItem]) -> Decimal:
+        """
+        Sum the amounts of the claimed airdrop items.
+
+        :param items: The claimed airdrop items.
+        :return: The total amount.
+        """
+        return sum((Decimal(item.amount) for item in items), Decimal(0))
 
     async def _claim_airdrop(self, contract_address: str, proofs: List[str]) -> bool:
         """
@@ -3,6 +3,7 @@ This module contains the fixtures for the tests.
 """
 
 import uuid
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -10,6 +11,9 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import scoped_session
 
 from web_app.api.main import app
+from web_app.contract_tools.price_service import PRICE_SERVICE, PriceSource
+from web_app.contract_tools.response_cache import ResponseCache
+from web_app.tests.price_stubs import PriceSourceStub
 from web_app.db.crud import DBConnector, PositionDBConnector, UserDBConnector
 from web_app.db.database import get_database
 from web_app.db.models import ExtraDeposit
@@ -42,16 +46,17 @@ def client() -> None:
     mock_db_connector = MagicMock(spec=DBConnector)
     app.dependency_overrides[get_database] = lambda: mock_db_connector
 
-    with patch(
-        "starknet_py.contract.Contract.from_address", new_callable=AsyncMock
-    ) as mock_from_address, patch(
+    with patch("web_app.api.main.ABI_CACHE") as mock_abi_cache, patch(
         "starknet_py.net.full_node_client.FullNodeClient.get_class_hash_at",
         new_callable=AsyncMock,
     ) as mock_class_hash, patch(
         "starknet_py.net.http_client.HttpClient.request", new_callable=AsyncMock
     ) as mock_request:
-        # Mock return values
-        mock_from_address.return_value = MagicMock()
+        # Mock return values, startup loads the Ekubo contract from the ABI cache
+        ekubo_contract = MagicMock()
+        mock_abi_cache.get_contract = AsyncMock(return_value=ekubo_contract)
+        mock_abi_cache.refresh = AsyncMock()
+        mock_abi_cache.get_cached.return_value = ekubo_contract
         mock_class_hash.return_value = "0x123"
         mock_request.return_value = {}
 
@@ -108,3 +113,39 @@ def mock_db_session():
         mock_db_session.__exit__.return_value = None
         mock_scoped_session_call.return_value = mock_db_session
         yield mock_db_session
+
+
+@pytest.fixture
+def price_stub():
+    """
+    Replace the AVNU and Pragma sources of the shared price service
+    by a local stub, with an empty price cache and without Redis.
+    """
+    stub = PriceSourceStub(
+        {
+            "ETH": Decimal("2000"),
+            "STRK": Decimal("0.5"),
+            "USDC": Decimal("1"),
+            "kSTRK": Decimal("0.5"),
+        }
+    )
+    sources = {PriceSource.AVNU: stub, PriceSource.PRAGMA: stub}
+    with patch.object(PRICE_SERVICE, "sources", sources), patch.object(
+        PRICE_SERVICE, "block_sources", {PriceSource.PRAGMA: stub}
+    ), patch.object(PRICE_SERVICE, "redis_client", None):
+        PRICE_SERVICE.invalidate()
+        yield stub
+        PRICE_SERVICE.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def dashboard_cache():
+    """
+    Give every test an empty dashboard cache without Redis and block lookups,
+    so cached dashboards do not leak between tests.
+    """
+    cache = ResponseCache("dashboard")
+    with patch("web_app.api.dashboard.DASHBOARD_CACHE", cache), patch(
+        "web_app.api.position.DASHBOARD_CACHE", cache
+    ):
+        yield cache
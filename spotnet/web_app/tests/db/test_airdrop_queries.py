@@ -0,0 +1,203 @@
+"""
+Tests of the paged read and the bulk update of unclaimed airdrops, and of the
+airdrop proof cache, run against a SQLite database.
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from web_app.contract_tools.airdrop import AirdropProofCache, ZkLendAirdrop
+from web_app.db.crud import AirDropDBConnector
+from web_app.db.models import AirDrop, Base, User, get_proof_hash
+
+
+@pytest.fixture
+def airdrop_db(tmp_path):
+    """
+    Create an AirDropDBConnector on an empty SQLite database.
+    """
+    connector = AirDropDBConnector(db_url=f"sqlite:///{tmp_path / 'spotnet.db'}")
+    Base.metadata.create_all(connector.engine)
+    return connector
+
+
+@pytest.fixture
+def mock_api_response() -> list:
+    """
+    Reward API items of two rounds, without round numbers.
+    """
+    return [
+        {"amount": "10", "proof": ["0x1"], "is_claimed": False, "recipient": "0xr"},
+        {
+            "amount": "20",
+            "proof": ["0x2", "0x3"],
+            "is_claimed": False,
+            "recipient": "0xr",
+        },
+    ]
+
+
+def test_unclaimed_pages_and_bulk_claims(airdrop_db):
+    """
+    Test that unclaimed airdrops are paged by the contract address of their user
+    and then by ID, and that saved claims leave the unclaimed pages.
+    """
+    other_user = airdrop_db.write_to_db(User(wallet_id="0x2", contract_address="0xb"))
+    other_airdrop = airdrop_db.create_empty_claim(other_user.id)
+    user = airdrop_db.write_to_db(User(wallet_id="0x1", contract_address="0xa"))
+    airdrops = sorted(
+        (airdrop_db.create_empty_claim(user.id) for _ in range(5)),
+        key=lambda airdrop: airdrop.id,
+    )
+
+    first_page = airdrop_db.get_unclaimed_page(3)
+    second_page = airdrop_db.get_unclaimed_page(
+        3, (first_page[-1]["contract_address"], first_page[-1]["id"])
+    )
+
+    assert [row["id"] for row in first_page + second_page] == [
+        airdrop.id for airdrop in airdrops
+    ] + [other_airdrop.id]
+    assert [row["contract_address"] for row in first_page + second_page] == [
+        "0xa"
+    ] * 5 + ["0xb"]
+
+    airdrop_db.save_claims(
+        {airdrops[0].id: Decimal("10"), airdrops[3].id: Decimal("20")}
+    )
+
+    assert [row["id"] for row in airdrop_db.get_unclaimed_page(10)] == [
+        airdrops[1].id,
+        airdrops[2].id,
+        airdrops[4].id,
+        other_airdrop.id,
+    ]
+    claimed = airdrop_db.get_object(AirDrop, airdrops[3].id)
+    assert claimed.is_claimed and claimed.claimed_at is not None
+    assert claimed.amount == Decimal("20")
+
+
+@pytest.mark.asyncio
+async def test_proof_cache_persists_items(airdrop_db, mock_api_response):
+    """
+    Test that the reward API is asked only for contracts missing from the
+    database, and that claimed items stay claimed in the cache.
+    """
+    airdrop = ZkLendAirdrop()
+    airdrop.api = Mock()
+    airdrop.api.fetch = AsyncMock(return_value=mock_api_response)
+
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db)
+    assert await cache.prefetch(["0xa", "0xb"]) == []
+    assert airdrop.api.fetch.await_count == 2
+    await cache.mark_claimed({"0xa": [get_proof_hash(["0x2", "0x3"])]})
+
+    # A new cache, e.g. the next claim run, loads both contracts from the database
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db)
+    response = await cache.get_contract_airdrop("0xa")
+    assert await cache.prefetch(["0xa", "0xb", "0xc"]) == []
+    assert airdrop.api.fetch.await_count == 3
+
+    assert {tuple(item.proof): item.is_claimed for item in response.airdrops} == {
+        ("0x1",): False,
+        ("0x2", "0x3"): True,
+    }
+
+    # Expired items are fetched again
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db, ttl=0)
+    await cache.get_contract_airdrop("0xa")
+    assert airdrop.api.fetch.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_proof_cache_keys_items_by_proof(airdrop_db, mock_api_response):
+    """
+    Test that refetched items keep their claimed state when the reward API
+    lists them in another order, and that items it no longer lists are removed.
+    """
+    airdrop = ZkLendAirdrop()
+    airdrop.api = Mock()
+    airdrop.api.fetch = AsyncMock(return_value=mock_api_response)
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db)
+    await cache.get_contract_airdrop("0xa")
+    await cache.mark_claimed({"0xa": [get_proof_hash(["0x1"])]})
+
+    new_item = {
+        "amount": "5",
+        "proof": ["0x4"],
+        "is_claimed": False,
+        "recipient": "0xr",
+    }
+    airdrop.api.fetch.return_value = [new_item, mock_api_response[0]]
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db, ttl=0)
+    await cache.get_contract_airdrop("0xa")
+
+    cached = airdrop_db.get_cached_proofs(["0xa"], datetime.min)["0xa"]
+    assert {tuple(item["proof"]): item["is_claimed"] for item in cached} == {
+        ("0x1",): True,
+        ("0x4",): False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_proof_cache_shares_concurrent_fetches(airdrop_db, mock_api_response):
+    """
+    Test that concurrent misses of the same contract share one reward API request.
+    """
+
+    async def fetch(contract_id):
+        """Answer after a delay, so that the requests overlap."""
+        await asyncio.sleep(0.01)
+        return mock_api_response
+
+    airdrop = ZkLendAirdrop()
+    airdrop.api = Mock()
+    airdrop.api.fetch = AsyncMock(side_effect=fetch)
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db)
+
+    first, second = await asyncio.gather(
+        cache.get_contract_airdrop("0xabc"), cache.get_contract_airdrop("0xabc")
+    )
+
+    assert airdrop.api.fetch.await_count == 1
+    assert first is second
+    assert len(airdrop_db.get_cached_proofs(["0xabc"], datetime.min)["0xabc"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_proof_cache_keeps_items_of_empty_fetches(airdrop_db, mock_api_response):
+    """
+    Test that a refetch without items, as after a failed reward API request,
+    keeps the cached items, and that claimed items the reward API no longer
+    lists are kept.
+    """
+    airdrop = ZkLendAirdrop()
+    airdrop.api = Mock()
+    airdrop.api.fetch = AsyncMock(return_value=mock_api_response)
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db)
+    await cache.get_contract_airdrop("0xa")
+    await cache.mark_claimed({"0xa": [get_proof_hash(["0x1"])]})
+
+    airdrop.api.fetch.return_value = {}
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db, ttl=0)
+    await cache.get_contract_airdrop("0xa")
+
+    cached = airdrop_db.get_cached_proofs(["0xa"], datetime.min)["0xa"]
+    assert {tuple(item["proof"]): item["is_claimed"] for item in cached} == {
+        ("0x1",): True,
+        ("0x2", "0x3"): False,
+    }
+
+    airdrop.api.fetch.return_value = mock_api_response[1:]
+    cache = AirdropProofCache(airdrop=airdrop, db_connector=airdrop_db, ttl=0)
+    await cache.get_contract_airdrop("0xa")
+
+    cached = airdrop_db.get_cached_proofs(["0xa"], datetime.min)["0xa"]
+    assert {tuple(item["proof"]): item["is_claimed"] for item in cached} == {
+        ("0x1",): True,
+        ("0x2", "0x3"): False,
+    }
@@ -0,0 +1,90 @@
+"""
+Unit tests for the AsyncDBConnector module.
+"""
+
+import asyncio
+import inspect
+
+import pytest
+
+from web_app.db.crud import (
+    AsyncPositionDBConnector,
+    AsyncUserDBConnector,
+    PositionDBConnector,
+    UserDBConnector,
+)
+from web_app.db.models import Base, User
+
+
+def test_async_connector_has_same_surface():
+    """
+    Test that every public method of the sync connector has a coroutine
+    counterpart, generators excepted.
+    """
+    for name, method in inspect.getmembers(PositionDBConnector, inspect.isfunction):
+        if name.startswith("_") or inspect.isgeneratorfunction(method):
+            continue
+        async_method = getattr(AsyncPositionDBConnector, name)
+        assert inspect.iscoroutinefunction(async_method), name
+        assert async_method.__doc__ == method.__doc__
+
+
+@pytest.fixture
+def async_user_db(tmp_path):
+    """
+    Create an AsyncUserDBConnector on a SQLite database through aiosqlite,
+    with the tables created through the sync connector.
+    """
+    path = tmp_path / "spotnet.db"
+    Base.metadata.create_all(UserDBConnector(db_url=f"sqlite:///{path}").engine)
+    return AsyncUserDBConnector(db_url=f"sqlite+aiosqlite:///{path}")
+
+
+@pytest.mark.asyncio
+async def test_async_methods_run_queries(async_user_db):
+    """
+    Test that the coroutines run the sync queries on the async engine,
+    and that writes are committed.
+    """
+    user = await async_user_db.write_to_db(User(wallet_id="0x123"))
+
+    assert (await async_user_db.get_user_by_wallet_id("0x123")).id == user.id
+    assert await async_user_db.get_user_by_wallet_id("0x456") is None
+    assert await async_user_db.get_unique_users_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_async_methods_nested_calls(async_user_db):
+    """
+    Test that a method calling another method of its connector inside its
+    own session works like on the sync connector.
+    """
+    position_db = AsyncPositionDBConnector(db_url=str(async_user_db.engine.url))
+    await async_user_db.create_user("0x123")
+
+    position = await position_db.create_position("0x123", "ETH", "1", 2)
+    updated_position = await position_db.create_position("0x123", "ETH", "2", 3)
+
+    assert updated_position.id == position.id
+    assert updated_position.amount == "2"
+    assert await position_db.get_count_positions_by_wallet_id("0x123") == 1
+
+
+@pytest.mark.asyncio
+async def test_async_methods_run_concurrently(async_user_db):
+    """
+    Test that concurrent calls each get their own connection and session.
+    """
+    wallet_ids = [f"0x{index}" for index in range(10)]
+    await asyncio.gather(
+        *(
+            async_user_db.write_to_db(User(wallet_id=wallet_id))
+            for wallet_id in wallet_ids
+        )
+    )
+
+    users = await asyncio.gather(
+        *(async_user_db.get_user_by_wallet_id(wallet_id) for wallet_id in wallet_ids)
+    )
+
+    assert [user.wallet_id for user in users] == wallet_ids
@@ -0,0 +1,145 @@
+"""
+Query-count regression tests of the wallet lookups of PositionDBConnector,
+run against a SQLite database.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from web_app.db.crud import PositionDBConnector
+from web_app.db.models import Base, Position, Status, User
+
+WALLET_ID = "0x123"
+
+
+@pytest.fixture
+def position_db(tmp_path):
+    """
+    Create a PositionDBConnector on a SQLite database holding one user
+    with three positions, one of them opened.
+    """
+    connector = PositionDBConnector(db_url=f"sqlite:///{tmp_path / 'spotnet.db'}")
+    Base.metadata.create_all(connector.engine)
+    user = connector.write_to_db(User(wallet_id=WALLET_ID, contract_address="0xabc"))
+    now = datetime.now()
+    for index, status in enumerate((Status.OPENED, Status.CLOSED, Status.PENDING)):
+        connector.write_to_db(
+            Position(
+                user_id=user.id,
+                token_symbol="ETH",
+                amount=str(index + 1),
+                multiplier=2,
+                start_price=0.0,
+                status=status.value,
+                created_at=now - timedelta(minutes=index),
+            )
+        )
+    return connector
+
+
+@pytest.fixture
+def count_queries(position_db):
+    """
+    Count the SQL statements sent to the database.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        """Record the statement."""
+        statements.append(statement)
+
+    event.listen(position_db.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(position_db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_all_positions_with_count_single_query(position_db, count_queries):
+    """
+    Test that a page of positions and the total count take one query.
+    """
+    positions, total_count = position_db.get_all_positions_with_count_by_wallet_id(
+        WALLET_ID, start=0, limit=2
+    )
+
+    assert [position["amount"] for position in positions] == ["1", "2"]
+    assert total_count == 3
+    assert len(count_queries) == 1
+
+
+@pytest.mark.parametrize(
+    "method, args, expected",
+    [
+        ("get_positions_by_wallet_id", (WALLET_ID,), 1),
+        ("get_all_positions_by_wallet_id", (WALLET_ID, 0, 10), 3),
+        ("get_count_positions_by_wallet_id", (WALLET_ID,), 3),
+        ("has_opened_position", (WALLET_ID,), True),
+    ],
+)
+def test_wallet_lookups_single_query(
+    position_db, count_queries, method, args, expected
+):
+    """
+    Test that the wallet lookups join the user instead of loading it first.
+    """
+    result = getattr(position_db, method)(*args)
+
+    assert (len(result) if isinstance(result, list) else result) == expected
+    assert len(count_queries) == 1
+
+
+def test_unknown_wallet(position_db):
+    """
+    Test the lookups of a wallet without a user.
+    """
+    assert position_db.get_all_positions_with_count_by_wallet_id("0x0", 0, 10) == (
+        [],
+        0,
+    )
+    assert position_db.get_count_positions_by_wallet_id("0x0") == 0
+    assert position_db.has_opened_position("0x0") is False
+
+
+def test_positions_page_by_cursor(position_db, count_queries):
+    """
+    Test that keyset pages cover every position once, newest first,
+    with one statement per page.
+    """
+    first_page, cursor = position_db.get_positions_page_by_wallet_id(
+        WALLET_ID, limit=2
+    )
+    second_page, last_cursor = position_db.get_positions_page_by_wallet_id(
+        WALLET_ID, limit=2, cursor=cursor
+    )
+
+    assert len(count_queries) == 2
+    assert [position["amount"] for position in first_page + second_page] == [
+        "1",
+        "2",
+        "3",
+    ]
+    assert last_cursor is None
+
+
+def test_positions_page_invalid_cursor(position_db):
+    """
+    Test that a malformed cursor is rejected.
+    """
+    with pytest.raises(ValueError):
+        position_db.get_positions_page_by_wallet_id(
+            WALLET_ID, limit=2, cursor="not-a-cursor"
+        )
+
+
+def test_total_amounts_for_open_positions(position_db):
+    """
+    Test that amounts are summed by the database and loaded as strings.
+    """
+    positions = position_db.get_all_positions_by_wallet_id(WALLET_ID, 0, 10)
+
+    assert {position["amount"] for position in positions} == {"1", "2", "3"}
+    assert position_db.get_total_amounts_for_open_positions() == {
+        "ETH": Decimal("3")
+    }
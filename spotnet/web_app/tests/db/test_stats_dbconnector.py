@@ -0,0 +1,127 @@
+"""
+Tests of the platform statistics maintained by the listeners of
+web_app.db.crud.stats, run against a SQLite database.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from web_app.db.crud import PositionDBConnector, StatsDBConnector
+from web_app.db.crud.leaderboard import LeaderboardDBConnector
+from web_app.db.models import Base, Position, Status, User
+
+PRICES = {"ETH": 2000, "STRK": 0.5, "USDC": 1}
+
+
+@pytest.fixture
+def stats_db(tmp_path):
+    """
+    Create a StatsDBConnector on an empty SQLite database.
+    """
+    connector = StatsDBConnector(db_url=f"sqlite:///{tmp_path / 'spotnet.db'}")
+    Base.metadata.create_all(connector.engine)
+    return connector
+
+
+@pytest.fixture
+def position_db(stats_db):
+    """
+    Create a PositionDBConnector on the database of `stats_db`.
+    """
+    return PositionDBConnector(db_url=str(stats_db.engine.url))
+
+
+def create_position(
+    position_db: PositionDBConnector, user: User, token_symbol: str, amount: str
+) -> Position:
+    """
+    Write a pending position of a user.
+    """
+    return position_db.write_to_db(
+        Position(
+            user_id=user.id,
+            token_symbol=token_symbol,
+            amount=amount,
+            multiplier=2,
+            start_price=0.0,
+            status=Status.PENDING.value,
+        )
+    )
+
+
+def test_stats_follow_position_lifecycle(stats_db, position_db):
+    """
+    Test that opening, closing and deleting positions update the token totals,
+    and inserting users updates the unique users count.
+    """
+    user = position_db.write_to_db(User(wallet_id="0x1", contract_address="0xa"))
+    position_db.write_to_db(User(wallet_id="0x2", contract_address="0xb"))
+    eth_position = create_position(position_db, user, "ETH", "1.5")
+    usdc_position = create_position(position_db, user, "USDC", "100")
+
+    assert stats_db.get_platform_stats() == ({}, 2)
+
+    position_db.open_position(eth_position.id, PRICES)
+    position_db.open_position(usdc_position.id, PRICES)
+    position_db.close_position(eth_position.id)
+
+    assert stats_db.get_platform_stats() == (
+        {"ETH": Decimal("1.5"), "USDC": Decimal("100")},
+        2,
+    )
+
+    position_db.delete_position(usdc_position)
+
+    assert stats_db.get_platform_stats() == (
+        {"ETH": Decimal("1.5"), "USDC": Decimal("0")},
+        2,
+    )
+
+
+def test_rebuild_stats(stats_db, position_db):
+    """
+    Test that rebuilding the statistics gives the maintained values.
+    """
+    user = position_db.write_to_db(User(wallet_id="0x1", contract_address="0xa"))
+    position = create_position(position_db, user, "STRK", "10")
+    position_db.open_position(position.id, PRICES)
+    maintained = stats_db.get_platform_stats()
+
+    stats_db.rebuild_stats()
+
+    assert stats_db.get_platform_stats() == maintained == ({"STRK": Decimal("10")}, 1)
+
+
+def test_leaderboard_reads_maintained_stats(stats_db, position_db):
+    """
+    Test that the leaderboard is read from the counters maintained
+    as positions open, close and are deleted.
+    """
+    leaderboard_db = LeaderboardDBConnector(db_url=str(stats_db.engine.url))
+    first_user = position_db.write_to_db(User(wallet_id="0x1", contract_address="0xa"))
+    second_user = position_db.write_to_db(
+        User(wallet_id="0x2", contract_address="0xb")
+    )
+    positions = [
+        create_position(position_db, first_user, "ETH", "1"),
+        create_position(position_db, second_user, "ETH", "2"),
+        create_position(position_db, second_user, "USDC", "3"),
+        create_position(position_db, second_user, "USDC", "4"),
+    ]
+    for position in positions:
+        position_db.open_position(position.id, PRICES)
+    position_db.close_position(positions[1].id)
+    position_db.delete_position(positions[3])
+
+    assert leaderboard_db.get_top_users_by_positions() == [
+        {"wallet_id": "0x2", "positions_number": 2},
+        {"wallet_id": "0x1", "positions_number": 1},
+    ]
+    assert sorted(
+        leaderboard_db.get_position_token_statistics(),
+        key=lambda item: item["token_symbol"],
+    ) == [
+        {"token_symbol": "ETH", "total_positions": 2},
+        {"token_symbol": "USDC", "total_positions": 1},
+    ]
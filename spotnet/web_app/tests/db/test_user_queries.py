@@ -0,0 +1,91 @@
+"""
+Tests of the paged notification query of UserDBConnector,
+run against a SQLite database.
+"""
+
+import pytest
+
+from web_app.contract_tools.mixins.alert import get_shard
+from web_app.db.crud import UserDBConnector
+from web_app.db.models import Base, Position, Status, TelegramUser, User
+
+USER_COUNT = 30
+
+
+@pytest.fixture
+def user_db(tmp_path):
+    """
+    Create a UserDBConnector on a SQLite database holding users with
+    an opened position and notifications enabled, plus one user
+    with notifications disabled.
+    """
+    connector = UserDBConnector(db_url=f"sqlite:///{tmp_path / 'spotnet.db'}")
+    Base.metadata.create_all(connector.engine)
+    for index in range(USER_COUNT + 1):
+        wallet_id = f"0xw{index}"
+        user = connector.write_to_db(
+            User(wallet_id=wallet_id, contract_address=f"0xC{index:x}")
+        )
+        connector.write_to_db(
+            Position(
+                user_id=user.id,
+                token_symbol="ETH",
+                amount="1",
+                multiplier=2,
+                start_price=0.0,
+                status=Status.OPENED.value,
+            )
+        )
+        connector.write_to_db(
+            TelegramUser(
+                telegram_id=str(index),
+                wallet_id=wallet_id,
+                is_allowed_notification=index < USER_COUNT,
+            )
+        )
+    return connector
+
+
+def read_all_pages(user_db, shard=0, shard_count=1):
+    """
+    Read every page of users for notifications, three rows at a time.
+    """
+    rows, last_row = [], None
+    while page := user_db.get_users_for_notifications_page(
+        3, last_row, shard, shard_count
+    ):
+        rows.extend(page)
+        last_row = page[-1]
+    return rows
+
+
+def test_users_for_notifications_pages(user_db):
+    """
+    Test that the pages cover the users with notifications enabled once.
+    """
+    rows = read_all_pages(user_db)
+
+    assert sorted(rows) == sorted(user_db.get_users_for_notifications())
+    assert len(rows) == len(set(rows)) == USER_COUNT
+
+
+def test_users_for_notifications_shards(user_db):
+    """
+    Test that the shards filtered in SQL partition the users
+    and agree with `get_shard`.
+    """
+    shards = [read_all_pages(user_db, shard, 4) for shard in range(4)]
+
+    assert sum(len(rows) for rows in shards) == USER_COUNT
+    for shard, rows in enumerate(shards):
+        assert all(get_shard(address, 4) == shard for address, _ in rows)
+
+
+def test_shard_key_follows_contract_address(user_db):
+    """
+    Test that the shard key is updated with the contract address.
+    """
+    user_db.update_user_contract(user_db.get_user_by_wallet_id("0xw0"), "0xNEW")
+
+    user = user_db.get_user_by_wallet_id("0xw0")
+    assert get_shard(user.contract_address, 1 << 32) == user.shard_key
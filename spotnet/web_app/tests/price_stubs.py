@@ -0,0 +1,31 @@
+"""
+Stubs of the price sources of the shared price service.
+"""
+
+import copy
+from decimal import Decimal
+
+
+class PriceSourceStub:
+    """
+    A local price source serving a fixed price table, standing in for AVNU
+    and Pragma. `calls` counts the upstream requests, `blocks` the blocks
+    prices were requested at.
+    """
+
+    def __init__(self, prices: dict[str, Decimal]):
+        self.prices = prices
+        self.calls = 0
+        self.blocks = []
+
+    async def __call__(self, block_number: int = None) -> dict[str, Decimal]:
+        """
+        Serve the price table.
+
+        :param block_number: The block the prices are requested at, None for latest.
+        :return: A copy of the price table.
+        """
+        self.calls += 1
+        if block_number is not None:
+            self.blocks.append(block_number)
+        return copy.copy(self.prices)
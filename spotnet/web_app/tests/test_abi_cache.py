@@ -0,0 +1,121 @@
+"""
+Test cases for the on-disk contract ABI cache.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import SierraContractClass, SierraEntryPointsByType
+from starknet_py.net.full_node_client import FullNodeClient
+
+from web_app.api.main import app, refresh_contracts
+from web_app.contract_tools.abi_cache import (
+    ABI_REFRESH_INTERVAL,
+    ABI_RETRY_DELAY,
+    ContractAbiCache,
+)
+from web_app.contract_tools.constants import EKUBO_MAINNET_ADDRESS
+
+CLASS_HASH = 0x123
+ABI = [
+    {
+        "type": "function",
+        "name": "get_pool_price",
+        "inputs": [{"name": "pool_key", "type": "core::felt252"}],
+        "outputs": [{"type": "core::felt252"}],
+        "state_mutability": "view",
+    }
+]
+
+
+@pytest.fixture
+def node_client():
+    """
+    Create a node client serving one Cairo 1 class.
+    """
+    client = FullNodeClient(node_url="http://localhost:6060")
+    client.get_class_hash_at = AsyncMock(return_value=CLASS_HASH)
+    client.get_class_by_hash = AsyncMock(
+        return_value=SierraContractClass(
+            contract_class_version="0.1.0",
+            sierra_program=[],
+            entry_points_by_type=SierraEntryPointsByType([], [], []),
+            abi=json.dumps(ABI),
+        )
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_contract_is_built_from_disk(node_client, tmp_path) -> None:
+    """
+    Test that a fetched ABI is persisted by class hash, and that a new process
+    builds the contract from disk without calling the node.
+    """
+    contract = await ContractAbiCache(node_client, tmp_path).get_contract(
+        EKUBO_MAINNET_ADDRESS
+    )
+    assert "get_pool_price" in contract.functions
+    assert (tmp_path / f"{CLASS_HASH:#066x}.json").exists()
+
+    node_client.get_class_hash_at.side_effect = ClientError("node is down")
+    contract = await ContractAbiCache(node_client, tmp_path).get_contract(
+        EKUBO_MAINNET_ADDRESS
+    )
+
+    assert contract.address == int(EKUBO_MAINNET_ADDRESS, 16)
+    assert "get_pool_price" in contract.functions
+    assert node_client.get_class_hash_at.await_count == 1
+    assert node_client.get_class_by_hash.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_only_new_classes(node_client, tmp_path) -> None:
+    """
+    Test that refreshing an unchanged contract does not fetch its class again,
+    and that refresh errors keep the cached contract.
+    """
+    cache = ContractAbiCache(node_client, tmp_path)
+    await cache.refresh([EKUBO_MAINNET_ADDRESS])
+    await cache.refresh([EKUBO_MAINNET_ADDRESS])
+    assert node_client.get_class_by_hash.await_count == 1
+
+    node_client.get_class_hash_at.side_effect = ClientError("node is down")
+    await cache.refresh([EKUBO_MAINNET_ADDRESS])
+
+    assert cache.get_cached(EKUBO_MAINNET_ADDRESS) is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_contracts_retries_missing_contract(
+    node_client, tmp_path
+) -> None:
+    """
+    Test that a contract that failed to load on startup is retried with a
+    growing delay, and that the refresh interval applies once it is loaded.
+    """
+    # Both cached contracts fail on the first two refreshes
+    node_is_down = ClientError("node is down")
+    node_client.get_class_hash_at.side_effect = [node_is_down] * 4 + [CLASS_HASH] * 2
+    delays = []
+
+    async def sleep(delay):
+        """
+        Record the delay and stop the refresh loop once the contract is loaded.
+        """
+        delays.append(delay)
+        if delay == ABI_REFRESH_INTERVAL:
+            raise asyncio.CancelledError
+
+    app.state.ekubo_contract = None
+    with patch(
+        "web_app.api.main.ABI_CACHE", ContractAbiCache(node_client, tmp_path)
+    ), patch("web_app.api.main.asyncio.sleep", sleep):
+        with pytest.raises(asyncio.CancelledError):
+            await refresh_contracts()
+
+    assert delays == [ABI_RETRY_DELAY, ABI_RETRY_DELAY * 2, ABI_REFRESH_INTERVAL]
+    assert "get_pool_price" in app.state.ekubo_contract.functions
@@ -0,0 +1,103 @@
+"""
+Test suite for the AlertMixin class in the web_app.contract_tools.mixins.alert module.
+"""
+
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from web_app.contract_tools.mixins.alert import AlertMixin
+
+USERS_BATCHES = [
+    [("0xa", "1"), ("0xb", "2")],
+    [("0xa", "3"), ("0xc", "4")],
+]
+HEALTH_RATIOS = {
+    "0xa": ("1.50", Decimal("0.6")),
+    "0xb": ("5.00", Decimal("0.2")),
+    "0xc": ("2.00", Decimal("0.4")),
+}
+
+
+def test_check_users_health_ratio_level():
+    """
+    Test that the scan runs on one event loop, computes the ratios per batch,
+    notifies every user under the threshold and closes the bot session.
+    """
+    loops = set()
+
+    async def get_health_ratios(contract_addresses):
+        """
+        Record the running loop and return the ratios of the addresses.
+        """
+        loops.add(asyncio.get_running_loop())
+        return {address: HEALTH_RATIOS[address] for address in contract_addresses}
+
+    with patch(
+        "web_app.contract_tools.mixins.alert.UserDBConnector"
+    ) as mock_user_db, patch(
+        "web_app.contract_tools.mixins.alert.SCAN_BATCH_SIZE", 2
+    ), patch(
+        "web_app.contract_tools.mixins.alert.HealthRatioMixin.get_health_ratios",
+        new=AsyncMock(side_effect=get_health_ratios),
+    ) as mock_get_health_ratios, patch(
+        "web_app.contract_tools.mixins.alert.send_health_ratio_notification",
+        new_callable=AsyncMock,
+    ) as mock_send, patch(
+        "web_app.contract_tools.mixins.alert.bot"
+    ) as mock_bot:
+        mock_get_page = mock_user_db.return_value.get_users_for_notifications_page
+        mock_get_page.side_effect = USERS_BATCHES + [[]]
+        mock_bot.session.close = AsyncMock()
+
+        AlertMixin.check_users_health_ratio_level()
+
+    assert len(loops) == 1
+    assert [call.args[0] for call in mock_get_health_ratios.await_args_list] == [
+        ["0xa", "0xb"],
+        ["0xa", "0xc"],
+    ]
+    assert sorted(call.args for call in mock_send.await_args_list) == [
+        ("1", "1.50"),
+        ("3", "1.50"),
+        ("4", "2.00"),
+    ]
+    assert [call.args for call in mock_get_page.call_args_list] == [
+        (2, None, 0, 1),
+        (2, ("0xb", "2"), 0, 1),
+        (2, ("0xc", "4"), 0, 1),
+    ]
+    mock_bot.session.close.assert_awaited_once()
+
+
+def test_check_users_health_ratio_level_shards():
+    """
+    Test that the shard is passed to the database query and that
+    every page read for the shard is checked.
+    """
+    checked = []
+
+    async def get_health_ratios(contract_addresses):
+        """
+        Record the checked addresses.
+        """
+        checked.extend(contract_addresses)
+        return {}
+
+    with patch(
+        "web_app.contract_tools.mixins.alert.UserDBConnector"
+    ) as mock_user_db, patch(
+        "web_app.contract_tools.mixins.alert.HealthRatioMixin.get_health_ratios",
+        new=AsyncMock(side_effect=get_health_ratios),
+    ), patch(
+        "web_app.contract_tools.mixins.alert.bot"
+    ) as mock_bot:
+        mock_bot.session.close = AsyncMock()
+        mock_get_page = mock_user_db.return_value.get_users_for_notifications_page
+        mock_get_page.side_effect = USERS_BATCHES + [[]]
+
+        user_number = AlertMixin.check_users_health_ratio_level(2, 4)
+
+    assert user_number == 4
+    assert checked == ["0xa", "0xb", "0xa", "0xc"]
+    assert all(call.args[2:] == (2, 4) for call in mock_get_page.call_args_list)
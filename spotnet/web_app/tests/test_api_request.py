@@ -0,0 +1,95 @@
+"""
+Test cases for APIRequest and the process-wide HTTP session pool,
+run against a local aiohttp server.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from web_app.contract_tools.api_request import APIRequest, HTTPSessionPool
+
+
+@pytest.fixture
+async def api_server():
+    """
+    Start a local API server counting the TCP connections it accepts.
+    """
+    peers = set()
+
+    async def handle(request: web.Request) -> web.Response:
+        """
+        Record the peer of the connection and echo the path.
+        """
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"path": request.path})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    server = TestServer(app)
+    await server.start_server()
+    server.peers = peers
+    yield server
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connection(api_server, monkeypatch) -> None:
+    """
+    Test that sequential requests share one session and one keep-alive connection.
+    """
+    pool = HTTPSessionPool(limit=10, limit_per_host=2)
+    monkeypatch.setattr("web_app.contract_tools.api_request.HTTP_SESSION_POOL", pool)
+    api = APIRequest(base_url=str(api_server.make_url("/")))
+    for index in range(5):
+        assert await api.fetch(f"item/{index}") == {"path": f"/item/{index}"}
+
+    stats = pool.stats()
+    await pool.close()
+
+    assert len(api_server.peers) == 1
+    assert stats["sessions_created"] == 1
+    assert stats["requests"] == 5
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    assert pool.stats()["idle"] == 0
+
+
+@pytest.mark.asyncio
+async def test_closed_session_is_recreated(api_server, monkeypatch) -> None:
+    """
+    Test that a request after close opens a new session.
+    """
+    pool = HTTPSessionPool()
+    monkeypatch.setattr("web_app.contract_tools.api_request.HTTP_SESSION_POOL", pool)
+    api = APIRequest(base_url=str(api_server.make_url("/")))
+    await api.fetch("a")
+    await pool.close()
+    await api.fetch("b")
+    await pool.close()
+
+    assert pool.sessions_created == 2
+
+
+def test_session_is_closed_with_its_loop() -> None:
+    """
+    Test that the session of a loop run by `asyncio.run` is closed when the
+    loop shuts down, and that the next loop gets a new session.
+    """
+    pool = HTTPSessionPool()
+
+    async def get_session():
+        """
+        Get the session of the running loop.
+        """
+        return pool.session()
+
+    first_session = asyncio.run(get_session())
+    second_session = asyncio.run(get_session())
+
+    assert first_session.closed
+    assert second_session.closed
+    assert first_session is not second_session
+    assert pool.sessions_created == 2
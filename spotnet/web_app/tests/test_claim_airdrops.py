@@ -3,28 +3,55 @@ Tests for the AirdropClaimer class, covering comprehensive airdrop claim operati
 
 Fixtures:
 - airdrop_claimer: Fixture creating a mock AirdropClaimer instance for consistent testing
-- mock_airdrop: Fixture generating a standard mock airdrop object for reusable test scenarios
+- mock_airdrop: Fixture generating a standard unclaimed airdrop row for reusable test scenarios
 
 Test Cases:
 - test_claim_airdrops_successful: Validates successful airdrop claim workflow
 - test_claim_airdrops_no_unclaimed: Checks behavior when no unclaimed airdrops exist
 - test_claim_airdrops_partial_failure: Tests mixed success and failure scenarios
+- test_claim_airdrops_once_per_contract: Checks that the airdrops of a contract
+  are claimed with one claim and the amount is saved once
+- test_claim_airdrops_pages_and_bounds_proof_requests: Checks paging, bounded
+  proof requests and batched updates
 - test_claim_airdrops_database_error: Verifies database error handling
+- test_claim_airdrops_mark_claimed_error: Checks that a failed cache update
+  does not count as a failed save
+- test_claim_airdrops_read_error: Checks that a failed page read fails the run
 - test_claim_airdrop_timeout_error: Ensures proper handling of request timeout errors
 - test_claim_airdrop_invalid_proof: Checks processing of invalid proof data
 - test_claim_airdrop_unexpected_error: Validates unexpected error management
 """
 
+import asyncio
 import logging
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from requests.exceptions import Timeout
 from sqlalchemy.exc import SQLAlchemyError
 
+from web_app.api.serializers.airdrop import AirdropItem, AirdropResponseModel
 from web_app.tasks.claim_airdrops import AirdropClaimer
 
 
+def airdrop_response(*items: tuple[str, bool]) -> AirdropResponseModel:
+    """
+    Build a zkLend reward API response from (amount, is_claimed) pairs.
+    """
+    return AirdropResponseModel(
+        airdrops=[
+            AirdropItem(
+                amount=amount,
+                proof=[f"proof{amount}"],
+                is_claimed=is_claimed,
+                recipient="0x1",
+            )
+            for amount, is_claimed in items
+        ]
+    )
+
+
 @pytest.fixture
 def airdrop_claimer():
     """
@@ -36,23 +63,19 @@ def airdrop_claimer():
     claimer = AirdropClaimer()
     claimer.db_connector = MagicMock()
     claimer.starknet_client = AsyncMock()
-    claimer.zk_lend_airdrop = MagicMock()
+    claimer.zk_lend_airdrop = AsyncMock()
     yield claimer
 
 
 @pytest.fixture
 def mock_airdrop():
     """
-    Create a standard mock airdrop for reusable test setup.
+    Create a standard unclaimed airdrop row for reusable test setup.
 
     Yields:
         mock_airdrop
     """
-    mock_airdrop = MagicMock()
-    mock_airdrop.user.contract_address = "0x123"
-    mock_airdrop.id = 1
-    mock_airdrop.amount = 100
-    yield mock_airdrop
+    yield {"id": 1, "amount": None, "contract_address": "0x123"}
 
 
 @pytest.mark.asyncio
@@ -61,22 +84,23 @@ async def test_claim_airdrops_successful(airdrop_claimer, mock_airdrop):
     Test the claim_airdrops method for successful claims.
     """
     # Arrange
-    airdrop_claimer.db_connector.get_all_unclaimed.return_value = [mock_airdrop]
-    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.return_value = [
-        "proof1",
-        "proof2",
-    ]
+    airdrop_claimer.db_connector.get_unclaimed_page.return_value = [mock_airdrop]
+    response = airdrop_response(("100", False), ("50", True))
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.return_value = response
     airdrop_claimer.starknet_client.claim_airdrop.return_value = True
 
     # Act
-    await airdrop_claimer.claim_airdrops()
+    metrics = await airdrop_claimer.claim_airdrops()
 
     # Assertions
-    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.assert_called_with("0x123")
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.assert_awaited_with("0x123")
     airdrop_claimer.starknet_client.claim_airdrop.assert_awaited_with(
-        "0x123", ["proof1", "proof2"]
+        "0x123", response.airdrops[:1]
     )
-    airdrop_claimer.db_connector.save_claim_data.assert_called_with(1, 100)
+    airdrop_claimer.db_connector.save_claims.assert_called_once_with(
+        {1: Decimal("100")}
+    )
+    assert (metrics.read, metrics.claimed, metrics.saved) == (1, 1, 1)
 
 
 @pytest.mark.asyncio
@@ -85,7 +109,7 @@ async def test_claim_airdrops_no_unclaimed(airdrop_claimer):
     Test claim_airdrops when no unclaimed airdrops exist.
     """
     # Arrange
-    airdrop_claimer.db_connector.get_all_unclaimed.return_value = []
+    airdrop_claimer.db_connector.get_unclaimed_page.return_value = []
 
     # Act
     await airdrop_claimer.claim_airdrops()
@@ -93,7 +117,7 @@ async def test_claim_airdrops_no_unclaimed(airdrop_claimer):
     # Assertions
     airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.assert_not_called()
     airdrop_claimer.starknet_client.claim_airdrop.assert_not_called()
-    airdrop_claimer.db_connector.save_claim_data.assert_not_called()
+    airdrop_claimer.db_connector.save_claims.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -102,36 +126,129 @@ async def test_claim_airdrops_partial_failure(airdrop_claimer):
     Test claim_airdrops with multiple airdrops, some failing and some succeeding.
     """
     # Arrange
-    mock_airdrop1 = MagicMock(
-        user=MagicMock(contract_address="0x123"), id=1, amount=100
-    )
-    mock_airdrop2 = MagicMock(
-        user=MagicMock(contract_address="0x456"), id=2, amount=200
+    airdrop_claimer.db_connector.get_unclaimed_page.return_value = [
+        {"id": 1, "amount": None, "contract_address": "0x123"},
+        {"id": 2, "amount": None, "contract_address": "0x456"},
+    ]
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.side_effect = [
+        airdrop_response(("100", False)),
+        airdrop_response(("200", False)),
+    ]
+
+    async def claim_airdrop(address, proofs):
+        """
+        Fail the claims of one contract.
+        """
+        if address == "0x456":
+            raise ValueError("Claim failed")
+        return True
+
+    airdrop_claimer.starknet_client.claim_airdrop.side_effect = claim_airdrop
+
+    # Act
+    metrics = await airdrop_claimer.claim_airdrops()
+
+    # Assertions
+    # Verify only the first airdrop was saved
+    airdrop_claimer.db_connector.save_claims.assert_called_once_with(
+        {1: Decimal("100")}
     )
+    assert (metrics.claimed, metrics.claim_failures) == (1, 1)
 
-    airdrop_claimer.db_connector.get_all_unclaimed.return_value = [
-        mock_airdrop1,
-        mock_airdrop2,
-    ]
 
-    # Mock different behaviors for different airdrops
+@pytest.mark.asyncio
+async def test_claim_airdrops_once_per_contract(airdrop_claimer):
+    """
+    Test that the airdrops of a contract, split across pages, are claimed with
+    one claim, that the claimed amount is saved on one of them and the others
+    are saved as claimed, and that the claimed items are marked in memory.
+    """
+    # Arrange
+    airdrop_claimer.PAGE_SIZE = 2
+    rows = [
+        {"id": 1, "amount": None, "contract_address": "0xabc"},
+        {"id": 2, "amount": None, "contract_address": "0xabc"},
+        {"id": 3, "amount": None, "contract_address": "0xabc"},
+        {"id": 4, "amount": None, "contract_address": "0xdef"},
+    ]
+    airdrop_claimer.db_connector.get_unclaimed_page.side_effect = [
+        rows[:2],
+        rows[2:],
+        [],
+    ]
+    response = airdrop_response(("100", False))
     airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.side_effect = [
-        ["proof1"],
-        ["proof2"],
+        response,
+        airdrop_response(("50", False)),
     ]
-    airdrop_claimer.starknet_client.claim_airdrop.side_effect = [
-        True,
-        ValueError("Claim failed"),
+
+    # Act
+    metrics = await airdrop_claimer.claim_airdrops()
+
+    # Assertions
+    assert [
+        call.args[0]
+        for call in airdrop_claimer.starknet_client.claim_airdrop.call_args_list
+    ] == ["0xabc", "0xdef"]
+    airdrop_claimer.db_connector.save_claims.assert_called_once_with(
+        {1: Decimal("100"), 2: Decimal("0"), 3: Decimal("0"), 4: Decimal("50")}
+    )
+    assert response.airdrops[0].is_claimed
+    assert (metrics.read, metrics.claimed, metrics.saved) == (4, 2, 4)
+
+
+@pytest.mark.asyncio
+async def test_claim_airdrops_pages_and_bounds_proof_requests(airdrop_claimer):
+    """
+    Test that airdrops are read page by page, that proof requests run concurrently
+    within the bound, and that claims are saved in batches.
+    """
+    # Arrange
+    airdrop_claimer.PAGE_SIZE = 4
+    airdrop_claimer.PROOF_CONCURRENCY = 3
+    airdrop_claimer.UPDATE_BATCH_SIZE = 5
+    rows = [
+        {"id": index, "amount": None, "contract_address": hex(index)}
+        for index in range(10)
     ]
+    airdrop_claimer.db_connector.get_unclaimed_page.side_effect = lambda limit, after: [
+        row
+        for row in rows
+        if after is None or (row["contract_address"], row["id"]) > after
+    ][:limit]
+    in_flight, max_in_flight = 0, 0
+
+    async def get_contract_airdrop(address):
+        """
+        Count the proof requests in flight.
+        """
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return airdrop_response(("1", False))
+
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.side_effect = (
+        get_contract_airdrop
+    )
 
     # Act
-    await airdrop_claimer.claim_airdrops()
+    metrics = await airdrop_claimer.claim_airdrops()
 
     # Assertions
-    # Verify first airdrop was claimed and saved
-    airdrop_claimer.db_connector.save_claim_data.assert_any_call(1, 100)
-    # Verify second airdrop was not saved due to claim failure
-    assert airdrop_claimer.db_connector.save_claim_data.call_count == 1
+    db_connector = airdrop_claimer.db_connector
+    assert [call.args for call in db_connector.get_unclaimed_page.call_args_list] == [
+        (4, None),
+        (4, ("0x3", 3)),
+        (4, ("0x7", 7)),
+    ]
+    assert max_in_flight == 3
+    assert [len(call.args[0]) for call in db_connector.save_claims.call_args_list] == [
+        5,
+        5,
+    ]
+    assert (metrics.read, metrics.proofs_fetched, metrics.saved) == (10, 10, 10)
 
 
 @pytest.mark.asyncio
@@ -140,23 +257,71 @@ async def test_claim_airdrops_database_error(airdrop_claimer, mock_airdrop, capl
     Test handling of database errors during airdrop claiming.
     """
     # Arrange
-    airdrop_claimer.db_connector.get_all_unclaimed.return_value = [mock_airdrop]
-    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.return_value = ["proof1"]
+    airdrop_claimer.db_connector.get_unclaimed_page.return_value = [mock_airdrop]
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.return_value = (
+        airdrop_response(("100", False))
+    )
     airdrop_claimer.starknet_client.claim_airdrop.return_value = True
 
     # Simulate database save error
-    airdrop_claimer.db_connector.save_claim_data.side_effect = SQLAlchemyError(
+    airdrop_claimer.db_connector.save_claims.side_effect = SQLAlchemyError(
         "Database error"
     )
 
     # Act
     with caplog.at_level(logging.ERROR):
-        await airdrop_claimer.claim_airdrops()
+        metrics = await airdrop_claimer.claim_airdrops()
 
     # Assertions
     assert "Database error while updating claim data" in caplog.text
     airdrop_claimer.starknet_client.claim_airdrop.assert_called_once()
-    airdrop_claimer.db_connector.save_claim_data.assert_called_once()
+    airdrop_claimer.db_connector.save_claims.assert_called_once()
+    assert metrics.save_errors == 1
+    airdrop_claimer.zk_lend_airdrop.mark_claimed.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_airdrops_mark_claimed_error(airdrop_claimer, mock_airdrop, caplog):
+    """
+    Test that a failed update of the proof cache is logged without counting
+    the saved claims as failed.
+    """
+    # Arrange
+    airdrop_claimer.db_connector.get_unclaimed_page.return_value = [mock_airdrop]
+    airdrop_claimer.zk_lend_airdrop.get_contract_airdrop.return_value = (
+        airdrop_response(("100", False))
+    )
+    airdrop_claimer.zk_lend_airdrop.mark_claimed.side_effect = SQLAlchemyError(
+        "Database error"
+    )
+
+    # Act
+    with caplog.at_level(logging.ERROR):
+        metrics = await airdrop_claimer.claim_airdrops()
+
+    # Assertions
+    assert "marking cached proofs" in caplog.text
+    assert (metrics.saved, metrics.save_errors) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_claim_airdrops_read_error(airdrop_claimer):
+    """
+    Test that a failed read of unclaimed airdrops fails the run instead of
+    ending it as if no airdrops were left.
+    """
+    # Arrange
+    airdrop_claimer.db_connector.get_unclaimed_page.side_effect = SQLAlchemyError(
+        "Database error"
+    )
+
+    # Act
+    with pytest.raises(ExceptionGroup) as exc_info:
+        await airdrop_claimer.claim_airdrops()
+
+    # Assertions
+    assert exc_info.group_contains(SQLAlchemyError)
+    airdrop_claimer.starknet_client.claim_airdrop.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -8,19 +8,21 @@ IDs and service failures, to confirm that the dashboard endpoint behaves reliabl
 under various conditions.
 """
 
+import asyncio
 import uuid
 from datetime import datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
 
 from web_app.api.dashboard import get_dashboard, router
 from web_app.api.serializers.dashboard import DashboardResponse
+from web_app.db.crud import AsyncPositionDBConnector
 from web_app.db.models import ExtraDeposit
 from web_app.contract_tools.mixins import HealthRatioMixin
 from web_app.contract_tools.mixins.dashboard import DashboardMixin
@@ -158,6 +160,60 @@ async def test_get_dashboard_success():
             "position_id": str(id),
             "deposit_data": RETURN_EXTRA_DEPOSIT,
         }
+        server_timing = response.headers["Server-Timing"]
+        for stage in ("contract", "positions", "health", "current_sum", "deposits"):
+            assert f"{stage};dur=" in server_timing
+        assert "total;dur=" in server_timing and 'desc="MISS"' in server_timing
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_runs_independent_stages_concurrently(mock_db_connector):
+    """
+    Test that the health ratio, position sums and extra deposits of a position
+    are fetched concurrently once its position is known.
+    """
+    in_flight, max_in_flight = 0, 0
+
+    def stage(result):
+        """Build a stage mock that returns the result after a short await."""
+        async def run(*_):
+            """Track the stages in flight while the stage runs."""
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return result
+
+        return run
+
+    position = {
+        **MOCK_POSITION,
+        "id": str(uuid.uuid4()),
+        "start_price": "100.0",
+        "amount": "2.0",
+        "token_symbol": "ETH",
+    }
+    mock_db_connector.get_contract_address_by_wallet_id.return_value = (
+        MOCK_CONTRACT_ADDRESS
+    )
+    mock_db_connector.get_positions_by_wallet_id.return_value = [position]
+    mock_db_connector.get_extra_deposits_by_position_id.side_effect = stage([])
+    with patch.object(
+        HealthRatioMixin,
+        "get_health_ratio_and_tvl",
+        side_effect=stage(("1.2", "1000.0")),
+    ), patch.object(
+        DashboardMixin,
+        "get_current_position_sum",
+        side_effect=stage(Decimal("200.0")),
+    ), patch.object(
+        DashboardMixin, "get_position_balance", side_effect=stage("2.0")
+    ):
+        response = await get_dashboard(VALID_WALLET_ID, Response())
+
+    assert response.health_ratio == "1.2"
+    assert max_in_flight == 4
 
 
 @pytest.mark.asyncio
@@ -239,7 +295,9 @@ def mock_db_connector():
     of database-related functions without accessing the actual database,
     enabling the simulation of different responses and conditions.
     """
-    with patch("web_app.api.dashboard.position_db_connector") as mock:
+    with patch(
+        "web_app.api.dashboard.position_db_connector", spec=AsyncPositionDBConnector
+    ) as mock:
         yield mock
 
 
@@ -280,7 +338,7 @@ async def test_invalid_wallet_id(mock_db_connector):
         "Invalid wallet ID"
     )
     with pytest.raises(ValueError) as exc_info:
-        await get_dashboard(INVALID_WALLET_ID)
+        await get_dashboard(INVALID_WALLET_ID, Response())
     assert str(exc_info.value) == "Invalid wallet ID"
 
 
@@ -294,13 +352,17 @@ async def test_empty_positions(
         MOCK_CONTRACT_ADDRESS
     )
     mock_db_connector.get_positions_by_wallet_id.return_value = []
-    DashboardMixin.get_wallet_balances = AsyncMock(return_value=MOCK_WALLET_BALANCES)
     # DashboardMixin.get_zklend_position = AsyncMock(return_value={"products": []})
-    HealthRatioMixin.get_health_ratio_and_tvl = AsyncMock(
-        return_value=("1.2", "1000.0")
-    )
-
-    response = await get_dashboard(VALID_WALLET_ID)
+    with patch.object(
+        DashboardMixin,
+        "get_wallet_balances",
+        AsyncMock(return_value=MOCK_WALLET_BALANCES),
+    ), patch.object(
+        HealthRatioMixin,
+        "get_health_ratio_and_tvl",
+        AsyncMock(return_value=("1.2", "1000.0")),
+    ):
+        response = await get_dashboard(VALID_WALLET_ID, Response())
     assert isinstance(response, DashboardResponse)
     assert response.dict() == {
         "multipliers": {},
@@ -328,7 +390,7 @@ async def test_external_service_errors(mock_db_connector):
         side_effect=Exception("External API error"),
     ) as mock_get_health_ratio_and_tvl:
         with pytest.raises(Exception) as exc_info:
-            await get_dashboard(VALID_WALLET_ID)
+            await get_dashboard(VALID_WALLET_ID, Response())
         assert str(exc_info.value) == "External API error"
 
 
@@ -349,6 +411,6 @@ async def test_external_service_errors(mock_db_connector):
 #         return_value=("1.2", "1000.0")
 #     )
 #     with pytest.raises(Exception) as exc_info:
-#         await get_dashboard(VALID_WALLET_ID)
+#         await get_dashboard(VALID_WALLET_ID, Response())
 
 #     assert str(exc_info.value) == "ZkLend API error"
@@ -2,6 +2,7 @@
 Test suite for the DashboardMixin class in the web_app.contract_tools.mixins.dashboard module.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -14,13 +15,15 @@ from web_app.contract_tools.mixins.dashboard import DashboardMixin
 def mock_starknet_client():
     """Mock the StarkNet client."""
     with patch("web_app.contract_tools.mixins.dashboard.CLIENT") as mock:
+        mock.get_block_number = AsyncMock(return_value=1)
+        DashboardMixin._wallet_balances.invalidate()
         yield mock
 
 
 @pytest.fixture
 def mock_api_request():
     """Mock the API request class."""
-    with patch("web_app.contract_tools.mixins.dashboard.APIRequest") as mock:
+    with patch("web_app.contract_tools.price_service.APIRequest") as mock:
         yield mock
 
 
@@ -71,4 +74,56 @@ class TestDashboardMixin:
             result = await DashboardMixin.get_wallet_balances("0xHolderAddress")
 
         # Assert
-        assert result == {"ETH": "10.5", "USDC": "1000.0"}
+        assert result == {"ETH": "10.5", "STRK": 0, "USDC": "1000.0"}
+
+    @pytest.mark.asyncio
+    async def test_get_wallets_balances_cached_per_block(self, mock_starknet_client):
+        """
+        Test that balances of many holders are fetched concurrently, and fetched
+        again only for a new block.
+        """
+        in_flight = max_in_flight = 0
+
+        async def _get_balance(token_addr, holder_addr, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if holder_addr == "0x2" and token_addr == TokenParams.USDC.address:
+                raise Exception("error")
+            return f"{holder_addr}:{token_addr}"
+
+        mock_starknet_client.get_balance = AsyncMock(side_effect=_get_balance)
+        with patch.object(
+            TokenParams, "tokens", return_value=[TokenParams.ETH, TokenParams.USDC]
+        ):
+            result = await DashboardMixin.get_wallets_balances(["0x1", "0x2"])
+            await DashboardMixin.get_wallet_balances("0x1")
+            mock_starknet_client.get_block_number.return_value = 2
+            await DashboardMixin.get_wallet_balances("0x1")
+
+        assert result == {
+            "0x1": {
+                "ETH": f"0x1:{TokenParams.ETH.address}",
+                "USDC": f"0x1:{TokenParams.USDC.address}",
+            },
+            "0x2": {"ETH": f"0x2:{TokenParams.ETH.address}", "USDC": 0},
+        }
+        assert max_in_flight == 4
+        assert mock_starknet_client.get_balance.await_count == 6
+
+    @pytest.mark.asyncio
+    async def test_get_wallet_balances_failures_not_cached(self, mock_starknet_client):
+        """
+        Test that a failed balance is returned as 0 and fetched again
+        in the same block.
+        """
+        mock_starknet_client.get_balance = AsyncMock(
+            side_effect=[Exception("error"), "10.5"]
+        )
+        with patch.object(TokenParams, "tokens", return_value=[TokenParams.ETH]):
+            first = await DashboardMixin.get_wallet_balances("0x1")
+            second = await DashboardMixin.get_wallet_balances("0x1")
+
+        assert (first, second) == ({"ETH": 0}, {"ETH": "10.5"})
@@ -0,0 +1,173 @@
+"""
+Test suite for the HealthRatioMixin class in the web_app.contract_tools.mixins.health_ratio module.
+"""
+
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.mixins.health_ratio import HealthRatioMixin
+from web_app.contract_tools.price_service import PartialPrices
+
+Z_ADDRESSES = {
+    "ETH": (18, 0x1, 10**27),
+    "STRK": (18, 0x2, 10**27),
+    "USDC": (6, 0x3, 10**27),
+    "kSTRK": (18, 0x4, 10**27),
+}
+# contract address -> (z-token balances by token, debts by token address)
+POSITIONS = {
+    "0xa": ({"ETH": "2"}, {TokenParams.USDC.address: 1000 * 10**6}),
+    "0xb": ({"ETH": "1", "STRK": "100"}, {TokenParams.USDC.address: 500 * 10**6}),
+    "0xc": ({"ETH": "1"}, {}),
+}
+
+
+@pytest.fixture
+def mock_starknet_client():
+    """
+    Mock the StarkNet client with the POSITIONS state. The balance calls of the
+    (holder, token) pairs added to `failed_balances` fail.
+    """
+    z_tokens = {z_address: token for token, (_, z_address, _) in Z_ADDRESSES.items()}
+    failed_balances = set()
+
+    async def get_balance(z_address, holder, decimals, raise_errors=False):
+        """Get the z-token balance of a holder from POSITIONS."""
+        if (holder, z_tokens[z_address]) in failed_balances:
+            if raise_errors:
+                raise ConnectionError("balanceOf failed")
+            return 0
+        return POSITIONS[holder][0].get(z_tokens[z_address], "0")
+
+    async def get_zklend_debt(holder, token_address):
+        """Get the debt of a holder from POSITIONS."""
+        return [POSITIONS[holder][1].get(token_address, 0)]
+
+    @asynccontextmanager
+    async def snapshot():
+        """Pin the reads to block 100."""
+        yield 100
+
+    with patch("web_app.contract_tools.mixins.health_ratio.CLIENT") as mock:
+        mock.snapshot = snapshot
+        mock.failed_balances = failed_balances
+        mock.get_z_addresses = AsyncMock(return_value=Z_ADDRESSES)
+        mock.get_balance = AsyncMock(side_effect=get_balance)
+        mock.get_zklend_debt = AsyncMock(side_effect=get_zklend_debt)
+        yield mock
+
+
+class TestHealthRatioMixin:
+    """
+    Test cases for the HealthRatioMixin class.
+    """
+
+    @pytest.mark.asyncio
+    async def test_get_health_ratio_and_tvl(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test the health ratio and LTV of a single position.
+        """
+        health_ratio, ltv = await HealthRatioMixin.get_health_ratio_and_tvl("0xa")
+
+        assert health_ratio == "4.00"
+        assert ltv == Decimal("0.25")
+
+    @pytest.mark.asyncio
+    async def test_get_health_ratios_matches_single_calls(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test that the batch API returns the same ratios as the per-contract method
+        and skips positions without debt.
+        """
+        expected = {
+            address: await HealthRatioMixin.get_health_ratio_and_tvl(address)
+            for address in ("0xa", "0xb")
+        }
+
+        health_ratios = await HealthRatioMixin.get_health_ratios(list(POSITIONS))
+
+        assert health_ratios == expected
+        # The single calls share the cached latest prices,
+        # the batch fetches the prices at its snapshot block once
+        assert price_stub.calls == 2
+        assert price_stub.blocks == [100]
+
+    @pytest.mark.asyncio
+    async def test_get_health_ratios_skips_positions_without_prices(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test that a token whose price feed failed skips only the positions
+        holding it.
+        """
+        price_stub.prices = PartialPrices(
+            {
+                token: price
+                for token, price in price_stub.prices.items()
+                if token != "STRK"
+            },
+            ["STRK"],
+        )
+
+        health_ratios = await HealthRatioMixin.get_health_ratios(list(POSITIONS))
+
+        assert list(health_ratios) == ["0xa"]
+
+    @pytest.mark.asyncio
+    async def test_get_health_ratios_skips_failed_balances(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test that a failed balance call skips the position instead of counting
+        the balance as 0, which would understate its health ratio.
+        """
+        mock_starknet_client.failed_balances.add(("0xb", "STRK"))
+
+        health_ratios = await HealthRatioMixin.get_health_ratios(list(POSITIONS))
+
+        assert list(health_ratios) == ["0xa"]
+
+    @pytest.mark.asyncio
+    async def test_get_position_snapshot_skips_failed_positions(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test that the snapshot leaves out the contracts whose inputs can not
+        be read and the positions holding a token without a price.
+        """
+        price_stub.prices = PartialPrices(
+            {
+                token: price
+                for token, price in price_stub.prices.items()
+                if token != "STRK"
+            },
+            ["STRK"],
+        )
+
+        snapshot = await HealthRatioMixin.get_position_snapshot(
+            [*POSITIONS, "0xunknown"]
+        )
+
+        assert snapshot.contract_addresses == ["0xa", "0xc"]
+        assert snapshot.compute().health_factors.tolist() == [4.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_get_position_snapshot_skips_failed_balances(
+        self, mock_starknet_client, price_stub
+    ):
+        """
+        Test that a failed balance call leaves the contract out of the snapshot
+        instead of counting the balance as 0.
+        """
+        mock_starknet_client.failed_balances.add(("0xa", "ETH"))
+
+        snapshot = await HealthRatioMixin.get_position_snapshot(list(POSITIONS))
+
+        assert snapshot.contract_addresses == ["0xb", "0xc"]
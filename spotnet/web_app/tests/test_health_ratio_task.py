@@ -0,0 +1,45 @@
+"""
+Test cases for the sharded check_users_health_ratio Celery task.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from spotnet_tracker.tasks import check_users_health_ratio
+
+
+def test_check_users_health_ratio_runs_shard():
+    """
+    Test that a shard run holds its lock and reports its timing.
+    """
+    lock = MagicMock()
+    lock.acquire.return_value = True
+    with patch("spotnet_tracker.tasks.redis_client") as mock_redis, patch(
+        "spotnet_tracker.tasks.AlertMixin.check_users_health_ratio_level",
+        return_value=7,
+    ) as mock_check:
+        mock_redis.lock.return_value = lock
+        result = check_users_health_ratio(1, 4)
+
+    assert mock_redis.lock.call_args.args[0] == "lock:check_users_health_ratio:4:1"
+    mock_check.assert_called_once_with(1, 4)
+    lock.release.assert_called_once()
+    assert result["shard"] == 1
+    assert result["users"] == 7
+    assert result["duration"] >= 0
+
+
+def test_check_users_health_ratio_skips_locked_shard():
+    """
+    Test that a shard run is skipped while the previous run holds the lock.
+    """
+    lock = MagicMock()
+    lock.acquire.return_value = False
+    with patch("spotnet_tracker.tasks.redis_client") as mock_redis, patch(
+        "spotnet_tracker.tasks.AlertMixin.check_users_health_ratio_level"
+    ) as mock_check:
+        mock_redis.lock.return_value = lock
+        result = check_users_health_ratio(0, 4)
+
+    assert result is None
+    mock_check.assert_not_called()
+    lock.release.assert_not_called()
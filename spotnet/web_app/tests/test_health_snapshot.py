@@ -0,0 +1,107 @@
+"""
+Test cases for the vectorized health metrics of
+web_app.contract_tools.health_snapshot.PositionSnapshot
+"""
+
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from web_app.contract_tools.constants import TokenParams, ZKLEND_SCALE_DECIMALS
+from web_app.contract_tools.health_snapshot import PositionSnapshot
+from web_app.contract_tools.mixins.health_ratio import HealthRatioMixin
+
+ACCUMULATORS = {
+    "ETH": 1_010_000_000_000_000_000_000_000_000,
+    "STRK": 1_050_000_000_000_000_000_000_000_000,
+    "USDC": 1_030_000_000_000_000_000_000_000_000,
+    "kSTRK": 1_000_000_000_000_000_000_000_000_000,
+}
+PRICES = {
+    "ETH": Decimal("3150.25"),
+    "STRK": Decimal("0.4312"),
+    "USDC": Decimal("0.9998"),
+    "kSTRK": Decimal("0.4498"),
+}
+
+
+def _random_positions(count: int, seed: int = 7) -> tuple[dict, dict, dict]:
+    """
+    Generate random leveraged positions: collateral in one or two tokens
+    and debt in USDC, or in ETH for USDC collateral.
+
+    :return: z-balances, debts and borrowed tokens by contract address.
+    """
+    rng = random.Random(seed)
+    z_balances, debts, borrowed = {}, {}, {}
+    for index in range(count):
+        address = hex(index + 1)
+        collateral = rng.sample(["ETH", "STRK", "USDC", "kSTRK"], rng.randint(1, 2))
+        z_balances[address] = {
+            token: str(round(rng.uniform(0.01, 50_000), 6)) for token in collateral
+        }
+        debt_token = "ETH" if collateral[0] == "USDC" else "USDC"
+        decimals = int(
+            TokenParams.get_token_decimals(TokenParams.get_token_address(debt_token))
+        )
+        debts[address] = {debt_token: rng.randint(1, 10**7) * 10 ** (decimals - 4)}
+        borrowed[address] = debt_token
+    return z_balances, debts, borrowed
+
+
+class TestPositionSnapshot:
+    """
+    Test cases for PositionSnapshot.compute
+    """
+
+    def test_parity_with_decimal_path(self) -> None:
+        """
+        Test that vectorized health factors and LTVs match the rounded values
+        of the Decimal path of HealthRatioMixin.
+        """
+        z_balances, debts, borrowed = _random_positions(500)
+        snapshot = PositionSnapshot.from_inputs(z_balances, debts, ACCUMULATORS, PRICES)
+
+        metrics = snapshot.compute()
+
+        for row, address in enumerate(snapshot.contract_addresses):
+            deposits = {
+                token: Decimal(balance)
+                * Decimal(ACCUMULATORS[token])
+                / ZKLEND_SCALE_DECIMALS
+                for token, balance in z_balances[address].items()
+            }
+            health_factor, ltv = HealthRatioMixin._calculate_health_ratio_and_tvl(
+                borrowed[address],
+                debts[address][borrowed[address]],
+                deposits,
+                PRICES,
+            )
+            assert metrics.health_factors[row] == float(health_factor)
+            assert metrics.ltvs[row] == float(ltv)
+
+    def test_liquidation_price_sets_health_factor_to_one(self) -> None:
+        """
+        Test that repricing a collateral token at its liquidation price
+        brings the health factor of the position to 1.
+        """
+        z_balances = {"0x1": {"ETH": "2"}, "0x2": {"STRK": "1000"}}
+        debts = {"0x1": {"USDC": 3000 * 10**6}, "0x2": {}}
+        snapshot = PositionSnapshot.from_inputs(z_balances, debts, ACCUMULATORS, PRICES)
+
+        metrics = snapshot.compute()
+
+        eth = snapshot.tokens.index("ETH")
+        liquidation_price = metrics.liquidation_prices[0, eth]
+        repriced = PositionSnapshot.from_inputs(
+            z_balances,
+            debts,
+            ACCUMULATORS,
+            PRICES | {"ETH": Decimal(str(liquidation_price))},
+        )
+        assert repriced.compute().health_factors[0] == pytest.approx(1.0)
+        # A position without debt has no health factor and no liquidation price
+        assert metrics.health_factors[1] == 0
+        assert np.isnan(metrics.liquidation_prices[1]).all()
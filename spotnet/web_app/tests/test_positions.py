@@ -84,7 +84,9 @@ async def test_close_position_success(client: TestClient) -> None:
     transaction_hash = "0xabc123"
     with patch(
         "web_app.db.crud.PositionDBConnector.close_position"
-    ) as mock_close_position:
+    ) as mock_close_position, patch(
+        "web_app.db.crud.PositionDBConnector.save_transaction"
+    ):
         mock_close_position.return_value = "Position successfully closed"
 
         response = client.get(
@@ -498,12 +500,9 @@ async def test_get_user_positions_success(client: TestClient) -> None:
     mock_total_count = len(mock_positions)
 
     with patch(
-        "web_app.db.crud.PositionDBConnector.get_all_positions_by_wallet_id"
-    ) as mock_get_positions, patch(
-            "web_app.db.crud.PositionDBConnector.get_count_positions_by_wallet_id"
-    ) as mock_get_count_positions:
-        mock_get_positions.return_value = mock_positions
-        mock_get_count_positions.return_value = mock_total_count
+        "web_app.db.crud.PositionDBConnector.get_all_positions_with_count_by_wallet_id"
+    ) as mock_get_positions:
+        mock_get_positions.return_value = (mock_positions, mock_total_count)
 
         response = client.get(f"/api/user-positions/{wallet_id}")
 
@@ -531,14 +530,48 @@ async def test_get_user_positions_no_positions(client: AsyncClient) -> None:
     """
     wallet_id = "wallet_with_no_positions"
     with patch(
-        "web_app.db.crud.PositionDBConnector.get_positions_by_wallet_id"
+        "web_app.db.crud.PositionDBConnector.get_all_positions_with_count_by_wallet_id"
     ) as mock_get_positions:
-        mock_get_positions.return_value = []
+        mock_get_positions.return_value = ([], 0)
         response = client.get(f"/api/user-positions/{wallet_id}")
 
         assert response.status_code == 200
         data = response.json()
-        assert data == {"positions": [], "total_count": 0}
+        assert data == {"positions": [], "total_count": 0, "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_get_user_positions_by_cursor(client: TestClient) -> None:
+    """
+    Test retrieving the next page of user positions by cursor.
+    """
+    wallet_id = "test_wallet_id"
+    with patch(
+        "web_app.db.crud.PositionDBConnector.get_positions_page_by_wallet_id"
+    ) as mock_get_page:
+        mock_get_page.return_value = ([], None)
+        response = client.get(
+            f"/api/user-positions/{wallet_id}", params={"cursor": "abc", "limit": 5}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "positions": [],
+            "total_count": None,
+            "next_cursor": None,
+        }
+        mock_get_page.assert_called_once_with(wallet_id, limit=5, cursor="abc")
+
+
+@pytest.mark.asyncio
+async def test_get_user_positions_invalid_cursor(client: TestClient) -> None:
+    """
+    Test retrieving user positions with a malformed cursor.
+    """
+    response = client.get(
+        "/api/user-positions/test_wallet_id", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
 
 
 @pytest.mark.parametrize(
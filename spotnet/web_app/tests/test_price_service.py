@@ -0,0 +1,164 @@
+"""
+Test cases for the shared PriceService, run against local price source stubs.
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from web_app.contract_tools.price_service import (
+    PartialPrices,
+    PriceService,
+    PriceSource,
+    PriceUnavailableError,
+)
+from web_app.tests.price_stubs import PriceSourceStub
+
+PRICES = {"ETH": Decimal("2000"), "USDC": Decimal("1")}
+
+
+class SlowPriceSourceStub(PriceSourceStub):
+    """
+    A price source stub answering after a delay.
+    """
+
+    async def __call__(self) -> dict[str, Decimal]:
+        """
+        Serve the price table after the delay.
+        """
+        await asyncio.sleep(0.05)
+        return await super().__call__()
+
+
+class FakeRedis:
+    """
+    An in-memory stand-in for the GET/SET commands of a Redis client.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        """
+        Get the value of a key.
+        """
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        """
+        Set the value of a key, the expiry is ignored.
+        """
+        self.data[key] = value
+
+
+@pytest.mark.asyncio
+async def test_get_prices_is_cached() -> None:
+    """
+    Test that a fresh price table is served without calling the source.
+    """
+    stub = PriceSourceStub(PRICES)
+    service = PriceService({PriceSource.AVNU: stub}, ttl=60, stale_ttl=120)
+
+    assert await service.get_prices(PriceSource.AVNU) == PRICES
+    assert await service.get_prices(PriceSource.AVNU) == PRICES
+    assert stub.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced() -> None:
+    """
+    Test that concurrent requests of a missing table share one upstream call.
+    """
+    stub = SlowPriceSourceStub(PRICES)
+    service = PriceService({PriceSource.AVNU: stub}, ttl=60, stale_ttl=120)
+
+    results = await asyncio.gather(
+        *(service.get_prices(PriceSource.AVNU) for _ in range(10))
+    )
+
+    assert all(result == PRICES for result in results)
+    assert stub.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_prices_are_revalidated_in_background() -> None:
+    """
+    Test that a stale table is served at once while one refresh runs.
+    """
+    stub = SlowPriceSourceStub(PRICES)
+    service = PriceService({PriceSource.AVNU: stub}, ttl=0.01, stale_ttl=120)
+    await service.get_prices(PriceSource.AVNU)
+    await asyncio.sleep(0.02)
+    stub.prices = {"ETH": Decimal("2100"), "USDC": Decimal("1")}
+
+    stale = await asyncio.gather(
+        *(service.get_prices(PriceSource.AVNU) for _ in range(5))
+    )
+    await asyncio.sleep(0.1)
+
+    assert all(result == PRICES for result in stale)
+    assert stub.calls == 2
+    assert (await service.get_prices(PriceSource.AVNU))["ETH"] == Decimal("2100")
+
+
+@pytest.mark.asyncio
+async def test_prices_are_shared_through_redis() -> None:
+    """
+    Test that a process reuses the fresh table another process stored in Redis.
+    """
+    redis_client = FakeRedis()
+    stub = PriceSourceStub(PRICES)
+    first = PriceService({PriceSource.PRAGMA: stub}, ttl=60, redis_client=redis_client)
+    second = PriceService({PriceSource.PRAGMA: stub}, ttl=60, redis_client=redis_client)
+
+    await first.get_prices(PriceSource.PRAGMA)
+    prices = await second.get_prices(PriceSource.PRAGMA)
+
+    assert prices == PRICES
+    assert stub.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_source_falls_back_to_snapshot() -> None:
+    """
+    Test that an outdated Redis snapshot is served if the source has no prices,
+    and that an error is raised if there is no snapshot either.
+    """
+    redis_client = FakeRedis()
+    stub = PriceSourceStub({})
+    service = PriceService({PriceSource.AVNU: stub}, ttl=60, redis_client=redis_client)
+
+    with pytest.raises(PriceUnavailableError):
+        await service.get_prices(PriceSource.AVNU)
+
+    await PriceService(
+        {PriceSource.AVNU: PriceSourceStub(PRICES)}, redis_client=redis_client
+    ).get_prices(PriceSource.AVNU)
+    service.ttl = 0
+    assert await service.get_prices(PriceSource.AVNU) == PRICES
+
+
+@pytest.mark.asyncio
+async def test_partial_prices_are_not_cached() -> None:
+    """
+    Test that a table missing failed feeds is served but not cached,
+    so the next read fetches the missing prices again.
+    """
+    stub = PriceSourceStub(PartialPrices({"ETH": Decimal("2000")}, ["USDC"]))
+    service = PriceService(
+        {PriceSource.PRAGMA: stub},
+        ttl=60,
+        stale_ttl=120,
+        block_sources={PriceSource.PRAGMA: stub},
+    )
+
+    assert await service.get_prices(PriceSource.PRAGMA) == {"ETH": Decimal("2000")}
+    assert await service.get_prices(PriceSource.PRAGMA, 5) == {"ETH": Decimal("2000")}
+    stub.prices = PRICES
+    await service.get_prices(PriceSource.PRAGMA)
+    await asyncio.sleep(0.01)
+
+    assert await service.get_prices(PriceSource.PRAGMA) == PRICES
+    assert await service.get_prices(PriceSource.PRAGMA, 5) == PRICES
+    assert stub.calls == 4
@@ -0,0 +1,212 @@
+"""
+Test cases for the ResponseCache used by the dashboard endpoint.
+"""
+
+import asyncio
+
+import pytest
+
+from web_app.contract_tools.blockchain_call import StarknetClient
+from web_app.contract_tools.response_cache import CacheStatus, ResponseCache
+
+WALLET_ID = "0x123"
+
+
+class DashboardStub:
+    """
+    A dashboard loader counting its calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"balance": str(self.calls)}
+
+
+class BlockStub:
+    """
+    A latest block number source.
+    """
+
+    def __init__(self, block_number: int = 1):
+        self.block_number = block_number
+
+    async def __call__(self) -> int:
+        return self.block_number
+
+
+class FakeRedis:
+    """
+    An in-memory stand-in for the commands of a Redis client used by the cache.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, *keys):
+        """Get the values of the keys, None for missing keys."""
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        """Set the value of a key."""
+        self.data[key] = value
+
+    def pipeline(self):
+        """Start a pipeline of commands."""
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """
+    An in-memory stand-in for a Redis pipeline of INCR and DELETE commands.
+    """
+
+    def __init__(self, redis_client: FakeRedis):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return None
+
+    def incr(self, key):
+        """Queue an increment of a key."""
+        self.commands.append(lambda data: data.update({key: int(data.get(key, 0)) + 1}))
+
+    def delete(self, key):
+        """Queue a deletion of a key."""
+        self.commands.append(lambda data: data.pop(key, None))
+
+    def execute(self):
+        """Run the queued commands."""
+        for command in self.commands:
+            command(self.redis_client.data)
+
+
+@pytest.mark.asyncio
+async def test_response_is_cached_until_next_block() -> None:
+    """
+    Test that a response is a HIT within a block, and STALE once a new block
+    appears while it is refreshed in the background.
+    """
+    loader, block = DashboardStub(), BlockStub()
+    cache = ResponseCache("dashboard", ttl=60, stale_ttl=120, block_number=block)
+
+    assert await cache.get_or_load(WALLET_ID, loader) == (
+        {"balance": "1"},
+        CacheStatus.MISS,
+    )
+    assert await cache.get_or_load(WALLET_ID, loader) == (
+        {"balance": "1"},
+        CacheStatus.HIT,
+    )
+    block.block_number = 2
+    assert await cache.get_or_load(WALLET_ID, loader) == (
+        {"balance": "1"},
+        CacheStatus.STALE,
+    )
+    await asyncio.sleep(0.05)
+
+    assert await cache.get_or_load(WALLET_ID, loader) == (
+        {"balance": "2"},
+        CacheStatus.HIT,
+    )
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 2,
+        "shared_hits": 0,
+        "stale_hits": 1,
+        "misses": 1,
+        "refreshes": 2,
+        "refresh_errors": 0,
+        "invalidations": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_response_is_built_at_its_block() -> None:
+    """
+    Test that the reads of a build are pinned to the block the response is
+    cached for, and that the background refresh pins the new block.
+    """
+    client = StarknetClient(node_url="http://localhost:6060")
+    block = BlockStub()
+    cache = ResponseCache(
+        "dashboard", ttl=60, block_number=block, snapshot=client.snapshot
+    )
+
+    async def loader() -> int:
+        """Read the block number of the pinned snapshot."""
+        return await client.get_block_number()
+
+    assert await cache.get_or_load(WALLET_ID, loader) == (1, CacheStatus.MISS)
+    block.block_number = 2
+    await cache.get_or_load(WALLET_ID, loader)
+    await asyncio.sleep(0.01)
+
+    assert await cache.get_or_load(WALLET_ID, loader) == (2, CacheStatus.HIT)
+    assert client.pinned_block() is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced() -> None:
+    """
+    Test that concurrent requests of a missing response share one load.
+    """
+    loader = DashboardStub()
+    cache = ResponseCache("dashboard", ttl=60)
+
+    results = await asyncio.gather(
+        *(cache.get_or_load(WALLET_ID, loader) for _ in range(10))
+    )
+
+    assert all(value == {"balance": "1"} for value, _ in results)
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_shared_through_redis() -> None:
+    """
+    Test that invalidating a response in one process makes every process
+    rebuild it, and that a fresh response is reused across processes.
+    """
+    redis_client, loader = FakeRedis(), DashboardStub()
+    first = ResponseCache("dashboard", ttl=60, redis_client=redis_client)
+    second = ResponseCache("dashboard", ttl=60, redis_client=redis_client)
+
+    await first.get_or_load(WALLET_ID, loader)
+    assert await second.get_or_load(WALLET_ID, loader) == (
+        {"balance": "1"},
+        CacheStatus.HIT,
+    )
+
+    await first.invalidate(WALLET_ID)
+
+    assert await second.get_or_load(WALLET_ID, loader) == (
+        {"balance": "2"},
+        CacheStatus.MISS,
+    )
+    assert await first.get_or_load(WALLET_ID, loader) == (
+        {"balance": "2"},
+        CacheStatus.HIT,
+    )
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted() -> None:
+    """
+    Test that the in-process tier keeps at most `max_entries` responses.
+    """
+    loader = DashboardStub()
+    cache = ResponseCache("dashboard", max_entries=2, ttl=60)
+
+    for wallet_id in ("0x1", "0x2", "0x1", "0x3"):
+        await cache.get_or_load(wallet_id, loader)
+
+    assert list(cache._entries) == ["0x1", "0x3"]
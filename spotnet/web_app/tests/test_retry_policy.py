@@ -0,0 +1,160 @@
+"""
+Test cases for the retry policy of StarknetClient contract calls,
+run against a local fake RPC server that injects failures and latency.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from starknet_py.net.client_errors import ClientError
+
+from web_app.contract_tools.blockchain_call import StarknetClient
+from web_app.contract_tools.retry import RetryDeadlineExceeded, RetryPolicy
+
+
+class FakeRpcNode:
+    """
+    A fake Starknet node answering `starknet_call` with a constant result.
+    The first `failures` requests fail with `failure_status`, and every
+    request is delayed by `latency` seconds.
+    """
+
+    def __init__(
+        self, failures: int = 0, failure_status: int = 503, latency: float = 0.0
+    ):
+        self.failures = failures
+        self.failure_status = failure_status
+        self.latency = latency
+        self.requests = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Handle a JSON-RPC request.
+        """
+        payload = await request.json()
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.requests <= self.failures:
+            return web.Response(status=self.failure_status, text="unavailable")
+        if self.failure_status == 200:
+            return web.json_response(
+                {
+                    "jsonrpc": "2.0",
+                    "id": payload["id"],
+                    "error": {"code": 40, "message": "Contract error"},
+                }
+            )
+        return web.json_response(
+            {"jsonrpc": "2.0", "id": payload["id"], "result": ["0x2a"]}
+        )
+
+
+@pytest.fixture
+async def rpc_node():
+    """
+    Start a fake RPC node and yield a factory of clients bound to it.
+    """
+    servers = []
+
+    async def _start(node: FakeRpcNode, policy: RetryPolicy) -> StarknetClient:
+        app = web.Application()
+        app.router.add_post("/", node.handle)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        return StarknetClient(node_url=str(server.make_url("/")), retry_policy=policy)
+
+    yield _start
+    for server in servers:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_failures(rpc_node) -> None:
+    """
+    Test that 503 responses are retried until the node answers.
+    """
+    node = FakeRpcNode(failures=2)
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.02)
+    client = await rpc_node(node, policy)
+
+    result = await client._func_call(1, "balanceOf", [1])
+
+    assert result == [42]
+    assert node.requests == 3
+    assert policy.stats.attempts == 3
+    assert policy.stats.retries == 2
+    assert policy.stats.give_ups == 0
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(rpc_node) -> None:
+    """
+    Test that the policy stops after max_attempts and counts a give-up.
+    """
+    node = FakeRpcNode(failures=10)
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+    client = await rpc_node(node, policy)
+
+    with pytest.raises(ClientError):
+        await client._func_call(1, "balanceOf", [1])
+
+    assert node.requests == 3
+    assert policy.stats.give_ups == 1
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_contract_errors(rpc_node) -> None:
+    """
+    Test that RPC contract errors fail at once.
+    """
+    node = FakeRpcNode(failures=0, failure_status=200)
+    policy = RetryPolicy(base_delay=0.01)
+    client = await rpc_node(node, policy)
+
+    with pytest.raises(ClientError):
+        await client._func_call(1, "balanceOf", [1])
+
+    assert node.requests == 1
+    assert policy.stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_slow_node(rpc_node) -> None:
+    """
+    Test that a slow node is abandoned once the deadline is hit.
+    """
+    node = FakeRpcNode(latency=1.0)
+    policy = RetryPolicy(deadline=0.2)
+    client = await rpc_node(node, policy)
+
+    with pytest.raises(RetryDeadlineExceeded):
+        await client._func_call(1, "balanceOf", [1])
+
+    assert policy.stats.give_ups == 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_block_event_loop(rpc_node) -> None:
+    """
+    Test that other coroutines keep running while a call backs off.
+    """
+    node = FakeRpcNode(failures=1, latency=0.05)
+    policy = RetryPolicy(base_delay=0.2, max_delay=0.2)
+    client = await rpc_node(node, policy)
+    ticks = 0
+
+    async def ticker() -> None:
+        """Count the event loop ticks while the call retries."""
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await client._func_call(1, "balanceOf", [1])
+    task.cancel()
+
+    assert ticks > 1
@@ -1,14 +1,20 @@
 """Test cases for StarknetClient"""
 
+import asyncio
 from decimal import Decimal
+from math import floor
 from unittest.mock import AsyncMock, patch
 
 import pytest
+import starknet_py.net.client_models
 from starknet_py.contract import Contract
+from starknet_py.net.client_errors import ClientError
 from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import RpcHttpClient
 
 from web_app.contract_tools.blockchain_call import RepayDataException, StarknetClient
 from web_app.contract_tools.constants import TokenParams
+from web_app.contract_tools.ekubo_pool import PoolState, to_decimal
 
 CLIENT = StarknetClient()
 
@@ -67,6 +73,7 @@ class TestStarknetClient:
             "extension": 0,
         }
         assert CLIENT._build_ekubo_pool_key(token0, token1) == expected_data
+        assert CLIENT.get_ekubo_pool_key(token0, token1) == expected_data
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
@@ -259,8 +266,12 @@ class TestStarknetClient:
         ],
     )
     @patch.object(Contract, "from_address", new_callable=AsyncMock)
+    @patch.object(
+        StarknetClient, "get_block_number", new_callable=AsyncMock, return_value=1
+    )
     async def test_get_loop_liquidity_data(
         self,
+        mock_get_block_number: AsyncMock,
         mock_contract_from_address: AsyncMock,
         deposit_token_addr: str,
         amount: int,
@@ -270,6 +281,7 @@ class TestStarknetClient:
     ) -> None:
         """
         Test cases for StarknetClient.get_loop_liquidity_data method
+        :param mock_get_block_number: unittest.mock.AsyncMock
         :param mock_contract_from_address: unittest.mock.AsyncMock
         :param deposit_token_addr: str
         :param amount: int
@@ -335,14 +347,19 @@ class TestStarknetClient:
         ],
     )
     @patch.object(Contract, "from_address", new_callable=AsyncMock)
+    @patch.object(
+        StarknetClient, "get_block_number", new_callable=AsyncMock, return_value=1
+    )
     async def test_get_repay_data(
         self,
+        mock_get_block_number: AsyncMock,
         mock_contract_from_address: AsyncMock,
         deposit_token_addr: str,
         borrowing_token_addr: str,
     ) -> None:
         """
         Test cases for StarknetClient.get_repay_data method
+        :param mock_get_block_number: unittest.mock.AsyncMock
         :param mock_contract_from_address: unittest.mock.AsyncMock
         :param deposit_token_addr: str
         :param borrowing_token_addr: str
@@ -374,3 +391,245 @@ class TestStarknetClient:
             assert {"supply_price", "debt_price", "pool_key"}.issubset(
                 repay_data
             ) or not len(repay_data.keys())
+
+    @pytest.mark.asyncio
+    @patch.object(StarknetClient, "get_block_number", new_callable=AsyncMock)
+    async def test_get_ekubo_pool_state_once_per_block(
+        self, mock_get_block_number: AsyncMock
+    ) -> None:
+        """
+        Test that concurrent reads of a pool state share one call per block
+        :param mock_get_block_number: unittest.mock.AsyncMock
+        :return: None
+        """
+        client = StarknetClient()
+        pool_key = client.get_ekubo_pool_key(
+            TokenParams.ETH.address, TokenParams.USDC.address
+        )
+        mock_contract = AsyncMock()
+        mock_contract.functions["get_pool_price"].call = AsyncMock(
+            return_value=[{"sqrt_ratio": 2**128, "tick": {"mag": 5, "sign": True}}]
+        )
+
+        mock_get_block_number.return_value = 1
+        states = await asyncio.gather(
+            *(client.get_ekubo_pool_state(pool_key, mock_contract) for _ in range(5))
+        )
+        mock_get_block_number.return_value = 2
+        new_state = await client.get_ekubo_pool_state(pool_key, mock_contract)
+
+        assert states == [PoolState(sqrt_ratio=2**128, tick=-5, block_number=1)] * 5
+        assert new_state.block_number == 2
+        assert mock_contract.functions["get_pool_price"].call.await_count == 2
+
+    @pytest.mark.parametrize(
+        "sqrt_ratio",
+        [2**128, 0x1234567890ABCDEF1234567890ABCDEF, 3 * 2**120 + 7],
+    )
+    def test_pool_prices_are_exact(self, sqrt_ratio: int) -> None:
+        """
+        Test that pool prices of both directions match integer arithmetic
+        :param sqrt_ratio: int
+        :return: None
+        """
+        state = PoolState(sqrt_ratio=sqrt_ratio, tick=0)
+
+        token0_price, token1_price = state.prices(18, 6)
+
+        assert floor(token0_price) == sqrt_ratio**2 * 10**12 * 10**6 // 2**256
+        assert floor(token1_price) == 10**18 * 2**256 // (sqrt_ratio**2 * 10**12)
+        assert floor(to_decimal(token1_price)) == floor(token1_price)
+
+    @pytest.mark.asyncio
+    @patch.object(RpcHttpClient, "request", new_callable=AsyncMock)
+    async def test_batch_sends_one_request(self, mock_request: AsyncMock) -> None:
+        """
+        Test that concurrent calls inside StarknetClient.batch share one JSON-RPC batch
+        and every caller receives its own result
+        :param mock_request: unittest.mock.AsyncMock
+        :return: None
+        """
+        mock_request.side_effect = lambda **kwargs: [
+            {"jsonrpc": "2.0", "id": item["id"], "result": [hex(item["id"] + 1)]}
+            for item in reversed(kwargs["payload"])
+        ]
+
+        async with CLIENT.batch():
+            results = await asyncio.gather(
+                *(CLIENT._func_call(addr, "balanceOf", [addr]) for addr in range(4))
+            )
+
+        mock_request.assert_awaited_once()
+        payload = mock_request.await_args.kwargs["payload"]
+        assert [item["method"] for item in payload] == ["starknet_call"] * 4
+        assert results == [[1], [2], [3], [4]]
+
+    @pytest.mark.asyncio
+    @patch.object(RpcHttpClient, "request", new_callable=AsyncMock)
+    async def test_batch_isolates_errors(self, mock_request: AsyncMock) -> None:
+        """
+        Test that an error entry of a batch response fails only its own call
+        :param mock_request: unittest.mock.AsyncMock
+        :return: None
+        """
+        mock_request.return_value = [
+            {"jsonrpc": "2.0", "id": 0, "result": ["0x5"]},
+            {"jsonrpc": "2.0", "id": 1, "error": {"code": 40, "message": "failed"}},
+        ]
+        calls = [
+            starknet_py.net.client_models.Call(to_addr=addr, selector=1, calldata=[])
+            for addr in range(2)
+        ]
+
+        async with CLIENT.batch() as batcher:
+            results = await asyncio.gather(
+                *(batcher.call(call) for call in calls), return_exceptions=True
+            )
+
+        assert results[0] == [5]
+        assert isinstance(results[1], ClientError)
+        assert batcher.batches_sent == 1
+
+    @pytest.mark.asyncio
+    @patch.object(RpcHttpClient, "request", new_callable=AsyncMock)
+    async def test_fetch_portfolios_one_batch(self, mock_request: AsyncMock) -> None:
+        """
+        Test that the z-token balances of many contracts are fetched in one
+        JSON-RPC batch, and that a failed balance does not fail the others
+        :param mock_request: unittest.mock.AsyncMock
+        :return: None
+        """
+        client = StarknetClient()
+        z_addresses = {"ETH": (18, 0x123, 10**27), "USDC": (6, 0x456, 10**27)}
+
+        def _answer(**kwargs) -> list:
+            answers = []
+            for item in kwargs["payload"]:
+                request = item["params"]["request"]
+                z_address = int(request["contract_address"], 16)
+                holder = int(request["calldata"][0], 16)
+                if (z_address, holder) == (0x456, 0xB):
+                    error = {"code": 40, "message": "failed"}
+                    answers.append({"id": item["id"], "error": error})
+                else:
+                    balance = hex(z_address + holder)
+                    answers.append({"id": item["id"], "result": [balance, "0x0"]})
+            return answers
+
+        mock_request.side_effect = _answer
+        with patch.object(
+            client, "get_z_addresses", new_callable=AsyncMock, return_value=z_addresses
+        ):
+            portfolios = await client.fetch_portfolios(["0xa", "0xb"])
+
+        mock_request.assert_awaited_once()
+        assert len(mock_request.await_args.kwargs["payload"]) == 4
+        eth = portfolios["0xa"].balances["zETH"]
+        assert (eth.token, eth.decimals, eth.raw_balance) == ("ETH", 18, 0x12D)
+        assert eth.balance == Decimal(0x12D).scaleb(-18)
+        assert portfolios["0xa"].to_dict()["zUSDC"] == {
+            "balance": str(0x460),
+            "decimals": 6,
+        }
+        failed = portfolios["0xb"].balances["zUSDC"]
+        assert failed.raw_balance == 0 and failed.error is not None
+        assert list(portfolios["0xb"].non_zero()) == ["zETH"]
+
+    @pytest.mark.asyncio
+    @patch.object(RpcHttpClient, "request", new_callable=AsyncMock)
+    @patch.object(FullNodeClient, "call_contract", new_callable=AsyncMock)
+    async def test_snapshot_pins_calls(
+        self, mock_call_contract: AsyncMock, mock_request: AsyncMock
+    ) -> None:
+        """
+        Test that direct and batched calls inside StarknetClient.snapshot are
+        pinned to its block, which get_block_number returns inside the scope
+        :param mock_call_contract: unittest.mock.AsyncMock
+        :param mock_request: unittest.mock.AsyncMock
+        :return: None
+        """
+        client = StarknetClient()
+        mock_call_contract.return_value = [1]
+        mock_request.return_value = [{"jsonrpc": "2.0", "id": 0, "result": ["0x1"]}]
+        mock_get_block_number = AsyncMock(return_value=7)
+
+        with patch.object(client.client, "get_block_number", mock_get_block_number):
+            async with client.snapshot() as block_number:
+                await client._func_call(0x1, "balanceOf", [0x2])
+                async with client.snapshot():
+                    async with client.batch():
+                        await client._func_call(0x1, "balanceOf", [0x2])
+                assert await client.get_block_number() == 7
+            await client._func_call(0x1, "balanceOf", [0x2])
+
+        assert block_number == 7
+        assert client.pinned_block() is None
+        mock_get_block_number.assert_awaited_once()
+        assert mock_call_contract.await_args_list[0].kwargs == {"block_number": 7}
+        assert mock_call_contract.await_args_list[1].kwargs == {}
+        payload = mock_request.await_args.kwargs["payload"]
+        assert payload[0]["params"]["block_id"] == {"block_number": 7}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_accumulators_per_block(self) -> None:
+        """
+        Test that accumulators read inside a snapshot are cached per block,
+        apart from the latest accumulators
+        :return: None
+        """
+        client = StarknetClient()
+        reserves = {"ETH": [0, 18, 0x123, 0, 10**27]}
+        with patch.object(
+            client, "get_available_zklend_reserves", new_callable=AsyncMock
+        ) as mock_reserves:
+            mock_reserves.return_value = reserves
+            async with client.snapshot(5):
+                await client.get_zklend_accumulators()
+                await client.get_zklend_accumulators()
+            async with client.snapshot(6):
+                await client.get_zklend_accumulators()
+            await client.get_zklend_accumulators()
+
+        assert mock_reserves.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_get_z_addresses_cache(self) -> None:
+        """
+        Test that concurrent misses of StarknetClient.get_z_addresses share one
+        reserve fetch and that later calls are served from the cache
+        :return: None
+        """
+        client = StarknetClient()
+        reserves = {"ETH": [0, 18, 0x123, 0, 10**27], "USDC": [0, 6, 0x456, 0, 2]}
+        with patch.object(
+            client, "get_available_zklend_reserves", new_callable=AsyncMock
+        ) as mock_reserves:
+            mock_reserves.return_value = reserves
+            results = await asyncio.gather(
+                *(client.get_z_addresses() for _ in range(5))
+            )
+            await client.get_z_addresses()
+
+        mock_reserves.assert_awaited_once()
+        assert results[0] == {"ETH": (18, 0x123, 10**27), "USDC": (6, 0x456, 2)}
+
+    @pytest.mark.asyncio
+    async def test_get_z_addresses_refreshes_accumulators(self) -> None:
+        """
+        Test that expired accumulators are reloaded while token params stay cached
+        :return: None
+        """
+        client = StarknetClient()
+        with patch.object(
+            client, "get_available_zklend_reserves", new_callable=AsyncMock
+        ) as mock_reserves:
+            mock_reserves.side_effect = [
+                {"ETH": [0, 18, 0x123, 0, 1]},
+                {"ETH": [0, 18, 0x123, 0, 2]},
+            ]
+            assert await client.get_z_addresses() == {"ETH": (18, 0x123, 1)}
+            client._zklend_accumulators.invalidate()
+            assert await client.get_z_addresses() == {"ETH": (18, 0x123, 2)}
+            assert await client.get_zklend_token_params() == {"ETH": (18, 0x123)}
+
+        assert mock_reserves.await_count == 2
@@ -2,6 +2,7 @@
 This module contains the tests for the user endpoints.
 """
 
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -437,3 +438,27 @@ async def test_save_bug_report_validation(
 
     assert response.status_code == expected_status
     assert response.json()["detail"][0]["msg"] == error_message
+
+
+@pytest.mark.asyncio
+@patch("web_app.contract_tools.mixins.DashboardMixin.get_current_prices")
+@patch("web_app.db.crud.StatsDBConnector.get_platform_stats")
+async def test_get_stats(
+    mock_get_platform_stats: MagicMock, mock_get_current_prices: MagicMock, client
+) -> None:
+    """
+    Test that get_stats prices the maintained token totals.
+    """
+    mock_get_platform_stats.return_value = (
+        {"ETH": Decimal("2"), "USDC": Decimal("100")},
+        3,
+    )
+    mock_get_current_prices.return_value = {
+        "ETH": Decimal("2000"),
+        "USDC": Decimal("1"),
+    }
+
+    response = client.get("/api/get_stats")
+
+    assert response.status_code == 200
+    assert response.json() == {"total_opened_amount": "4100", "unique_users": 3}